@@ -0,0 +1,138 @@
+"""
+Compiled Adjacency Graph (CSR)
+The walkable terrain as flat offset / neighbour / cost arrays
+A* walks a contiguous slice per expansion instead of building neighbour lists
+"""
+
+from array import array
+from constants import *
+
+
+# Edge kinds: a cardinal step or an Anywhere Door teleport
+EDGE_STEP = 0
+EDGE_DOOR = 1
+
+GRAPH_STEPS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+
+class GridGraph:
+    """
+    Compressed sparse row adjacency over cell indices (row * cols + col)
+    - offsets[i]: first edge slot of cell i; each cell owns a fixed stride of
+      slots, degree[i] of them in use, so edges are patched in place
+    - neighbours / costs / kinds: target index, base cost and EDGE_* per slot
+    - Walls have no edges; Gian blocking is a dynamic overlay the search checks
+    - Hooked into Grid.set_cell like ComponentIndex: only wall changes patch
+    """
+
+    def __init__(self, grid, door_pairs=()):
+        self.grid = grid
+        self.door_pairs = []
+        self.partners = {}            # Door cell -> teleport destinations
+        for door1, door2 in door_pairs:
+            self._link(door1, door2)
+        self.stride = len(GRAPH_STEPS) + 1
+        self.suspended = False
+        self.patches = 0
+        self.rebuild()
+
+    def _is_open(self, row, col):
+        return self.grid.in_bounds(row, col) and self.grid.grid[row][col] != CELL_WALL
+
+    def _link(self, pos1, pos2):
+        self.door_pairs.append((pos1, pos2))
+        self.partners.setdefault(pos1, []).append(pos2)
+        self.partners.setdefault(pos2, []).append(pos1)
+
+    def _door_partners(self, row, col):
+        return self.partners.get((row, col), ())
+
+    def rebuild(self):
+        """Compile every cell (used after loading a level)"""
+        cells = self.grid.rows * self.grid.cols
+        self.suspended = False
+
+        # One spare slot per door pair a cell takes part in
+        doors = max((len(partners) for partners in self.partners.values()), default=0)
+        self.stride = len(GRAPH_STEPS) + max(1, doors)
+
+        self.offsets = array('i', range(0, (cells + 1) * self.stride, self.stride))
+        self.degree = bytearray(cells)
+        self.neighbours = array('i', [-1]) * (cells * self.stride)
+        self.costs = array('d', [0.0]) * (cells * self.stride)
+        self.kinds = bytearray(cells * self.stride)
+
+        for row in range(self.grid.rows):
+            for col in range(self.grid.cols):
+                self._compile(row, col)
+
+    def suspend(self):
+        """Ignore cell updates until the next rebuild (bulk level loading)"""
+        self.suspended = True
+
+    def _compile(self, row, col):
+        """Rewrite the edge slots of one cell"""
+        cols = self.grid.cols
+        index = row * cols + col
+        slot = self.offsets[index]
+        used = 0
+
+        if self._is_open(row, col):
+            for dr, dc in GRAPH_STEPS:
+                if self._is_open(row + dr, col + dc):
+                    self.neighbours[slot + used] = (row + dr) * cols + col + dc
+                    self.costs[slot + used] = 1.0
+                    self.kinds[slot + used] = EDGE_STEP
+                    used += 1
+            for partner_row, partner_col in self._door_partners(row, col):
+                if self._is_open(partner_row, partner_col):
+                    self.neighbours[slot + used] = partner_row * cols + partner_col
+                    self.costs[slot + used] = 1.0
+                    self.kinds[slot + used] = EDGE_DOOR
+                    used += 1
+
+        self.degree[index] = used
+
+    def on_cell_changed(self, row, col, old_type, new_type):
+        """
+        Incremental update hook called by Grid.set_cell
+        A wall toggle rewrites the cell, its four neighbours and its door partners
+        """
+        if self.suspended or (old_type == CELL_WALL) == (new_type == CELL_WALL):
+            return
+
+        self.patches += 1
+        self._compile(row, col)
+        for dr, dc in GRAPH_STEPS:
+            if self.grid.in_bounds(row + dr, col + dc):
+                self._compile(row + dr, col + dc)
+        for partner in self._door_partners(row, col):
+            if self.grid.in_bounds(*partner):
+                self._compile(*partner)
+
+    def add_door_pair(self, pos1, pos2):
+        """Teleport edge in both directions"""
+        if (pos1, pos2) in self.door_pairs or (pos2, pos1) in self.door_pairs:
+            return
+        self._link(pos1, pos2)
+
+        if self.suspended:
+            return
+        if len(GRAPH_STEPS) + max(len(self.partners[pos1]), len(self.partners[pos2])) > self.stride:
+            self.rebuild()
+            return
+        for pos in [pos1, pos2]:
+            if self.grid.in_bounds(*pos):
+                self._compile(*pos)
+
+    def clear_door_pairs(self):
+        self.door_pairs = []
+        self.partners = {}
+
+    def edge_count(self):
+        return sum(self.degree)
+
+    def memory_bytes(self):
+        return (len(self.offsets) * self.offsets.itemsize + len(self.degree)
+                + len(self.neighbours) * self.neighbours.itemsize
+                + len(self.costs) * self.costs.itemsize + len(self.kinds))
@@ -0,0 +1,165 @@
+"""
+Parallel Batch Level Evaluator
+Solvability, A* moves and Gian catch rate for many levels at once
+Level grids are shared with workers through multiprocessing.shared_memory
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from constants import *
+from sim_clock import TickClock
+from simulation import Simulation
+
+
+# Cell type -> map character, used to rebuild maps inside workers
+CELL_CHARS = {cell_type: char for char, cell_type in MAP_CHARS.items()}
+
+# Worker-side cache of attached shared memory blocks (one attach per process)
+_attached = {}
+
+
+def encode_levels(levels):
+    """
+    Pack every level map into one bytes buffer (one byte per cell)
+    Returns (buffer, metadata list); metadata holds offsets and level settings
+    """
+    chunks = []
+    metadata = []
+    offset = 0
+
+    for index, level in enumerate(levels):
+        level_map = level["map"]
+        rows = len(level_map)
+        cols = max(len(line) for line in level_map)
+
+        cells = bytearray(rows * cols)
+        for row, line in enumerate(level_map):
+            for col, char in enumerate(line):
+                cells[row * cols + col] = MAP_CHARS.get(char, CELL_EMPTY)
+
+        settings = {key: value for key, value in level.items() if key != "map"}
+        metadata.append({"index": index, "offset": offset, "rows": rows,
+                         "cols": cols, "settings": settings})
+        chunks.append(cells)
+        offset += len(cells)
+
+    return b"".join(chunks), metadata
+
+
+def decode_level(buffer, meta):
+    """Rebuild a level dict from its slice of the shared buffer"""
+    rows, cols, offset = meta["rows"], meta["cols"], meta["offset"]
+    level_map = []
+    for row in range(rows):
+        start = offset + row * cols
+        level_map.append("".join(CELL_CHARS[cell] for cell in buffer[start:start + cols]))
+
+    level = dict(meta["settings"])
+    level["map"] = level_map
+    return level
+
+
+def _attach(name):
+    shm = _attached.get(name)
+    if shm is None:
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+    return shm
+
+
+def evaluate_level(level, trials=4, trial_offset=1.5, time_limit=120.0):
+    """
+    Evaluate one level headless
+    - solvable / path_steps / moves: A* path followed with auto-move, no delay
+    - catch_rate: fraction of trials caught by Gian, each trial starting
+      trial_offset seconds later so Gian is at a different patrol phase
+    """
+    sim = Simulation(clock=TickClock(), verbose=False)
+    record = {"solvable": False, "path_steps": None, "moves": None,
+              "catch_rate": None, "outcomes": []}
+
+    sim.load_level(0, level)
+    path = sim.astar.find_path(sim.nobita.get_position(), sim.school.get_position(),
+                               record_exploration=False)
+    if not path:
+        return record
+
+    record["solvable"] = True
+    record["path_steps"] = len(path) - 1
+
+    caught = 0
+    for trial in range(trials):
+        sim.load_level(0, level)
+        sim.fast_forward(trial * trial_offset)
+        if sim.state == STATE_PLAYING:
+            sim.apply_action(ACTION_FIND_PATH)
+            sim.apply_action(ACTION_AUTO_MOVE)
+            sim.fast_forward(time_limit)
+
+        outcome = sim.lost_reason if sim.state == STATE_LOST else sim.state
+        record["outcomes"].append(outcome)
+        if outcome == LOST_CAUGHT:
+            caught += 1
+        if trial == 0 and sim.state == STATE_WON:
+            record["moves"] = sim.moves
+
+    record["catch_rate"] = caught / trials if trials else 0.0
+    return record
+
+
+def _evaluate_chunk(shm_name, size, metas, trials):
+    """Worker entry point: evaluate a chunk of levels from shared memory"""
+    buffer = _attach(shm_name).buf[:size]
+    results = []
+    try:
+        for meta in metas:
+            start = time.perf_counter()
+            record = evaluate_level(decode_level(buffer, meta), trials=trials)
+            record["index"] = meta["index"]
+            record["seconds"] = time.perf_counter() - start
+            record["worker"] = os.getpid()
+            results.append(record)
+    finally:
+        buffer.release()
+    return results
+
+
+def evaluate_levels(levels, workers=None, trials=4, chunk_size=8):
+    """
+    Evaluate levels across a process pool
+    Yields one record per level as soon as its chunk finishes (unordered)
+    """
+    data, metadata = encode_levels(levels)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+    shm.buf[:len(data)] = data
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_evaluate_chunk, shm.name, len(data),
+                                   metadata[i:i + chunk_size], trials)
+                       for i in range(0, len(metadata), chunk_size)]
+
+            for future in as_completed(futures):
+                for record in future.result():
+                    yield record
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+if __name__ == "__main__":
+    from levels import LEVELS
+
+    # Evaluate the built-in levels: python batch_eval.py [workers]
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    levels = [LEVELS[num] for num in sorted(LEVELS)]
+
+    start = time.perf_counter()
+    for record in evaluate_levels(levels, workers=workers):
+        print(f"Level {record['index'] + 1}: solvable={record['solvable']} "
+              f"steps={record['path_steps']} moves={record['moves']} "
+              f"catch_rate={record['catch_rate']} ({record['seconds'] * 1000:.1f} ms)")
+    print(f"⏱ {len(levels)} levels in {time.perf_counter() - start:.2f}s")
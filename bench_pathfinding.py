@@ -0,0 +1,263 @@
+"""
+Pathfinding Benchmark Suite
+Scenario matrix for UltimateAStar.find_path with JSON baselines
+Fails (exit code 1) when a deterministic metric (nodes explored, peak
+memory) regresses; latency is machine dependent, so it is only reported
+unless a (wide) latency threshold is given
+
+  python bench_pathfinding.py                       # quick matrix
+  python bench_pathfinding.py --full                # adds 2000x2000 (slow)
+  python bench_pathfinding.py --save baseline.json
+  python bench_pathfinding.py --compare baseline.json
+  python bench_pathfinding.py --compare baseline.json --latency-threshold 1.0
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from constants import *
+from grid import Grid
+from ultimate_astar_heuristic import UltimateAStar
+
+
+# Sizes are width x height (cols x rows), like the 20x15 game grid
+QUICK_SIZES = [(20, 15), (200, 150)]
+FULL_SIZES = QUICK_SIZES + [(2000, 2000)]
+WALL_DENSITIES = [0.0, 0.25]
+DOOR_PAIRS = [0, 2]
+
+# Metrics checked against the baseline (higher is worse for all of them)
+# Same code + same Python give the same values: gated with a tight threshold
+GATED_METRICS = ["nodes_explored", "peak_memory_kb"]
+# Timer noise: reported, gated only on request (p50 only, p99 is too noisy)
+LATENCY_METRICS = ["p50_ms", "p99_ms"]
+GATED_LATENCY_METRICS = ["p50_ms"]
+
+
+def scenario_name(size, density, doors, bamboo, gian):
+    cols, rows = size
+    return f"{cols}x{rows}-w{density:.2f}-d{doors}-b{int(bamboo)}-g{int(gian)}"
+
+
+def build_scenario(size, density, doors, bamboo, gian, seed=0):
+    """
+    Seeded map for one scenario
+    A random monotone corridor from the top-left to the bottom-right corner
+    keeps every scenario solvable whatever the wall density
+    """
+    cols, rows = size
+    rng = random.Random(f"{seed}-{scenario_name(size, density, doors, bamboo, gian)}")
+
+    cells = [['#'] * cols for _ in range(rows)]
+    for row in range(1, rows - 1):
+        for col in range(1, cols - 1):
+            if rng.random() >= density:
+                cells[row][col] = '.'
+
+    start = (1, 1)
+    goal = (rows - 2, cols - 2)
+
+    corridor = [start]
+    row, col = start
+    while (row, col) != goal:
+        if col == goal[1] or (row != goal[0] and rng.random() < 0.5):
+            row += 1
+        else:
+            col += 1
+        cells[row][col] = '.'
+        corridor.append((row, col))
+
+    on_corridor = set(corridor)
+    open_cells = [(r, c) for r in range(1, rows - 1) for c in range(1, cols - 1)
+                  if cells[r][c] == '.' and (r, c) not in on_corridor]
+    rng.shuffle(open_cells)
+
+    door_pairs = []
+    for _ in range(doors):
+        if len(open_cells) < 2:
+            break
+        door1, door2 = open_cells.pop(), open_cells.pop()
+        cells[door1[0]][door1[1]] = 'D'
+        cells[door2[0]][door2[1]] = 'D'
+        door_pairs.append((door1, door2))
+
+    if gian:
+        # Next to the middle of the corridor, so the proximity penalty matters
+        mid_row, mid_col = corridor[len(corridor) // 2]
+        for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+            r, c = mid_row + dr, mid_col + dc
+            if 0 < r < rows - 1 and 0 < c < cols - 1 and (r, c) not in on_corridor:
+                cells[r][c] = 'G'
+                break
+
+    cells[start[0]][start[1]] = 'N'
+    cells[goal[0]][goal[1]] = 'S'
+
+    grid = Grid(rows, cols)
+    grid.load_level(["".join(line) for line in cells])
+
+    astar = UltimateAStar(grid)
+    astar.verbose = False
+    for door1, door2 in door_pairs:
+        astar.add_door_pair(door1, door2)
+    astar.set_bamboo_collected(bamboo)
+
+    return astar, start, goal
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_scenario(astar, start, goal, min_runs=5, min_time=0.5):
+    """Time find_path until both min_runs and min_time are reached"""
+    samples = []
+    elapsed = 0.0
+    while len(samples) < min_runs or elapsed < min_time:
+        t0 = time.perf_counter()
+        astar.find_path(start, goal, record_exploration=False)
+        sample = time.perf_counter() - t0
+        samples.append(sample)
+        elapsed += sample
+
+    stats = dict(astar.last_stats)
+
+    # Separate traced run: tracemalloc slows the search down a lot
+    tracemalloc.start()
+    astar.find_path(start, goal, record_exploration=False)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "runs": len(samples),
+        "ops_per_sec": len(samples) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "nodes_explored": stats["nodes_explored"],
+        "path_length": stats["path_length"],
+        "peak_memory_kb": peak / 1024
+    }
+
+
+def run_matrix(sizes, seed=0, min_runs=5, min_time=0.5):
+    results = {}
+    for size, density, doors, bamboo, gian in itertools.product(
+            sizes, WALL_DENSITIES, DOOR_PAIRS, [False, True], [False, True]):
+        name = scenario_name(size, density, doors, bamboo, gian)
+        astar, start, goal = build_scenario(size, density, doors, bamboo, gian, seed)
+        result = run_scenario(astar, start, goal, min_runs, min_time)
+        results[name] = result
+
+        print(f"{name:28} {result['ops_per_sec']:10.1f} ops/s  "
+              f"p50 {result['p50_ms']:9.3f} ms  p99 {result['p99_ms']:9.3f} ms  "
+              f"nodes {result['nodes_explored']:8}  peak {result['peak_memory_kb']:9.1f} KB")
+    return results
+
+
+def _regressions(results, baseline, metrics, threshold):
+    regressions = []
+    for name, base in baseline["scenarios"].items():
+        current = results.get(name)
+        if current is None:
+            continue
+        for metric in metrics:
+            if base[metric] and current[metric] > base[metric] * (1 + threshold):
+                change = (current[metric] / base[metric] - 1) * 100
+                regressions.append(f"{name} {metric}: {base[metric]:.3f} → "
+                                   f"{current[metric]:.3f} (+{change:.0f}%, allowed "
+                                   f"{threshold:.0%})")
+    return regressions
+
+
+def compare(results, baseline, threshold, latency_threshold=None):
+    """
+    List of regression messages (empty when the run is within threshold)
+    - GATED_METRICS: threshold
+    - GATED_LATENCY_METRICS: latency_threshold, not gated when None
+    """
+    regressions = _regressions(results, baseline, GATED_METRICS, threshold)
+    if latency_threshold is not None:
+        regressions += _regressions(results, baseline, GATED_LATENCY_METRICS, latency_threshold)
+    return regressions
+
+
+def latency_changes(results, baseline):
+    """Informational p50/p99 change per scenario, e.g. 'p50 -12% p99 +30%'"""
+    changes = {}
+    for name, base in baseline["scenarios"].items():
+        current = results.get(name)
+        if current is None:
+            continue
+        parts = []
+        for metric in LATENCY_METRICS:
+            if base[metric]:
+                change = (current[metric] / base[metric] - 1) * 100
+                parts.append(f"{metric.split('_')[0]} {change:+.0f}%")
+        changes[name] = "  ".join(parts)
+    return changes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="UltimateAStar benchmark suite")
+    parser.add_argument("--full", action="store_true", help="include 2000x2000 grids")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-runs", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.5,
+                        help="seconds of timed runs per scenario")
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to check against")
+    parser.add_argument("--threshold", type=float, default=0.0,
+                        help="allowed growth of nodes explored / peak memory as a fraction")
+    parser.add_argument("--latency-threshold", type=float, default=None,
+                        help="also fail when p50 slows down by more than this fraction "
+                             "(1.0 = 2x); latency is only reported when omitted")
+    args = parser.parse_args(argv)
+
+    sizes = FULL_SIZES if args.full else QUICK_SIZES
+    results = run_matrix(sizes, args.seed, args.min_runs, args.min_time)
+
+    if args.save:
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "seed": args.seed,
+                "created": time.strftime("%Y-%m-%d %H:%M:%S")
+            },
+            "scenarios": results
+        }
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        print("Latency vs baseline (informational):")
+        for name, change in latency_changes(results, baseline).items():
+            print(f"  {name:28} {change}")
+
+        regressions = compare(results, baseline, args.threshold, args.latency_threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s):")
+            for message in regressions:
+                print(f"  {message}")
+            return 1
+        gates = f"{args.threshold:.0%}"
+        if args.latency_threshold is not None:
+            gates += f", p50 {args.latency_threshold:.0%}"
+        print(f"✓ No regressions beyond {gates}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Retained-Mode Layer Compositor
+Static UI pieces are rendered into cached Surfaces and only rebuilt
+when the inputs they depend on change
+"""
+
+
+class Layer:
+    """
+    One cached Surface plus the key it was built from
+    builder(key) must return a new Surface; it only runs when the key changes
+    """
+
+    def __init__(self, builder):
+        self.builder = builder
+        self.key = None
+        self.surface = None
+        self.rebuilds = 0
+
+    def get(self, key):
+        if self.surface is None or key != self.key:
+            self.surface = self.builder(key)
+            self.key = key
+            self.rebuilds += 1
+        return self.surface
+
+    def invalidate(self):
+        self.surface = None
+
+
+class Compositor:
+    """Named layers blitted onto the screen in draw order"""
+
+    def __init__(self):
+        self.layers = {}
+
+    def add_layer(self, name, builder):
+        layer = Layer(builder)
+        self.layers[name] = layer
+        return layer
+
+    def blit(self, screen, name, key, pos=(0, 0)):
+        """Blit a layer, rebuilding it first if its key changed"""
+        return screen.blit(self.layers[name].get(key), pos)
+
+    def invalidate(self, name=None):
+        if name is None:
+            for layer in self.layers.values():
+                layer.invalidate()
+        else:
+            self.layers[name].invalidate()
+
+    def stats(self):
+        """Rebuild count per layer (low numbers = cache doing its job)"""
+        return {name: layer.rebuilds for name, layer in self.layers.items()}
@@ -0,0 +1,194 @@
+"""
+Connected-Component Index for Walkable Cells
+Answers "can start ever reach goal?" in O(1) before A* runs
+"""
+
+from collections import deque
+from constants import *
+
+
+class ComponentIndex:
+    """
+    Labels every walkable cell with a connected-component id
+    - Walls split components, Anywhere Door pairs merge them
+    - Opening a cell unions its neighbours (union-find)
+    - Closing a cell relabels only the component it belonged to
+    - Dead labels are compacted away once they outnumber the cells
+    - Gian cells stay in the labelling; Gian blocking is a dynamic overlay
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.door_pairs = []
+        self.labels = []
+        self.parent = []
+        self.suspended = False
+        self.rebuild()
+
+    def _index(self, row, col):
+        return row * self.grid.cols + col
+
+    def _is_open(self, row, col):
+        return self.grid.in_bounds(row, col) and self.grid.grid[row][col] != CELL_WALL
+
+    def _door_partners(self, row, col):
+        partners = []
+        for door1, door2 in self.door_pairs:
+            if (row, col) == door1:
+                partners.append(door2)
+            elif (row, col) == door2:
+                partners.append(door1)
+        return partners
+
+    def _links(self, row, col):
+        """Open cells connected to (row, col): 4 neighbours plus door partners"""
+        links = []
+        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            if self._is_open(row + dr, col + dc):
+                links.append((row + dr, col + dc))
+        for partner in self._door_partners(row, col):
+            if self._is_open(*partner):
+                links.append(partner)
+        return links
+
+    def _new_label(self):
+        self.parent.append(len(self.parent))
+        return len(self.parent) - 1
+
+    def _find(self, label):
+        root = label
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Path compression
+        while self.parent[label] != root:
+            self.parent[label], label = root, self.parent[label]
+        return root
+
+    def _union(self, label1, label2):
+        root1, root2 = self._find(label1), self._find(label2)
+        if root1 != root2:
+            self.parent[root2] = root1
+        return root1
+
+    def _flood(self, start, label):
+        """BFS from start, writing label into every reachable open cell"""
+        self.labels[self._index(*start)] = label
+        queue = deque([start])
+        visited = {start}
+
+        while queue:
+            row, col = queue.popleft()
+            for neighbor in self._links(row, col):
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    self.labels[self._index(*neighbor)] = label
+                    queue.append(neighbor)
+
+        return visited
+
+    def rebuild(self):
+        """Full relabel of the grid (used after loading a level)"""
+        self.labels = [-1] * (self.grid.rows * self.grid.cols)
+        self.parent = []
+        self.suspended = False
+
+        for row in range(self.grid.rows):
+            for col in range(self.grid.cols):
+                if self._is_open(row, col) and self.labels[self._index(row, col)] == -1:
+                    self._flood((row, col), self._new_label())
+
+    def suspend(self):
+        """Ignore cell updates until the next rebuild (bulk level loading)"""
+        self.suspended = True
+
+    def add_door_pair(self, pos1, pos2):
+        """Teleport edge: both doors end up in the same component"""
+        if (pos1, pos2) in self.door_pairs or (pos2, pos1) in self.door_pairs:
+            return
+        self.door_pairs.append((pos1, pos2))
+
+        if self.suspended:
+            return
+        if self._is_open(*pos1) and self._is_open(*pos2):
+            self._union(self.labels[self._index(*pos1)], self.labels[self._index(*pos2)])
+
+    def clear_door_pairs(self):
+        self.door_pairs = []
+
+    def on_cell_changed(self, row, col, old_type, new_type):
+        """
+        Incremental update hook called by Grid.set_cell
+        Only wall <-> non-wall transitions change connectivity
+        """
+        if self.suspended:
+            return
+
+        was_open = old_type != CELL_WALL
+        is_open = new_type != CELL_WALL
+        if was_open == is_open:
+            return
+
+        if is_open:
+            self._open_cell(row, col)
+        else:
+            self._close_cell(row, col)
+
+        # Splits leave dead labels behind; keep parent proportional to the grid
+        if len(self.parent) > 2 * len(self.labels):
+            self._compact()
+
+    def _open_cell(self, row, col):
+        # Join the first neighbour's component instead of minting a label
+        links = self._links(row, col)
+        label = self._find(self.labels[self._index(*links[0])]) if links else self._new_label()
+        self.labels[self._index(row, col)] = label
+
+        for neighbor in links[1:]:
+            label = self._union(label, self.labels[self._index(*neighbor)])
+
+    def _close_cell(self, row, col):
+        old_label = self.labels[self._index(row, col)]
+        self.labels[self._index(row, col)] = -1
+
+        # A single remaining link cannot be split by removing this cell
+        links = self._links(row, col)
+        if len(links) <= 1:
+            return
+
+        # Local relabel: flood the old component from each side of the cut,
+        # the first side keeps the component's label
+        reuse = self._find(old_label) if old_label != -1 else None
+        relabeled = set()
+        for neighbor in links:
+            if neighbor not in relabeled:
+                label = reuse if reuse is not None else self._new_label()
+                reuse = None
+                relabeled |= self._flood(neighbor, label)
+
+    def _compact(self):
+        """Renumber the live components 0..n-1 and drop every dead label"""
+        dense = {}
+        for index, label in enumerate(self.labels):
+            if label != -1:
+                self.labels[index] = dense.setdefault(self._find(label), len(dense))
+        self.parent = list(range(len(dense)))
+
+    def component(self, row, col):
+        """Component id of a cell, or None for walls / out of bounds"""
+        if not self._is_open(row, col):
+            return None
+        label = self.labels[self._index(row, col)]
+        if label == -1:
+            return None
+        return self._find(label)
+
+    def connected(self, pos1, pos2):
+        """
+        O(1) reachability test on static terrain
+        False means no path can exist; True still lets Gian block the way
+        """
+        if self.suspended:
+            return True
+
+        comp1 = self.component(*pos1)
+        return comp1 is not None and comp1 == self.component(*pos2)
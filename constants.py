@@ -9,6 +9,7 @@ All game parameters, colors, costs, and settings in one place
 SCREEN_WIDTH = 1000
 SCREEN_HEIGHT = 700
 FPS = 60
+IDLE_FPS = 10                  # Tick rate while nothing on screen changes
 GAME_TITLE = "Nobita's Late Dash!"
 
 # ============================================================================
@@ -73,6 +74,14 @@ GIAN_SPEED = 0.5               # Cells per second
 GIAN_PATROL_PAUSE = 2.0        # Seconds to pause at waypoints
 GIAN_DANGER_RADIUS = 2         # Cells around Gian that are dangerous
 GIAN_CATCH_RADIUS = 1          # Distance at which Gian catches Nobita
+ENEMY_NUMPY_MIN = 32           # Gians from which EnemyManager.tick plans with numpy
+
+# ============================================================================
+# SIMULATION CLOCK
+# ============================================================================
+SIM_TICK = 1.0 / FPS           # Seconds per fixed simulation tick
+MAX_FRAME_TIME = 0.25          # Longest frame fed to the tick accumulator (avoids spiral of death)
+REPLAY_PATH = "last_replay.nldr"  # Session replay written on exit with --save-replay
 
 # ============================================================================
 # GAME STATES
@@ -85,6 +94,25 @@ STATE_PAUSED = "paused"
 STATE_WON = "won"
 STATE_LOST = "lost"
 
+# Why a level was lost (Simulation.lost_reason)
+LOST_CAUGHT = "caught"
+LOST_OUT_OF_MOVES = "out_of_moves"
+
+# ============================================================================
+# PLAYER ACTIONS (Simulation.apply_action)
+# ============================================================================
+ACTION_UP = 1
+ACTION_DOWN = 2
+ACTION_LEFT = 3
+ACTION_RIGHT = 4
+ACTION_FIND_PATH = 5
+ACTION_AUTO_MOVE = 6
+ACTION_TOGGLE_BAMBOO = 7
+ACTION_RESET = 8
+ACTION_NEXT_LEVEL = 9
+ACTION_MENU = 10
+ACTION_START = 11
+
 # ============================================================================
 # CELL TYPES
 # ============================================================================
@@ -96,12 +124,25 @@ CELL_GIAN = 4
 CELL_BAMBOO = 5
 CELL_DOOR = 6
 
+# Level map characters (levels.py) and their cell types
+MAP_CHARS = {
+    '.': CELL_EMPTY,
+    '#': CELL_WALL,
+    'N': CELL_NOBITA,
+    'S': CELL_SCHOOL,
+    'G': CELL_GIAN,
+    'B': CELL_BAMBOO,
+    'D': CELL_DOOR
+}
+
 # ============================================================================
 # ANIMATION SETTINGS
 # ============================================================================
 MOVEMENT_SPEED = 0.2           # Seconds per cell move
 PATH_ANIMATION_DELAY = 0.05    # Delay between showing path cells
 EXPLORATION_ANIMATION = True   # Show A* exploration visually
+EXPLORATION_REVEAL_RATE = 6    # Explored cells revealed per frame (search order replay)
+COPTER_FRAMES = 18             # Pre-rotated Bamboo Copter frames (5 degree steps)
 
 # ============================================================================
 # UI SETTINGS
@@ -113,6 +154,7 @@ FONT_SIZE_SMALL = 18
 STATUS_BAR_HEIGHT = 80
 MENU_BUTTON_WIDTH = 200
 MENU_BUTTON_HEIGHT = 50
+TEXT_CACHE_SIZE = 256          # Rendered text surfaces kept in the LRU cache
 
 # ============================================================================
 # CONTROLS
@@ -126,6 +168,46 @@ KEY_R = 'r'
 KEY_ESC = 'escape'
 KEY_P = 'p'
 
+# ============================================================================
+# COOPERATIVE AGENTS (WHCA*)
+# ============================================================================
+COOP_WINDOW = 16               # Ticks each agent plans ahead; replans every half window
+
+# ============================================================================
+# PATH SERVICE
+# ============================================================================
+SERVICE_HOST = "127.0.0.1"     # Local only
+SERVICE_PORT = 8765
+SERVICE_CACHE_SIZE = 256       # Reverse searches kept warm (level, goal, bamboo)
+
+# ============================================================================
+# WEB BUILD (pygbag asyncio loop)
+# ============================================================================
+SEARCH_YIELD_EVERY = 500       # A* expansions between yields to the event loop
+LEVELGEN_YIELD_EVERY = 10      # Generator candidates between yields to the event loop
+
+# ============================================================================
+# SPECULATIVE PLANNING (what-if paths on idle frames)
+# ============================================================================
+SPECULATE_BUDGET = 0.002       # Seconds of what-if search per idle frame
+SPECULATE_YIELD_EVERY = 100    # A* expansions between budget checks
+
+# ============================================================================
+# PROFILER
+# ============================================================================
+PROFILER_FRAMES = 300          # Frames kept in the profiler ring buffer
+PROFILER_REFRESH = 15          # Frames between profiler overlay text updates
+
+# Per-frame phases (gian_ai is nested in update, pathfinding in events/update,
+# speculation is the what-if planning after draw)
+PHASE_FRAME = "frame"
+PHASE_EVENTS = "events"
+PHASE_UPDATE = "update"
+PHASE_GIAN_AI = "gian_ai"
+PHASE_PATHFINDING = "pathfinding"
+PHASE_DRAW = "draw"
+PHASE_SPECULATION = "speculation"
+
 # ============================================================================
 # SOUND SETTINGS (for future implementation)
 # ============================================================================
@@ -0,0 +1,287 @@
+"""
+Cooperative Multi-Agent Pathfinding (WHCA*)
+Several agents share corridors without colliding
+Agents are planned in priority order against a space-time reservation table
+"""
+
+import heapq
+from collections import deque
+from array import array
+from constants import *
+
+
+# Moves per tick: wait in place, then the four cardinal steps
+AGENT_MOVES = [(0, 0), (-1, 0), (1, 0), (0, -1), (0, 1)]
+
+
+class ReservationTable:
+    """
+    Space-time reservations hashed by (cell, tick)
+    - Keys are packed ints: tick * cells + cell index
+    - Edge reservations stop two agents swapping places in one tick
+    - Holds a single planning window (cleared on replan), so memory is
+      bounded by agents * window instead of growing with the level length
+    """
+
+    def __init__(self, rows, cols):
+        self.cols = cols
+        self.cells = rows * cols
+        self.cell_owner = {}
+        self.edges = set()
+
+    def _key(self, pos, tick):
+        return tick * self.cells + pos[0] * self.cols + pos[1]
+
+    def reserve(self, pos, tick, agent):
+        self.cell_owner[self._key(pos, tick)] = agent
+
+    def reserve_move(self, from_pos, to_pos, tick, agent):
+        """Agent moves from_pos -> to_pos between tick and tick + 1"""
+        self.reserve(to_pos, tick + 1, agent)
+        if from_pos != to_pos:
+            self.edges.add((self._key(from_pos, tick), self._key(to_pos, tick)))
+
+    def is_free(self, pos, tick, agent=None):
+        owner = self.cell_owner.get(self._key(pos, tick))
+        return owner is None or owner == agent
+
+    def can_move(self, from_pos, to_pos, tick, agent=None):
+        """Free target cell at tick + 1 and no agent coming the other way"""
+        if not self.is_free(to_pos, tick + 1, agent):
+            return False
+        swap = (self._key(to_pos, tick), self._key(from_pos, tick))
+        return swap not in self.edges
+
+    def clear(self):
+        self.cell_owner.clear()
+        self.edges.clear()
+
+    def __len__(self):
+        return len(self.cell_owner)
+
+
+class CooperativePlanner:
+    """
+    Windowed Hierarchical Cooperative A*
+    - Each agent runs one space-time A* over `window` ticks per replan
+    - Heuristic: true walking distance to the goal (reverse BFS, doors included),
+      cached per goal until the terrain changes
+    - Agents replan every `window // 2` ticks, in priority (list) order
+    """
+
+    def __init__(self, grid, window=COOP_WINDOW, door_pairs=None):
+        self.grid = grid
+        self.window = window
+        self.door_pairs = list(door_pairs) if door_pairs else []
+        self.reservations = ReservationTable(grid.rows, grid.cols)
+
+        self.distance_maps = {}
+        self.terrain_version = grid.terrain_version
+
+        self.searches = 0
+        self.nodes_explored = 0
+
+    def _teleports(self):
+        links = {}
+        for door1, door2 in self.door_pairs:
+            links[door1] = door2
+            links[door2] = door1
+        return links
+
+    def distance_map(self, goal):
+        """Walking distance of every cell to goal (-1 = unreachable)"""
+        if self.terrain_version != self.grid.terrain_version:
+            self.distance_maps.clear()
+            self.terrain_version = self.grid.terrain_version
+
+        distances = self.distance_maps.get(goal)
+        if distances is not None:
+            return distances
+
+        rows, cols = self.grid.rows, self.grid.cols
+        terrain = self.grid.grid
+        teleports = self._teleports()
+
+        distances = array('i', [-1]) * (rows * cols)
+        distances[goal[0] * cols + goal[1]] = 0
+        queue = deque([goal])
+
+        while queue:
+            row, col = queue.popleft()
+            next_dist = distances[row * cols + col] + 1
+
+            neighbours = [(row + dr, col + dc) for dr, dc in AGENT_MOVES[1:]]
+            if (row, col) in teleports:
+                neighbours.append(teleports[(row, col)])
+
+            for n_row, n_col in neighbours:
+                if not (0 <= n_row < rows and 0 <= n_col < cols):
+                    continue
+                if terrain[n_row][n_col] == CELL_WALL:
+                    continue
+                index = n_row * cols + n_col
+                if distances[index] == -1:
+                    distances[index] = next_dist
+                    queue.append((n_row, n_col))
+
+        self.distance_maps[goal] = distances
+        return distances
+
+    def _heuristic(self, distances, pos):
+        dist = distances[pos[0] * self.grid.cols + pos[1]]
+        return dist if dist >= 0 else self.grid.rows * self.grid.cols
+
+    def plan_agent(self, agent, start, goal, tick):
+        """
+        Space-time A* for one agent from (start, tick), at most `window` ticks deep
+        Returns the positions for ticks tick..tick + window (waits repeat a cell)
+        """
+        self.searches += 1
+        distances = self.distance_map(goal)
+        teleports = self._teleports()
+        reservations = self.reservations
+        horizon = tick + self.window
+
+        counter = 0
+        frontier = [(self._heuristic(distances, start), counter, start, tick)]
+        came_from = {(start, tick): None}
+        cost_so_far = {(start, tick): 0}
+        best = None
+
+        while frontier:
+            _, _, pos, t = heapq.heappop(frontier)
+            self.nodes_explored += 1
+
+            # Window reached (or goal reached and free to stay): stop here
+            if t == horizon or (pos == goal and self._can_rest(agent, goal, t, horizon)):
+                best = (pos, t)
+                break
+
+            steps = [(pos[0] + dr, pos[1] + dc) for dr, dc in AGENT_MOVES]
+            if pos in teleports:
+                steps.append(teleports[pos])
+
+            for step in steps:
+                if step != pos and not self.grid.is_walkable(*step):
+                    continue
+                if not reservations.can_move(pos, step, t, agent):
+                    continue
+
+                state = (step, t + 1)
+                # Waiting on the goal is free, every other tick costs one
+                new_cost = cost_so_far[(pos, t)] + (0 if step == pos == goal else 1)
+                if state not in cost_so_far or new_cost < cost_so_far[state]:
+                    cost_so_far[state] = new_cost
+                    counter += 1
+                    heapq.heappush(frontier, (new_cost + self._heuristic(distances, step),
+                                              counter, step, t + 1))
+                    came_from[state] = (pos, t)
+
+        if best is None:
+            # Boxed in by reservations: hold position for the window
+            return [start] * (self.window + 1)
+
+        path = []
+        state = best
+        while state is not None:
+            path.append(state[0])
+            state = came_from[state]
+        path.reverse()
+
+        # Resting on the goal for the rest of the window
+        path.extend([goal] * (self.window + 1 - len(path)))
+        return path
+
+    def _can_rest(self, agent, goal, tick, horizon):
+        return all(self.reservations.is_free(goal, t, agent) for t in range(tick, horizon + 1))
+
+    def plan(self, positions, goals, tick=0):
+        """
+        Plan every agent for one window, highest priority first
+        Returns one path per agent (window + 1 positions starting at tick)
+        """
+        # A replan supersedes the previous window entirely
+        self.reservations.clear()
+
+        # Everyone's current cell is taken for the first tick, so higher
+        # priorities route around standing agents instead of into them
+        for agent, pos in enumerate(positions):
+            self.reservations.reserve(pos, tick, agent)
+            self.reservations.reserve(pos, tick + 1, agent)
+
+        paths = []
+        for agent, (start, goal) in enumerate(zip(positions, goals)):
+            path = self.plan_agent(agent, start, goal, tick)
+            for offset in range(len(path) - 1):
+                self.reservations.reserve_move(path[offset], path[offset + 1], tick + offset, agent)
+            paths.append(path)
+        return paths
+
+    def run(self, starts, goals, max_ticks=500):
+        """
+        Headless execution: replan every window // 2 ticks until all agents arrive
+        Returns (trajectories, ticks used); trajectories hold one cell per tick
+        """
+        positions = list(starts)
+        trajectories = [[pos] for pos in positions]
+        replan_every = max(1, self.window // 2)
+        tick = 0
+
+        while tick < max_ticks and positions != list(goals):
+            paths = self.plan(positions, goals, tick)
+            for offset in range(1, replan_every + 1):
+                for agent, path in enumerate(paths):
+                    positions[agent] = path[offset]
+                    trajectories[agent].append(path[offset])
+                tick += 1
+                if positions == list(goals) or tick >= max_ticks:
+                    break
+
+        return trajectories, tick
+
+
+def find_conflicts(trajectories):
+    """(tick, agent_a, agent_b) for every vertex or swap collision"""
+    conflicts = []
+    length = max(len(path) for path in trajectories)
+
+    def at(path, tick):
+        return path[min(tick, len(path) - 1)]
+
+    for tick in range(length):
+        for a in range(len(trajectories)):
+            for b in range(a + 1, len(trajectories)):
+                if at(trajectories[a], tick) == at(trajectories[b], tick):
+                    conflicts.append((tick, a, b))
+                elif tick > 0 and (at(trajectories[a], tick) == at(trajectories[b], tick - 1)
+                                   and at(trajectories[b], tick) == at(trajectories[a], tick - 1)):
+                    conflicts.append((tick, a, b))
+    return conflicts
+
+
+if __name__ == "__main__":
+    import time
+    from grid import Grid
+    from levels import LEVELS
+
+    # Four agents crossing level 1 in opposite directions
+    level = LEVELS[1]
+    grid = Grid()
+    grid.load_level(level["map"])
+    for row, col in [grid.nobita_pos, grid.school_pos]:
+        grid.set_cell(row, col, CELL_EMPTY)
+
+    # Cells in Nobita's part of the map (the grid is larger than the level)
+    open_cells = [(r, c) for r in range(grid.rows) for c in range(grid.cols)
+                  if grid.is_walkable(r, c) and grid.components.connected((r, c), grid.nobita_pos)]
+    starts = [open_cells[0], open_cells[-1], open_cells[1], open_cells[-2]]
+    goals = [open_cells[-1], open_cells[0], open_cells[-2], open_cells[1]]
+
+    planner = CooperativePlanner(grid, door_pairs=level["door_pairs"])
+    started = time.perf_counter()
+    trajectories, ticks = planner.run(starts, goals)
+    elapsed = time.perf_counter() - started
+
+    print(f"✓ {len(starts)} agents in {ticks} ticks, {planner.searches} windowed searches, "
+          f"{planner.nodes_explored} nodes ({elapsed * 1000:.1f} ms)")
+    print(f"  Conflicts: {len(find_conflicts(trajectories))}")
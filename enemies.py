@@ -0,0 +1,297 @@
+"""
+Struct-of-Arrays Enemy Storage
+Hundreds of patrolling/chasing Gians updated in one batched tick
+"""
+
+from array import array
+try:
+    import numpy
+except ImportError:
+    # Optional: without numpy every enemy is planned in a Python loop
+    numpy = None
+from constants import *
+from entities import Gian
+from sim_clock import wall_clock
+
+
+MODE_PATROL = 0
+MODE_CHASE = 1
+MODE_NAMES = ["patrol", "chase"]
+
+
+class EnemyManager:
+    """
+    All Gian state lives in parallel arrays, one slot per enemy
+    - Position, mode, patrol index, pause timer, last move time, speed
+    - Patrol routes are flattened into shared point arrays with offsets
+    - tick() plans every enemy at once (numpy views over the arrays when
+      available), then steps only the enemies due to move and writes the grid
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock if clock else wall_clock
+
+        self.rows = array('i')
+        self.cols = array('i')
+        self.modes = bytearray()
+        self.paused = bytearray()
+        self.patrol_index = array('i')
+        self.pause_start = array('d')
+        self.last_move_time = array('d')
+        self.speeds = array('d')
+        self.chase_ranges = array('i')
+
+        # Flattened patrol routes: enemy i owns points[offset[i] : offset[i] + length[i]]
+        self.patrol_offsets = array('i')
+        self.patrol_lengths = array('i')
+        self.patrol_rows = array('i')
+        self.patrol_cols = array('i')
+
+        self.views = []
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, row, col, patrol_points, speed=GIAN_SPEED, chase_range=8):
+        """Register a Gian; returns its drawable view"""
+        patrol_points = patrol_points if patrol_points else [(row, col)]
+
+        self.rows.append(row)
+        self.cols.append(col)
+        self.modes.append(MODE_PATROL)
+        self.paused.append(0)
+        self.patrol_index.append(0)
+        self.pause_start.append(0.0)
+        self.last_move_time.append(self.clock.now())
+        self.speeds.append(speed)
+        self.chase_ranges.append(chase_range)
+
+        self.patrol_offsets.append(len(self.patrol_rows))
+        self.patrol_lengths.append(len(patrol_points))
+        for p_row, p_col in patrol_points:
+            self.patrol_rows.append(p_row)
+            self.patrol_cols.append(p_col)
+
+        view = GianView(self, len(self.rows) - 1)
+        self.views.append(view)
+        return view
+
+    def enemy_at(self, row, col):
+        """Index of the Gian standing on (row, col), or None"""
+        for i in range(len(self.rows)):
+            if self.rows[i] == row and self.cols[i] == col:
+                return i
+        return None
+
+    def tick(self, nobita_pos, grid, flow_field=None):
+        """
+        Advance every enemy once: chase within range, otherwise patrol
+        Returns the list of (old_pos, new_pos) moves made this tick
+        """
+        now = self.clock.now()
+        if numpy is not None and len(self.rows) >= ENEMY_NUMPY_MIN:
+            due = self._plan_numpy(now, nobita_pos, flow_field)
+        else:
+            due = self._plan(now, nobita_pos, flow_field)
+
+        # Moves stay sequential: each Gian sees the cells the earlier ones took
+        moves = []
+        for i, target in due:
+            row, col = self.rows[i], self.cols[i]
+            if self.modes[i] == MODE_CHASE and flow_field:
+                step = flow_field.next_step(row, col)
+                step = step if step and grid.is_walkable(*step) else None
+            else:
+                step = self._greedy_step(row, col, target, grid)
+
+            if step:
+                self.rows[i], self.cols[i] = step
+                grid.move_occupant((row, col), step, CELL_GIAN)
+                moves.append(((row, col), step))
+
+        return moves
+
+    def _plan(self, now, nobita_pos, flow_field):
+        """
+        Modes, pauses and move timers for every enemy
+        Returns [(index, target)] for the enemies that step this tick
+        """
+        nobita_row, nobita_col = nobita_pos
+        rows, cols, modes, paused = self.rows, self.cols, self.modes, self.paused
+        due = []
+
+        for i in range(len(rows)):
+            row, col = rows[i], cols[i]
+
+            # Chase-range test (true distance when a flow field is shared)
+            if flow_field:
+                distance = flow_field.distance(row, col)
+            else:
+                distance = abs(row - nobita_row) + abs(col - nobita_col)
+            mode = MODE_CHASE if distance is not None and distance <= self.chase_ranges[i] else MODE_PATROL
+            modes[i] = mode
+
+            if paused[i]:
+                if now - self.pause_start[i] > GIAN_PATROL_PAUSE:
+                    paused[i] = 0
+                    if mode == MODE_PATROL:
+                        self.patrol_index[i] = (self.patrol_index[i] + 1) % self.patrol_lengths[i]
+                continue
+
+            if mode == MODE_CHASE:
+                target = nobita_pos
+            else:
+                point = self.patrol_offsets[i] + self.patrol_index[i]
+                target = (self.patrol_rows[point], self.patrol_cols[point])
+
+            if (row, col) == target:
+                if mode == MODE_PATROL:
+                    paused[i] = 1
+                    self.pause_start[i] = now
+                continue
+
+            if now - self.last_move_time[i] < 1.0 / self.speeds[i]:
+                continue
+            self.last_move_time[i] = now
+            due.append((i, target))
+
+        return due
+
+    def _plan_numpy(self, now, nobita_pos, flow_field):
+        """
+        _plan as whole-array operations on zero-copy views of the arrays
+        Same float expressions as _plan, so both paths make the same decisions
+        """
+        nobita_row, nobita_col = nobita_pos
+        rows = numpy.frombuffer(self.rows, dtype=numpy.intc)
+        cols = numpy.frombuffer(self.cols, dtype=numpy.intc)
+        modes = numpy.frombuffer(self.modes, dtype=numpy.uint8)
+        paused = numpy.frombuffer(self.paused, dtype=numpy.uint8)
+        patrol_index = numpy.frombuffer(self.patrol_index, dtype=numpy.intc)
+        pause_start = numpy.frombuffer(self.pause_start, dtype=numpy.float64)
+        last_move_time = numpy.frombuffer(self.last_move_time, dtype=numpy.float64)
+
+        if flow_field:
+            distances = numpy.frombuffer(flow_field.distances, dtype=numpy.intc)
+            distance = distances[rows * flow_field.grid.cols + cols]
+            chase = (distance >= 0) & (distance <= numpy.frombuffer(self.chase_ranges, dtype=numpy.intc))
+        else:
+            distance = numpy.abs(rows - nobita_row) + numpy.abs(cols - nobita_col)
+            chase = distance <= numpy.frombuffer(self.chase_ranges, dtype=numpy.intc)
+        modes[:] = chase
+
+        was_paused = paused != 0
+        resume = was_paused & (now - pause_start > GIAN_PATROL_PAUSE)
+        paused[resume] = 0
+        advance = resume & ~chase
+        lengths = numpy.frombuffer(self.patrol_lengths, dtype=numpy.intc)
+        patrol_index[advance] = (patrol_index[advance] + 1) % lengths[advance]
+
+        point = numpy.frombuffer(self.patrol_offsets, dtype=numpy.intc) + patrol_index
+        target_rows = numpy.where(chase, nobita_row, numpy.frombuffer(self.patrol_rows, dtype=numpy.intc)[point])
+        target_cols = numpy.where(chase, nobita_col, numpy.frombuffer(self.patrol_cols, dtype=numpy.intc)[point])
+
+        arrived = ~was_paused & (rows == target_rows) & (cols == target_cols)
+        stop = arrived & ~chase
+        paused[stop] = 1
+        pause_start[stop] = now
+
+        speeds = numpy.frombuffer(self.speeds, dtype=numpy.float64)
+        due = ~was_paused & ~arrived & ~(now - last_move_time < 1.0 / speeds)
+        last_move_time[due] = now
+
+        return [(i, (int(target_rows[i]), int(target_cols[i]))) for i in numpy.flatnonzero(due).tolist()]
+
+    def _greedy_step(self, row, col, target, grid):
+        """Wall-checked step towards target: closer directions first, then any open one"""
+        target_row, target_col = target
+        directions = []
+
+        if row < target_row:
+            directions.append((1, 0))
+        elif row > target_row:
+            directions.append((-1, 0))
+        if col < target_col:
+            directions.append((0, 1))
+        elif col > target_col:
+            directions.append((0, -1))
+
+        # Preferred directions first, then any free neighbour
+        for dr, dc in directions + [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            if grid.is_walkable(row + dr, col + dc):
+                return (row + dr, col + dc)
+        return None
+
+
+class GianView(Gian):
+    """
+    Thin per-enemy view over EnemyManager arrays
+    Keeps the Gian API (row, col, mode, draw) for rendering and the HUD
+    Every Gian attribute reads the arrays, so inherited code sees live state
+    """
+
+    def __init__(self, manager, index):
+        # No Gian.__init__: all of its state lives in the manager's arrays
+        self.manager = manager
+        self.index = index
+        self.color = COLOR_GIAN
+        self.pause_time = GIAN_PATROL_PAUSE
+
+    @property
+    def clock(self):
+        return self.manager.clock
+
+    @property
+    def patrol_points(self):
+        manager, index = self.manager, self.index
+        offset = manager.patrol_offsets[index]
+        return [(manager.patrol_rows[point], manager.patrol_cols[point])
+                for point in range(offset, offset + manager.patrol_lengths[index])]
+
+    @property
+    def current_target(self):
+        return self.manager.patrol_index[self.index]
+
+    @property
+    def paused(self):
+        return bool(self.manager.paused[self.index])
+
+    @property
+    def pause_start(self):
+        return self.manager.pause_start[self.index] if self.paused else None
+
+    @property
+    def last_move_time(self):
+        return self.manager.last_move_time[self.index]
+
+    @property
+    def row(self):
+        return self.manager.rows[self.index]
+
+    @row.setter
+    def row(self, value):
+        self.manager.rows[self.index] = value
+
+    @property
+    def col(self):
+        return self.manager.cols[self.index]
+
+    @col.setter
+    def col(self, value):
+        self.manager.cols[self.index] = value
+
+    @property
+    def mode(self):
+        return MODE_NAMES[self.manager.modes[self.index]]
+
+    @property
+    def speed(self):
+        return self.manager.speeds[self.index]
+
+    @speed.setter
+    def speed(self, value):
+        self.manager.speeds[self.index] = value
+
+    def update(self, dt, *args):
+        # Enemies are advanced together by EnemyManager.tick
+        pass
@@ -0,0 +1,78 @@
+"""
+Compact A* Exploration Trace
+One bit per cell plus an optional expansion-order log
+A 1M-cell map costs 125 KB for the bitset (+4 bytes per expanded cell with the log)
+"""
+
+from array import array
+
+
+class ExplorationTrace:
+    """
+    Cells expanded by a search
+    - bits: bytearray bitset over cell indices (row * cols + col)
+    - order: array('I') of cell indices in first-expansion order (log=True)
+    - Iterating yields (row, col) in expansion order when logged, index order otherwise
+    """
+
+    def __init__(self, rows, cols, log=True):
+        self.rows = rows
+        self.cols = cols
+        self.bits = bytearray((rows * cols + 7) // 8)
+        self.order = array('I') if log else None
+        self.count = 0
+
+    def add(self, row, col):
+        """Mark a cell expanded; returns False if it already was"""
+        index = row * self.cols + col
+        byte, mask = index >> 3, 1 << (index & 7)
+        if self.bits[byte] & mask:
+            return False
+
+        self.bits[byte] |= mask
+        self.count += 1
+        if self.order is not None:
+            self.order.append(index)
+        return True
+
+    def __contains__(self, pos):
+        row, col = pos
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return False
+        index = row * self.cols + col
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        if self.order is not None:
+            return self.expansions()
+        return self._scan()
+
+    def expansions(self, start=0, stop=None):
+        """(row, col) in expansion order, optionally a slice of the log"""
+        if self.order is None:
+            raise ValueError("Trace was recorded without an expansion log")
+        cols = self.cols
+        for i in range(start, len(self.order) if stop is None else min(stop, len(self.order))):
+            yield divmod(self.order[i], cols)
+
+    def _scan(self):
+        cols = self.cols
+        for byte_index, byte in enumerate(self.bits):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (1 << bit):
+                    yield divmod(byte_index * 8 + bit, cols)
+
+    def clear(self):
+        self.bits = bytearray(len(self.bits))
+        if self.order is not None:
+            self.order = array('I')
+        self.count = 0
+
+    def memory_bytes(self):
+        log_bytes = len(self.order) * self.order.itemsize if self.order is not None else 0
+        return len(self.bits) + log_bytes
@@ -0,0 +1,90 @@
+"""
+Shared Flow Field for Gian Chase
+One BFS from Nobita's cell gives every chaser its next step in O(1)
+"""
+
+from array import array
+from collections import deque
+from constants import *
+
+
+# Direction codes stored per cell (index into FLOW_DIRECTIONS)
+FLOW_DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+NO_DIRECTION = 255
+
+
+class FlowField:
+    """
+    Breadth-first flow field towards a target cell
+    - directions: one byte per cell, the step that gets one cell closer
+    - distances: true walking distance to the target (-1 = unreachable)
+    - Recomputed only when the target changes cell or terrain changes
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.target = None
+        self.terrain_version = None
+        self.directions = bytearray()
+        self.distances = array('i')
+        self.recomputes = 0
+
+    def update(self, target):
+        """Refresh the field for a target; returns True if it was recomputed"""
+        if target == self.target and self.terrain_version == self.grid.terrain_version:
+            return False
+
+        self.target = target
+        self.terrain_version = self.grid.terrain_version
+        self._compute()
+        return True
+
+    def _compute(self):
+        rows, cols = self.grid.rows, self.grid.cols
+        terrain = self.grid.grid
+
+        self.directions = bytearray([NO_DIRECTION]) * (rows * cols)
+        self.distances = array('i', [-1]) * (rows * cols)
+        self.recomputes += 1
+
+        if self.target is None or not self.grid.in_bounds(*self.target):
+            return
+
+        target_row, target_col = self.target
+        self.distances[target_row * cols + target_col] = 0
+        queue = deque([self.target])
+
+        while queue:
+            row, col = queue.popleft()
+            next_dist = self.distances[row * cols + col] + 1
+
+            for code, (dr, dc) in enumerate(FLOW_DIRECTIONS):
+                # Walk outwards; the neighbour steps back the opposite way
+                n_row, n_col = row - dr, col - dc
+                if not (0 <= n_row < rows and 0 <= n_col < cols):
+                    continue
+                if terrain[n_row][n_col] == CELL_WALL:
+                    continue
+
+                index = n_row * cols + n_col
+                if self.distances[index] == -1:
+                    self.distances[index] = next_dist
+                    self.directions[index] = code
+                    queue.append((n_row, n_col))
+
+    def distance(self, row, col):
+        """Walking distance to the target, or None if unreachable"""
+        if not self.grid.in_bounds(row, col):
+            return None
+        dist = self.distances[row * self.grid.cols + col]
+        return dist if dist >= 0 else None
+
+    def next_step(self, row, col):
+        """Cell one step closer to the target, or None at target / unreachable"""
+        if not self.grid.in_bounds(row, col):
+            return None
+        code = self.directions[row * self.grid.cols + col]
+        if code == NO_DIRECTION:
+            return None
+        dr, dc = FLOW_DIRECTIONS[code]
+        return (row + dr, col + dc)
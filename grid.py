@@ -3,12 +3,33 @@ Enhanced Grid with Better Visual Graphics
 Improved cell rendering, gradients, and polish
 """
 
-import pygame
+import copy
+from itertools import chain
+try:
+    import pygame
+except ImportError:
+    # Headless simulation: drawing is unavailable, game rules still work
+    pygame = None
+try:
+    import numpy
+except ImportError:
+    # Optional: without numpy the cell bytes go to pygame as a raw buffer
+    numpy = None
 from constants import *
+from compositor import Layer
+from connectivity import ComponentIndex
+from adjacency import GridGraph
+from exploration import ExplorationTrace
+from run_path import RunLengthPath
 
 
 class Grid:
-    """Enhanced grid with polished graphics"""
+    """
+    Enhanced grid with polished graphics
+    - grid: static terrain (walls, school, gadgets, doors), edited by set_cell
+    - occupancy: sparse {(row, col): CELL_NOBITA / CELL_GIAN} overlay for characters
+    - terrain_version only changes on terrain edits, never on character moves
+    """
 
     def __init__(self, rows=GRID_ROWS, cols=GRID_COLS):
         self.rows = rows
@@ -18,6 +39,7 @@ class Grid:
         self.offset_y = GRID_OFFSET_Y
 
         self.grid = [[CELL_EMPTY for _ in range(cols)] for _ in range(rows)]
+        self.occupancy = {}
 
         self.nobita_pos = None
         self.school_pos = None
@@ -25,40 +47,116 @@ class Grid:
         self.gadget_positions = []
         self.door_positions = []
 
-        self.path = []
-        self.explored = set()
+        self.path = RunLengthPath()
+        self.explored = ExplorationTrace(rows, cols)
+        self.explored_shown = 0       # Expansions revealed so far by the animation
         self.current_path_index = 0
 
+        self.components = ComponentIndex(self)
+        self.graph = GridGraph(self)      # CSR adjacency, patched by set_cell
+        self.terrain_version = 0
+
+        # Copy-on-write snapshots: terrain rows handed to a snapshot are never
+        # mutated, set_cell copies a shared row once before its first write
+        self.version = 0
+        self._row_shared = [False] * rows
+        self._snapshot = None
+
+        # Terrain pixels, rebuilt only when terrain_version changes
+        self.terrain_layer = Layer(self._build_terrain)
+
     def in_bounds(self, row, col):
         return 0 <= row < self.rows and 0 <= col < self.cols
 
     def is_walkable(self, row, col):
         if not self.in_bounds(row, col):
             return False
-        cell = self.grid[row][col]
-        return cell not in [CELL_WALL, CELL_GIAN]
+        return self.grid[row][col] != CELL_WALL and self.occupancy.get((row, col)) != CELL_GIAN
 
     def get_cell(self, row, col):
+        """Character on the cell if any, otherwise its terrain"""
+        if not self.in_bounds(row, col):
+            return None
+        return self.occupancy.get((row, col), self.grid[row][col])
+
+    def get_terrain(self, row, col):
         if not self.in_bounds(row, col):
             return None
         return self.grid[row][col]
 
     def set_cell(self, row, col, cell_type):
-        if self.in_bounds(row, col):
-            self.grid[row][col] = cell_type
-
-            if cell_type == CELL_NOBITA:
-                self.nobita_pos = (row, col)
-            elif cell_type == CELL_SCHOOL:
-                self.school_pos = (row, col)
-            elif cell_type == CELL_GIAN:
-                self.gian_pos = (row, col)
-            elif cell_type == CELL_BAMBOO:
-                if (row, col) not in self.gadget_positions:
-                    self.gadget_positions.append((row, col))
-            elif cell_type == CELL_DOOR:
-                if (row, col) not in self.door_positions:
-                    self.door_positions.append((row, col))
+        """
+        Terrain edit; CELL_NOBITA / CELL_GIAN are routed to the occupancy layer
+        and CELL_EMPTY also removes any character on the cell
+        """
+        if not self.in_bounds(row, col):
+            return
+
+        if cell_type in [CELL_NOBITA, CELL_GIAN]:
+            self.set_occupant(row, col, cell_type)
+            return
+        if cell_type == CELL_EMPTY:
+            self.clear_occupant(row, col)
+        self.set_terrain(row, col, cell_type)
+
+    def set_terrain(self, row, col, cell_type):
+        """Terrain-only edit: any character standing on the cell stays there"""
+        if not self.in_bounds(row, col):
+            return
+
+        old_type = self.grid[row][col]
+        if old_type == cell_type:
+            return
+
+        if self._row_shared[row]:
+            self.grid[row] = list(self.grid[row])
+            self._row_shared[row] = False
+        self.version += 1
+
+        self.grid[row][col] = cell_type
+        self.components.on_cell_changed(row, col, old_type, cell_type)
+        self.graph.on_cell_changed(row, col, old_type, cell_type)
+        self.terrain_version += 1
+
+        if cell_type == CELL_SCHOOL:
+            self.school_pos = (row, col)
+        elif cell_type == CELL_BAMBOO:
+            if (row, col) not in self.gadget_positions:
+                self.gadget_positions.append((row, col))
+        elif cell_type == CELL_DOOR:
+            if (row, col) not in self.door_positions:
+                self.door_positions.append((row, col))
+
+    def set_occupant(self, row, col, cell_type):
+        """Place a character (occupancy only; terrain caches stay valid)"""
+        self.occupancy[(row, col)] = cell_type
+        self.version += 1
+        if cell_type == CELL_NOBITA:
+            self.nobita_pos = (row, col)
+        elif cell_type == CELL_GIAN:
+            self.gian_pos = (row, col)
+
+    def clear_occupant(self, row, col, cell_type=None):
+        """Remove the character on a cell (only if it is cell_type, when given)"""
+        occupant = self.occupancy.get((row, col))
+        if occupant is not None and (cell_type is None or occupant == cell_type):
+            del self.occupancy[(row, col)]
+            self.version += 1
+
+    def move_occupant(self, old_pos, new_pos, cell_type):
+        self.clear_occupant(*old_pos, cell_type)
+        self.set_occupant(*new_pos, cell_type)
+
+    def snapshot(self):
+        """
+        Immutable view of the current cells for background readers
+        O(rows) to take; rows are only copied when the live grid next writes them
+        Call from the thread that mutates the grid
+        """
+        if self._snapshot is None or self._snapshot.version != self.version:
+            self._snapshot = GridSnapshot(self)
+            self._row_shared = [True] * self.rows
+        return self._snapshot
 
     def get_neighbors(self, row, col, include_diagonal=False):
         neighbors = []
@@ -99,35 +197,16 @@ class Grid:
 
     def draw(self, screen):
         """Enhanced grid rendering with better graphics"""
-        for row in range(self.rows):
-            for col in range(self.cols):
-                x = self.offset_x + col * self.cell_size
-                y = self.offset_y + row * self.cell_size
-                cell = self.grid[row][col]
-
-                # Get cell color
-                color = self._get_cell_color(row, col, cell)
-
-                # Draw cell with gradient effect
-                rect = pygame.Rect(x, y, self.cell_size, self.cell_size)
-
-                # Main cell fill
-                pygame.draw.rect(screen, color, rect)
-
-                # Add depth with darker bottom/right edges for walls
-                if cell == CELL_WALL:
-                    # 3D effect for walls
-                    darker = tuple(max(0, c - 30) for c in color)
-                    pygame.draw.line(screen, darker, 
-                                   (x, y + self.cell_size - 1), 
-                                   (x + self.cell_size, y + self.cell_size - 1), 2)
-                    pygame.draw.line(screen, darker,
-                                   (x + self.cell_size - 1, y),
-                                   (x + self.cell_size - 1, y + self.cell_size), 2)
-
-                # Grid lines - subtle
-                grid_color = (180, 180, 180) if cell == CELL_EMPTY else (100, 100, 100)
-                pygame.draw.rect(screen, grid_color, rect, 1)
+        terrain = self.terrain_layer.get((self.terrain_version, self.cell_size))
+        screen.blit(terrain, (self.offset_x, self.offset_y))
+
+        # Sparse occupancy overlay: one cell per character
+        for (row, col), occupant in self.occupancy.items():
+            rect = pygame.Rect(self.offset_x + col * self.cell_size,
+                               self.offset_y + row * self.cell_size,
+                               self.cell_size, self.cell_size)
+            pygame.draw.rect(screen, self._get_cell_color(row, col, occupant), rect)
+            pygame.draw.rect(screen, (100, 100, 100), rect, 1)
 
         # Draw explored cells (A* visualization)
         if EXPLORATION_ANIMATION and self.explored:
@@ -137,6 +216,59 @@ class Grid:
         if self.path:
             self._draw_path_enhanced(screen)
 
+    def _build_terrain(self, key):
+        """
+        Whole terrain in a few C-level operations:
+        cell types -> 8-bit palettized surface (one pixel per cell) ->
+        one transform.scale to CELL_SIZE -> cached grid-line overlay on top
+        """
+        size = (self.cols * self.cell_size, self.rows * self.cell_size)
+        terrain = pygame.Surface(size)
+        terrain.blit(pygame.transform.scale(self._cell_surface(), size), (0, 0))
+        self._draw_grid_lines(terrain)
+        return terrain
+
+    def _cell_surface(self):
+        """Terrain cell types as an 8-bit surface whose palette is the cell colors"""
+        if numpy is not None:
+            cells = pygame.Surface((self.cols, self.rows), depth=8)
+            pygame.surfarray.blit_array(cells, numpy.array(self.grid, dtype=numpy.uint8).T)
+        else:
+            cells = pygame.image.frombuffer(bytearray(chain.from_iterable(self.grid)),
+                                            (self.cols, self.rows), "P")
+        cells.set_palette([self._get_cell_color(0, 0, cell_type)
+                           for cell_type in range(max(MAP_CHARS.values()) + 1)])
+        return cells
+
+    def _draw_grid_lines(self, terrain):
+        """
+        Wall 3D edges, then subtle light lines everywhere (one per row / column
+        edge), then darker borders on non-empty cells; same pixels as drawing
+        each cell with its own border
+        """
+        size = self.cell_size
+        width, height = terrain.get_size()
+        light = (180, 180, 180)
+        filled = [(row, col, cell) for row in range(self.rows)
+                  for col, cell in enumerate(self.grid[row]) if cell != CELL_EMPTY]
+
+        darker = tuple(max(0, c - 30) for c in self._get_cell_color(0, 0, CELL_WALL))
+        for row, col, cell in filled:
+            if cell == CELL_WALL:
+                x, y = col * size, row * size
+                pygame.draw.line(terrain, darker, (x, y + size - 1), (x + size, y + size - 1), 2)
+                pygame.draw.line(terrain, darker, (x + size - 1, y), (x + size - 1, y + size), 2)
+
+        for col in range(self.cols + 1):
+            pygame.draw.line(terrain, light, (col * size - 1, 0), (col * size - 1, height))
+            pygame.draw.line(terrain, light, (col * size, 0), (col * size, height))
+        for row in range(self.rows + 1):
+            pygame.draw.line(terrain, light, (0, row * size - 1), (width, row * size - 1))
+            pygame.draw.line(terrain, light, (0, row * size), (width, row * size))
+
+        for row, col, cell in filled:
+            pygame.draw.rect(terrain, (100, 100, 100), (col * size, row * size, size, size), 1)
+
     def _get_cell_color(self, row, col, cell_type):
         """Get enhanced cell colors"""
         color_map = {
@@ -151,91 +283,200 @@ class Grid:
         return color_map.get(cell_type, COLOR_EMPTY)
 
     def _draw_path_enhanced(self, screen):
-        """Draw path with arrows and gradient"""
+        """Draw path with one line per straight run and a gradient"""
         if len(self.path) < 2:
             return
 
         # Draw path segments
-        for i in range(len(self.path) - 1):
-            start_row, start_col = self.path[i]
-            end_row, end_col = self.path[i + 1]
-
-            start_px, start_py = self.grid_to_pixel(start_row, start_col)
-            end_px, end_py = self.grid_to_pixel(end_row, end_col)
+        for first_index, start, end in self.path.segments():
+            start_px, start_py = self.grid_to_pixel(*start)
+            end_px, end_py = self.grid_to_pixel(*end)
 
-            # Path line with gradient color
-            if i == self.current_path_index:
-                color = COLOR_CURRENT
-                width = 6
-            else:
-                # Fade from cyan to blue along path
-                t = i / len(self.path)
-                color = self._lerp_color(COLOR_PATH, COLOR_NOBITA, t)
-                width = 4
+            # Fade from cyan to blue along path
+            t = first_index / len(self.path)
+            color = self._lerp_color(COLOR_PATH, COLOR_NOBITA, t)
 
-            pygame.draw.line(screen, color, (start_px, start_py), (end_px, end_py), width)
+            pygame.draw.line(screen, color, (start_px, start_py), (end_px, end_py), 4)
 
             # Draw small circles at waypoints
             pygame.draw.circle(screen, color, (start_px, start_py), 3)
 
+        # Highlight the step being walked
+        index = self.current_path_index
+        if 0 <= index < len(self.path) - 1:
+            start_px, start_py = self.grid_to_pixel(*self.path[index])
+            end_px, end_py = self.grid_to_pixel(*self.path[index + 1])
+            pygame.draw.line(screen, COLOR_CURRENT, (start_px, start_py), (end_px, end_py), 6)
+
         # Draw end point
-        if self.path:
-            end_row, end_col = self.path[-1]
-            end_px, end_py = self.grid_to_pixel(end_row, end_col)
-            pygame.draw.circle(screen, COLOR_SUCCESS, (end_px, end_py), 6)
+        end_px, end_py = self.grid_to_pixel(*self.path[-1])
+        pygame.draw.circle(screen, COLOR_SUCCESS, (end_px, end_py), 6)
 
     def _draw_explored(self, screen):
-        """Draw explored cells with fade effect"""
-        for row, col in self.explored:
+        """Draw explored cells, revealed in the order A* expanded them"""
+        self.explored_shown = min(len(self.explored), self.explored_shown + EXPLORATION_REVEAL_RATE)
+
+        s = pygame.Surface((self.cell_size, self.cell_size), pygame.SRCALPHA)
+        s.fill((*COLOR_EXPLORED, 80))
+
+        for row, col in self.explored.expansions(0, self.explored_shown):
             x = self.offset_x + col * self.cell_size
             y = self.offset_y + row * self.cell_size
-
-            s = pygame.Surface((self.cell_size, self.cell_size), pygame.SRCALPHA)
-            s.fill((*COLOR_EXPLORED, 80))
             screen.blit(s, (x, y))
 
+    def is_revealing(self):
+        """True while the exploration animation still has cells to show"""
+        return EXPLORATION_ANIMATION and self.explored_shown < len(self.explored)
+
     def _lerp_color(self, color1, color2, t):
         """Linear interpolation between two colors"""
         return tuple(int(c1 + (c2 - c1) * t) for c1, c2 in zip(color1, color2))
 
+    def set_explored(self, trace):
+        self.explored = trace
+        self.explored_shown = 0
+
     def set_path(self, path):
-        self.path = path
+        self.path = path if isinstance(path, RunLengthPath) else RunLengthPath(path)
         self.current_path_index = 0
 
     def clear_path(self):
-        self.path = []
-        self.explored = set()
+        self.path = RunLengthPath()
+        self.explored = ExplorationTrace(self.rows, self.cols)
+        self.explored_shown = 0
         self.current_path_index = 0
 
     def load_level(self, level_data):
         """Load level from string data"""
         self.grid = [[CELL_EMPTY for _ in range(self.cols)] for _ in range(self.rows)]
+        self.occupancy = {}
+        self._row_shared = [False] * self.rows
+        self.version += 1
         self.gadget_positions = []
         self.door_positions = []
+        self.components.clear_door_pairs()
+        self.components.suspend()
+        self.graph.clear_door_pairs()
+        self.graph.suspend()
 
         for row in range(min(len(level_data), self.rows)):
             for col in range(min(len(level_data[row]), self.cols)):
                 cell = level_data[row][col]
-
-                cell_map = {
-                    '.': CELL_EMPTY,
-                    '#': CELL_WALL,
-                    'N': CELL_NOBITA,
-                    'S': CELL_SCHOOL,
-                    'G': CELL_GIAN,
-                    'B': CELL_BAMBOO,
-                    'D': CELL_DOOR
-                }
-
-                cell_type = cell_map.get(cell, CELL_EMPTY)
+                cell_type = MAP_CHARS.get(cell, CELL_EMPTY)
                 self.set_cell(row, col, cell_type)
 
+        self.components.rebuild()
+        self.graph.rebuild()
+        self.terrain_version += 1
+
+    def add_door_pair(self, pos1, pos2):
+        """Register a teleport pair so connectivity and the graph span both doors"""
+        self.components.add_door_pair(pos1, pos2)
+        self.graph.add_door_pair(pos1, pos2)
+
+    def clear_door_pairs(self):
+        self.components.clear_door_pairs()
+        self.components.rebuild()
+        self.graph.clear_door_pairs()
+        self.graph.rebuild()
+        self.terrain_version += 1
+
     def reset(self):
         self.grid = [[CELL_EMPTY for _ in range(self.cols)] for _ in range(self.rows)]
-        self.path = []
-        self.explored = set()
+        self.occupancy = {}
+        self._row_shared = [False] * self.rows
+        self.version += 1
+        self.path = RunLengthPath()
+        self.explored = ExplorationTrace(self.rows, self.cols)
+        self.explored_shown = 0
         self.nobita_pos = None
         self.school_pos = None
         self.gian_pos = None
         self.gadget_positions = []
         self.door_positions = []
+        self.components.clear_door_pairs()
+        self.components.rebuild()
+        self.graph.clear_door_pairs()
+        self.graph.rebuild()
+        self.terrain_version += 1
+
+
+class GridSnapshot:
+    """
+    Read-only Grid view at one version
+    - Shares terrain rows with the live grid (copy-on-write on the Grid side)
+      and copies the small occupancy overlay
+    - Same read API as Grid, so UltimateAStar / FlowField can plan against it
+    - components.connected() is conservative (always True): the live
+      component index keeps changing, the search itself stays exact
+    """
+
+    def __init__(self, grid):
+        self.rows = grid.rows
+        self.cols = grid.cols
+        self.grid = tuple(grid.grid)
+        self.occupancy = dict(grid.occupancy)
+        self.version = grid.version
+        self.terrain_version = grid.terrain_version
+
+        self.nobita_pos = grid.nobita_pos
+        self.school_pos = grid.school_pos
+        self.gian_pos = grid.gian_pos
+        self.gadget_positions = tuple(grid.gadget_positions)
+        self.door_positions = tuple(grid.door_positions)
+
+        self.components = _OpenComponents()
+        self.door_pairs = tuple(grid.graph.door_pairs)
+        self._graph = None
+        self.explored = None
+
+    @property
+    def graph(self):
+        """Compiled on first use (the live graph is patched in place, not shared)"""
+        if self._graph is None:
+            self._graph = GridGraph(self, self.door_pairs)
+        return self._graph
+
+    def in_bounds(self, row, col):
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def is_walkable(self, row, col):
+        if not self.in_bounds(row, col):
+            return False
+        return self.grid[row][col] != CELL_WALL and self.occupancy.get((row, col)) != CELL_GIAN
+
+    def get_cell(self, row, col):
+        if not self.in_bounds(row, col):
+            return None
+        return self.occupancy.get((row, col), self.grid[row][col])
+
+    def get_terrain(self, row, col):
+        if not self.in_bounds(row, col):
+            return None
+        return self.grid[row][col]
+
+    def set_explored(self, trace):
+        # Search output for the reader, not grid state
+        self.explored = trace
+
+    def with_door_pairs(self, door_pairs):
+        """Same cells with another set of teleport pairs (what-if planning)"""
+        view = copy.copy(self)
+        view.door_pairs = tuple(door_pairs)
+        view.explored = None
+        if view.door_pairs != self.door_pairs:
+            view._graph = None
+        return view
+
+    def add_door_pair(self, pos1, pos2):
+        pass
+
+    def clear_door_pairs(self):
+        pass
+
+
+class _OpenComponents:
+    """Component index stand-in for snapshots: never rules a search out"""
+
+    def connected(self, pos1, pos2):
+        return True
@@ -0,0 +1,201 @@
+"""
+Procedural Level Generator
+Seeded maps in the levels.py format, filtered cheaply before a full solve:
+  1. connectivity check (ComponentIndex, O(1) per query)
+  2. exact game-rule solve (solver.py) only for candidates that pass
+"""
+
+import asyncio
+import math
+import random
+import sys
+import time
+from constants import *
+from grid import Grid
+from solver import GameSolver
+
+
+class LevelGenerator:
+    """
+    Random level factory
+    - Border walls, random interior walls at wall_density
+    - One Nobita, school, bamboo, Gian (with patrol) and door_pairs door pairs
+    - generate() returns a level dict with computed optimal_moves / max_moves
+    """
+
+    def __init__(self, seed=None, rows=10, cols=20, wall_density=0.25,
+                 door_pairs=1, bamboo=True, gian=True):
+        self.rng = random.Random(seed)
+        self.rows = rows
+        self.cols = cols
+        self.wall_density = wall_density
+        self.door_pairs = door_pairs
+        self.bamboo = bamboo
+        self.gian = gian
+
+        # One grid + solver reused for every candidate
+        self.grid = Grid(rows, cols)
+        self.solver = GameSolver()
+
+        self.candidates = 0
+        self.rejected_layout = 0
+        self.rejected_connectivity = 0
+        self.rejected_solve = 0
+
+    def _random_map(self):
+        """Walls only; returns (rows of chars, list of open interior cells)"""
+        cells = [['#'] * self.cols for _ in range(self.rows)]
+        open_cells = []
+
+        for row in range(1, self.rows - 1):
+            for col in range(1, self.cols - 1):
+                if self.rng.random() >= self.wall_density:
+                    cells[row][col] = '.'
+                    open_cells.append((row, col))
+
+        return cells, open_cells
+
+    def _candidate(self):
+        """Random layout or None when there is no room for all pieces"""
+        cells, open_cells = self._random_map()
+        pieces = 2 + self.door_pairs * 2 + int(self.bamboo) + int(self.gian)
+        if len(open_cells) < pieces:
+            return None
+
+        self.rng.shuffle(open_cells)
+        nobita = open_cells.pop()
+
+        # School reasonably far from Nobita
+        min_distance = (self.rows + self.cols) // 2
+        far = [pos for pos in open_cells
+               if abs(pos[0] - nobita[0]) + abs(pos[1] - nobita[1]) >= min_distance]
+        if not far:
+            return None
+        school = far[0]
+        open_cells.remove(school)
+
+        cells[nobita[0]][nobita[1]] = 'N'
+        cells[school[0]][school[1]] = 'S'
+
+        level = {"door_pairs": [], "gian_patrol": [], "gian_speed": GIAN_SPEED}
+
+        for _ in range(self.door_pairs):
+            door1, door2 = open_cells.pop(), open_cells.pop()
+            cells[door1[0]][door1[1]] = 'D'
+            cells[door2[0]][door2[1]] = 'D'
+            level["door_pairs"].append((door1, door2))
+
+        if self.bamboo:
+            bamboo = open_cells.pop()
+            cells[bamboo[0]][bamboo[1]] = 'B'
+
+        if self.gian:
+            # Keep Gian out of Nobita's immediate reach at the start
+            away = [pos for pos in open_cells
+                    if abs(pos[0] - nobita[0]) + abs(pos[1] - nobita[1]) >= 4]
+            if not away:
+                return None
+            gian = away[0]
+            open_cells.remove(gian)
+            cells[gian[0]][gian[1]] = 'G'
+            level["gian_start"] = gian
+            level["gian_speed"] = self.rng.choice([1.5, 2.0])
+
+        level["map"] = ["".join(line) for line in cells]
+        level["nobita"] = nobita
+        level["school"] = school
+        level["open_cells"] = open_cells
+        return level
+
+    def _patrol(self, start, open_cells):
+        """Gian start plus up to three waypoints in Gian's own component"""
+        components = self.grid.components
+        reachable = [pos for pos in open_cells if components.connected(start, pos)]
+        self.rng.shuffle(reachable)
+        return [start] + reachable[:3]
+
+    def generate(self, max_attempts=1000):
+        """Next valid level (dict in levels.py format), or None after max_attempts"""
+        for _ in range(max_attempts):
+            level = self._attempt()
+            if level is not None:
+                return level
+        return None
+
+    async def generate_async(self, max_attempts=1000, yield_every=LEVELGEN_YIELD_EVERY):
+        """generate() for the asyncio loop, yielding every yield_every candidates"""
+        for attempt in range(1, max_attempts + 1):
+            level = self._attempt()
+            if level is not None:
+                return level
+            if attempt % yield_every == 0:
+                await asyncio.sleep(0)
+        return None
+
+    def _attempt(self):
+        """One candidate through both filters; the level dict or None"""
+        self.candidates += 1
+        level = self._candidate()
+        if level is None:
+            self.rejected_layout += 1
+            return None
+
+        self.grid.load_level(level["map"])
+        for door1, door2 in level["door_pairs"]:
+            self.grid.add_door_pair(door1, door2)
+
+        # Cheap filter first: different components can never be solved
+        if not self.grid.components.connected(level["nobita"], level["school"]):
+            self.rejected_connectivity += 1
+            return None
+
+        # Gian's start cell counts as blocked: he may stand in the only corridor
+        solution = self.solver.solve(level["map"], level["door_pairs"],
+                                     blocked=[level["gian_start"]] if self.gian else ())
+        if solution is None:
+            self.rejected_solve += 1
+            return None
+
+        if self.gian:
+            level["gian_patrol"] = self._patrol(level.pop("gian_start"), level["open_cells"])
+
+        optimal = solution["optimal_moves"]
+        level["optimal_moves"] = optimal
+        level["max_moves"] = int(math.ceil(max(optimal + 5, optimal * 1.5)))
+
+        for key in ["nobita", "school", "open_cells"]:
+            level.pop(key)
+        return level
+
+    def generate_many(self, count):
+        """Yield count valid levels"""
+        for _ in range(count):
+            level = self.generate()
+            if level is None:
+                return
+            yield level
+
+    def stats(self):
+        return {
+            "candidates": self.candidates,
+            "rejected_layout": self.rejected_layout,
+            "rejected_connectivity": self.rejected_connectivity,
+            "rejected_solve": self.rejected_solve
+        }
+
+
+if __name__ == "__main__":
+    # python level_gen.py [count] [seed]
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+    generator = LevelGenerator(seed=seed)
+    start = time.perf_counter()
+    levels = list(generator.generate_many(count))
+    elapsed = time.perf_counter() - start
+
+    print(f"✓ {len(levels)} levels in {elapsed:.2f}s "
+          f"({len(levels) / elapsed * 60:.0f} levels/min)")
+    print(f"  {generator.stats()}")
+    if levels:
+        print("\n".join(levels[0]["map"]))
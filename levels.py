@@ -0,0 +1,68 @@
+"""
+Level Definitions
+Map characters: # wall, . empty, N Nobita, S school, G Gian, B bamboo, D door
+"""
+
+LEVELS = {
+    1: {
+        "map": [
+            "####################",
+            "#N........#.......S#",
+            "#.###.....#...G....#",
+            "#.#.#.....#........#",
+            "#.#.#.....#...B....#",
+            "#..................#",
+            "#..................#",
+            "#....D.....D.......#",
+            "#..................#",
+            "####################",
+        ],
+        "max_moves": 40,
+        "optimal_moves": 22,
+        "gian_speed": 1.5,
+        "gian_patrol": [(2, 10), (2, 15), (6, 15), (6, 10)],
+        "door_pairs": [((7, 5), (7, 11))]
+    },
+    2: {
+        "map": [
+            "####################",
+            "#N................D#",
+            "#..####.....####...#",
+            "#..#..B.......G#...#",
+            "#..#...........#...#",
+            "#..#...........#...#",
+            "#..############...D#",
+            "#..................#",
+            "#.................S#",
+            "####################",
+        ],
+        "max_moves": 40,
+        "optimal_moves": 25,
+        "gian_speed": 2.0,
+        "gian_patrol": [(3, 14), (3, 10), (5, 10), (5, 14)],
+        "door_pairs": [( (1, 18),(6, 18) )]
+    },
+    3: {
+        "map": [
+            "####################",
+            "#N.#.....G........S#",
+            "##.#.###.#####.#.#.#",
+            "#..#...#.#...#.#.#.#",
+            "#.##.#.#.#.#B#.#.#.#",
+            "#....#.#...#.#...#.#",
+            "#.####.#####.#####.#",
+            "#D..........D......#",
+            "#..................#",
+            "####################",
+        ],
+        "max_moves": 40,
+        "optimal_moves": 25,
+        "gian_speed": 2.0,
+        # FIX: Better patrol that stays in open areas
+        "gian_patrol": [(1, 10), (3, 10), (5, 10), (5, 2)],
+        "door_pairs": [((7, 1), (7, 12))]
+    }
+}
+
+
+MAX_LEVEL = len(LEVELS)
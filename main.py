@@ -1,110 +1,22 @@
 """
 FIXED - Gian Cannot Move Through Walls
-Wall collision checking for all Gian movement
+Pygame front end: input, rendering and the main loop
+Game rules live in simulation.py
 """
 
+import asyncio
 import pygame
 import sys
 import time
-import math
 from constants import *
-from grid import Grid
-from ultimate_astar_heuristic import UltimateAStar
-from entities import Nobita, School, Gian, BambooCopter, AnywhereDoor
-
-
-class SmartGian(Gian):
-    """
-    FIX: Intelligent Gian that CANNOT move through walls
-    """
-    def __init__(self, row, col, patrol_points, chase_range=8):
-        super().__init__(row, col, patrol_points)
-        self.chase_range = chase_range
-        self.mode = "patrol"
-        self.chase_target = None
-
-    def update(self, dt, nobita_pos, grid):
-        """
-        FIX: Added grid parameter for wall checking
-        """
-        distance = abs(self.row - nobita_pos[0]) + abs(self.col - nobita_pos[1])
-
-        if distance <= self.chase_range:
-            self.mode = "chase"
-            self.chase_target = nobita_pos
-        else:
-            self.mode = "patrol"
-            self.chase_target = None
-
-        if self.paused:
-            if time.time() - self.pause_start > self.pause_time:
-                self.paused = False
-                if self.mode == "patrol":
-                    self.current_target = (self.current_target + 1) % len(self.patrol_points)
-            return
-
-        target = self.chase_target if self.mode == "chase" else self.patrol_points[self.current_target]
-
-        if (self.row, self.col) == target:
-            if self.mode == "patrol":
-                self.paused = True
-                self.pause_start = time.time()
-            return
-
-        current_time = time.time()
-        if current_time - self.last_move_time >= 1.0 / self.speed:
-            self.last_move_time = current_time
-
-            # FIX: Move with wall checking
-            self.move_toward_target(target, grid)
-
-    def move_toward_target(self, target, grid):
-        """
-        FIX: Smart movement that avoids walls
-        Tries to move in direction of target, but only if valid
-        """
-        target_row, target_col = target
-
-        # Try all 4 directions, prioritize those closer to target
-        directions = []
-
-        # Vertical movement
-        if self.row < target_row:
-            directions.append((1, 0, "down"))  # Move down
-        elif self.row > target_row:
-            directions.append((-1, 0, "up"))  # Move up
-
-        # Horizontal movement
-        if self.col < target_col:
-            directions.append((0, 1, "right"))  # Move right
-        elif self.col > target_col:
-            directions.append((0, -1, "left"))  # Move left
-
-        # Try primary directions first
-        for dr, dc, direction in directions:
-            new_row = self.row + dr
-            new_col = self.col + dc
-
-            # FIX: Check if move is valid (not wall, in bounds)
-            if grid.is_walkable(new_row, new_col):
-                self.row = new_row
-                self.col = new_col
-                return  # Success!
-
-        # If primary directions blocked, try other directions
-        all_directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        for dr, dc in all_directions:
-            new_row = self.row + dr
-            new_col = self.col + dc
-
-            if grid.is_walkable(new_row, new_col):
-                # Move to any valid adjacent cell
-                self.row = new_row
-                self.col = new_col
-                return
-
-        # If completely stuck, stay in place
-        # This should rarely happen with good level design
+from text_cache import text_cache
+from compositor import Compositor, Layer
+from entities import BambooCopter
+from simulation import Simulation
+from profiler import FrameProfiler
+from sim_clock import TickClock
+from replay import ReplayRecorder, REPLAY_SEARCH_STARTED, REPLAY_SEARCH_LANDED
+from speculative import WhatIfPlanner
 
 
 class Button:
@@ -118,12 +30,22 @@ class Button:
         self.is_hovered = False
         self.enabled = True
         self.hover_scale = 1.0
+        self.layer = Layer(self._build_surface)
+
+    def target_scale(self):
+        return 1.05 if self.is_hovered and self.enabled else 1.0
 
     def update(self):
-        target_scale = 1.05 if self.is_hovered and self.enabled else 1.0
+        target_scale = self.target_scale()
         self.hover_scale += (target_scale - self.hover_scale) * 0.3
+        # Snap once the easing is visually done so the button counts as idle
+        if abs(target_scale - self.hover_scale) < 0.001:
+            self.hover_scale = target_scale
 
-    def draw(self, screen, font):
+    def is_animating(self):
+        return self.hover_scale != self.target_scale()
+
+    def draw(self, screen, font_size=FONT_SIZE_SMALL):
         self.update()
 
         if not self.enabled:
@@ -138,19 +60,24 @@ class Button:
             int((self.hover_scale - 1.0) * self.rect.height)
         )
 
-        shadow_rect = scaled_rect.copy()
-        shadow_rect.x += 2
-        shadow_rect.y += 2
-        shadow_surface = pygame.Surface((shadow_rect.width, shadow_rect.height), pygame.SRCALPHA)
-        pygame.draw.rect(shadow_surface, (0, 0, 0, 80), shadow_surface.get_rect(), border_radius=10)
-        screen.blit(shadow_surface, shadow_rect)
+        # Shadow, face and label are cached until size, colour or text change
+        key = (scaled_rect.width, scaled_rect.height, color, text_color, self.text, font_size)
+        screen.blit(self.layer.get(key), scaled_rect.topleft)
+
+    def _build_surface(self, key):
+        width, height, color, text_color, text, font_size = key
+        surface = pygame.Surface((width + 2, height + 2), pygame.SRCALPHA)
 
-        pygame.draw.rect(screen, color, scaled_rect, border_radius=10)
-        pygame.draw.rect(screen, BLACK, scaled_rect, 2, border_radius=10)
+        shadow_rect = pygame.Rect(2, 2, width, height)
+        pygame.draw.rect(surface, (0, 0, 0, 80), shadow_rect, border_radius=10)
 
-        text_surf = font.render(self.text, True, text_color)
-        text_rect = text_surf.get_rect(center=scaled_rect.center)
-        screen.blit(text_surf, text_rect)
+        face_rect = pygame.Rect(0, 0, width, height)
+        pygame.draw.rect(surface, color, face_rect, border_radius=10)
+        pygame.draw.rect(surface, BLACK, face_rect, 2, border_radius=10)
+
+        text_surf = text_cache.render(text, font_size, text_color)
+        surface.blit(text_surf, text_surf.get_rect(center=face_rect.center))
+        return surface
 
     def handle_event(self, event):
         if not self.enabled:
@@ -163,51 +90,55 @@ class Button:
         return False
 
 
+# Keyboard bindings while a level is being played
+PLAYING_KEYS = {
+    pygame.K_ESCAPE: ACTION_MENU,
+    pygame.K_SPACE: ACTION_FIND_PATH,
+    pygame.K_a: ACTION_AUTO_MOVE,
+    pygame.K_b: ACTION_TOGGLE_BAMBOO,
+    pygame.K_r: ACTION_RESET,
+    pygame.K_UP: ACTION_UP,
+    pygame.K_DOWN: ACTION_DOWN,
+    pygame.K_LEFT: ACTION_LEFT,
+    pygame.K_RIGHT: ACTION_RIGHT
+}
+
+
 class FixedGame:
-    """Game with Gian wall collision fix"""
+    """Pygame renderer and input layer over the headless Simulation"""
 
-    def __init__(self):
+    def __init__(self, sim_clock=None, save_replay=False):
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption(GAME_TITLE + " - A* Pathfinding Demo")
         self.clock = pygame.time.Clock()
 
-        self.font_title = pygame.font.Font(None, 48)
-        self.font_large = pygame.font.Font(None, 32)
-        self.font_medium = pygame.font.Font(None, 24)
-        self.font_small = pygame.font.Font(None, 18)
-
-        self.grid = Grid()
-        self.astar = UltimateAStar(self.grid)
-
-        self.state = STATE_MENU
-        self.current_level = 1
-        self.max_level = 3
+        # All game rules live in the headless simulation core, stepped in fixed
+        # ticks so a session can be replayed exactly from its recorded actions
+        self.sim = Simulation(clock=sim_clock if sim_clock else TickClock())
+        self.tick_accumulator = 0.0
+        self.recorder = ReplayRecorder()
+        self.save_replay_on_exit = save_replay     # Opt-in: --save-replay
 
-        self.nobita = None
-        self.school = None
-        self.gian = None
-        self.gadgets = []
+        # run_async (web build): searches become tasks that yield to the browser
+        self.async_mode = False
+        self.pending_search = None
 
-        self.moves = 0
-        self.max_moves = 40
-        self.optimal_moves = 20
-        self.start_time = None
-        self.elapsed_time = 0
-
-        self.path = []
-        self.path_index = 0
-        self.is_moving = False
-        self.move_timer = 0
+        self.create_buttons()
+        self.create_layers()
 
-        self.bamboo_available = False
-        self.bamboo_active = False
-        self.door_positions = []
+        # F3 overlay / F4 dump; hidden means the simulation is not timed at all
+        self.profiler = FrameProfiler()
 
-        self.score = 0
-        self.stars = 0
+        # What-if paths (bamboo on/off, each door left out) searched on spare
+        # frame time; toggling bamboo swaps a finished one in without a search
+        self.speculation = WhatIfPlanner(self.sim)
+        self.sim.speculation = self.speculation
 
-        self.create_buttons()
+        # Idle tracking: redraw only when something visible changed
+        self.dirty = True
+        self.last_signature = None
+        self.target_fps = FPS
 
     def create_buttons(self):
         button_y = SCREEN_HEIGHT - 60
@@ -227,345 +158,178 @@ class FixedGame:
         self.buttons = [self.btn_find_path, self.btn_auto_move, 
                        self.btn_toggle_bamboo, self.btn_reset]
 
-    def load_level(self, level_num):
-        levels = {
-            1: {
-                "map": [
-                    "####################",
-                    "#N........#.......S#",
-                    "#.###.....#...G....#",
-                    "#.#.#.....#........#",
-                    "#.#.#.....#...B....#",
-                    "#..................#",
-                    "#..................#",
-                    "#....D.....D.......#",
-                    "#..................#",
-                    "####################",
-                ],
-                "max_moves": 40,
-                "optimal_moves": 22,
-                "gian_speed": 1.5,
-                "gian_patrol": [(2, 10), (2, 15), (6, 15), (6, 10)],
-                "door_pairs": [((7, 5), (7, 11))]
-            },
-            2: {
-                "map": [
-                    "####################",
-                    "#N................D#",
-                    "#..####.....####...#",
-                    "#..#..B.......G#...#",
-                    "#..#...........#...#",
-                    "#..#...........#...#",
-                    "#..############...D#",
-                    "#..................#",
-                    "#.................S#",
-                    "####################",
-                ],
-                "max_moves": 40,
-                "optimal_moves": 25,
-                "gian_speed": 2.0,
-                "gian_patrol": [(3, 14), (3, 10), (5, 10), (5, 14)],
-                "door_pairs": [( (1, 18),(6, 18) )]
-            },
-            3: {
-                "map": [
-                    "####################",
-                    "#N.#.....G........S#",
-                    "##.#.###.#####.#.#.#",
-                    "#..#...#.#...#.#.#.#",
-                    "#.##.#.#.#.#B#.#.#.#",
-                    "#....#.#...#.#...#.#",
-                    "#.####.#####.#####.#",
-                    "#D..........D......#",
-                    "#..................#",
-                    "####################",
-                ],
-                "max_moves": 40,
-                "optimal_moves": 25,
-                "gian_speed": 2.0,
-                # FIX: Better patrol that stays in open areas
-                "gian_patrol": [(1, 10), (3, 10), (5, 10), (5, 2)],
-                "door_pairs": [((7, 1), (7, 12))]
-            }
+        self.button_actions = {
+            self.btn_find_path: ACTION_FIND_PATH,
+            self.btn_auto_move: ACTION_AUTO_MOVE,
+            self.btn_toggle_bamboo: ACTION_TOGGLE_BAMBOO,
+            self.btn_reset: ACTION_RESET
         }
 
-        level_data = levels.get(level_num, levels[1])
-        self.grid.load_level(level_data["map"])
+    @property
+    def grid(self):
+        return self.sim.grid
 
-        self.max_moves = level_data["max_moves"]
-        self.optimal_moves = level_data["optimal_moves"]
+    def load_level(self, level_num):
+        self.sim.load_level(level_num)
 
-        self.nobita = Nobita(*self.grid.nobita_pos)
-        self.school = School(*self.grid.school_pos)
+    def apply_action(self, action):
+        """Single entry point for player input into the simulation (recorded for replays)"""
+        if self.async_mode and action in [ACTION_FIND_PATH, ACTION_TOGGLE_BAMBOO]:
+            # Re-plans never block the event loop in the web build
+            return self.start_search_task(action)
 
-        # FIX: Create SmartGian with wall checking
-        if self.grid.gian_pos:
-            self.gian = SmartGian(*self.grid.gian_pos, level_data["gian_patrol"])
-            self.gian.speed = level_data["gian_speed"]
+        accepted = self.sim.apply_action(action)
+        if accepted:
+            self.recorder.record(self.sim.clock.ticks, action)
+        return accepted
 
-        self.gadgets = []
-        for pos in self.grid.gadget_positions:
-            self.gadgets.append(BambooCopter(*pos))
-        for pos in self.grid.door_positions:
-            self.gadgets.append(AnywhereDoor(*pos))
+    def start_search_task(self, action=ACTION_FIND_PATH):
+        if self.pending_search and not self.pending_search.done():
+            return False
+        self.pending_search = asyncio.ensure_future(self._search_task(action))
+        return True
+
+    async def _search_task(self, action):
+        searches = []
 
-        self.astar.door_positions = []
-        self.door_positions = level_data.get("door_pairs", [])
-        for door1, door2 in self.door_positions:
-            self.astar.add_door_pair(door1, door2)
+        def started(search):
+            # Replays begin the same search at this tick, against the same Gian
+            searches.append(search)
+            self.recorder.record(self.sim.clock.ticks, action | REPLAY_SEARCH_STARTED)
+
+        if action == ACTION_TOGGLE_BAMBOO:
+            applied = await self.sim.toggle_bamboo_async(started)
+        else:
+            applied = await self.sim.find_path_async(started=started)
 
-        self.moves = 0
-        self.path = []
-        self.is_moving = False
-        self.start_time = time.time()
-        self.bamboo_available = False
-        self.bamboo_active = False
-        self.state = STATE_PLAYING
+        if applied:
+            # Landed search, or applied directly (speculative path, nothing to re-plan)
+            landed = searches and searches[-1].applied
+            self.recorder.record(self.sim.clock.ticks,
+                                 action | REPLAY_SEARCH_LANDED if landed else action)
+            self.dirty = True
 
     def handle_events(self):
+        sim = self.sim
+
         for event in pygame.event.get():
+            # Any input (including hover and window events) may change the picture
+            self.dirty = True
+
             if event.type == pygame.QUIT:
                 return False
 
             for button in self.buttons:
                 if button.handle_event(event):
-                    if button == self.btn_find_path:
-                        self.find_path()
-                    elif button == self.btn_auto_move:
-                        self.auto_move()
-                    elif button == self.btn_toggle_bamboo:
-                        self.toggle_bamboo()
-                    elif button == self.btn_reset:
-                        self.reset_level()
+                    self.apply_action(self.button_actions[button])
+
+            if event.type == pygame.KEYDOWN and event.key in [pygame.K_F3, pygame.K_F4]:
+                self.handle_profiler_key(event)
+                continue
 
             if event.type == pygame.KEYDOWN:
-                if self.state == STATE_MENU:
+                if sim.state == STATE_MENU:
                     if event.key == pygame.K_RETURN:
-                        self.load_level(1)
-
-                elif self.state in [STATE_PLAYING, STATE_PATHFINDING]:
-                    if event.key == pygame.K_ESCAPE:
-                        self.state = STATE_MENU
-                    elif event.key == pygame.K_SPACE:
-                        self.find_path()
-                    elif event.key == pygame.K_a:
-                        self.auto_move()
-                    elif event.key == pygame.K_b:
-                        self.toggle_bamboo()
-                    elif event.key == pygame.K_r:
-                        self.reset_level()
-                    elif not self.is_moving:
-                        row, col = self.nobita.row, self.nobita.col
-                        moved = False
-
-                        if event.key == pygame.K_UP:
-                            row -= 1
-                            moved = True
-                        elif event.key == pygame.K_DOWN:
-                            row += 1
-                            moved = True
-                        elif event.key == pygame.K_LEFT:
-                            col -= 1
-                            moved = True
-                        elif event.key == pygame.K_RIGHT:
-                            col += 1
-                            moved = True
-
-                        if moved:
-                            self.move_nobita(row, col)
-
-                elif self.state in [STATE_WON, STATE_LOST]:
+                        self.apply_action(ACTION_START)
+
+                elif sim.state in [STATE_PLAYING, STATE_PATHFINDING]:
+                    if event.key in PLAYING_KEYS:
+                        self.apply_action(PLAYING_KEYS[event.key])
+
+                elif sim.state in [STATE_WON, STATE_LOST]:
                     if event.key == pygame.K_r:
-                        self.reset_level()
-                    elif event.key == pygame.K_n and self.state == STATE_WON:
-                        self.next_level()
+                        self.apply_action(ACTION_RESET)
+                    elif event.key == pygame.K_n:
+                        self.apply_action(ACTION_NEXT_LEVEL)
                     elif event.key == pygame.K_ESCAPE:
-                        self.state = STATE_MENU
+                        self.apply_action(ACTION_MENU)
 
         return True
 
-    def toggle_bamboo(self):
-        if not self.bamboo_available:
-            print("❌ Collect Bamboo Copter first!")
-            return
-
-        self.bamboo_active = not self.bamboo_active
-        self.astar.set_bamboo_collected(self.bamboo_active)
-
-        if self.bamboo_active:
-            print("🚁 Bamboo ACTIVATED - Moves cost 0.5x!")
+    def handle_profiler_key(self, event):
+        if event.key == pygame.K_F3:
+            self.profiler.active = not self.profiler.active
+            self.sim.profiler = self.profiler if self.profiler.active else None
+            if not self.profiler.active:
+                self.profiler.clear()
         else:
-            print("Bamboo DEACTIVATED - Normal cost")
+            # F4 - CSV, Shift+F4 - JSON
+            extension = "json" if event.mod & pygame.KMOD_SHIFT else "csv"
+            path = self.profiler.dump_timestamped(extension)
+            print(f"📊 Profile written to {path} ({self.profiler.count} frames)")
 
-        if self.path:
-            self.find_path()
+    def update(self, dt):
+        # Fixed-timestep accumulator: the simulation only ever sees SIM_TICK steps
+        self.tick_accumulator += min(dt, MAX_FRAME_TIME)
+        while self.tick_accumulator >= SIM_TICK:
+            self.sim.step(SIM_TICK)
+            self.tick_accumulator -= SIM_TICK
 
-    def find_path(self):
-        if self.is_moving:
+    def speculate(self, frame_started):
+        """
+        A slice of what-if planning in the frame's spare time
+        - Idle frames (nothing redrawn) get the full SPECULATE_BUDGET
+        - Busy frames only get what is left of their 1 / FPS budget
+        - Nothing while a real search task is running
+        """
+        if self.pending_search and not self.pending_search.done():
             return
 
-        start = (self.nobita.row, self.nobita.col)
-        goal = (self.school.row, self.school.col)
-
-        if not self.grid.in_bounds(*start) or not self.grid.in_bounds(*goal):
-            print("❌ Invalid start or goal position!")
+        budget = SPECULATE_BUDGET
+        if self.target_fps != IDLE_FPS:
+            budget = min(budget, 1.0 / FPS - (time.perf_counter() - frame_started))
+        if budget <= 0:
             return
 
-        print(f"\n🔍 Finding path with A*...")
-
-        try:
-            self.path = self.astar.find_path(start, goal, record_exploration=True)
+        if self.speculation.step(budget):
+            # New cost comparison for the HUD
+            self.dirty = True
 
-            if self.path:
-                self.grid.set_path(self.path)
-                self.state = STATE_PATHFINDING
+    def save_replay(self, path=REPLAY_PATH):
+        return self.recorder.save(path, self.sim.clock.ticks, self.sim)
 
-                path_steps = len(self.path) - 1
-                effective_moves = path_steps * (0.5 if self.bamboo_active else 1.0)
-
-                print(f"✓ Path: {path_steps} steps = {effective_moves:.1f} moves")
-            else:
-                print("❌ No path found!")
-        except Exception as e:
-            print(f"❌ A* Error: {e}")
-            self.path = []
-
-    def auto_move(self):
-        if self.path and not self.is_moving:
-            self.is_moving = True
-            self.path_index = 1
-            self.move_timer = 0
-
-    def check_door_teleport(self, row, col):
-        for door1, door2 in self.door_positions:
-            if (row, col) == door1:
-                print(f"🚪 TELEPORTED! {door1} → {door2}")
-                return door2
-            elif (row, col) == door2:
-                print(f"🚪 TELEPORTED! {door2} → {door1}")
-                return door1
-        return None
-
-    def move_nobita(self, new_row, new_col):
-        if not self.grid.is_walkable(new_row, new_col):
-            return False
+    def fast_forward(self, seconds, tick=SIM_TICK):
+        self.sim.fast_forward(seconds, tick)
 
-        move_cost = 0.5 if self.bamboo_active else 1.0
-
-        if self.moves + move_cost > self.max_moves:
-            self.state = STATE_LOST
-            print(f"❌ OUT OF MOVES!")
-            return False
-
-        self.grid.set_cell(self.nobita.row, self.nobita.col, CELL_EMPTY)
-        self.nobita.row = new_row
-        self.nobita.col = new_col
-        self.grid.set_cell(new_row, new_col, CELL_NOBITA)
-
-        self.moves += move_cost
-
-        for gadget in self.gadgets:
-            if not gadget.collected and isinstance(gadget, BambooCopter):
-                if (new_row, new_col) == (gadget.row, gadget.col):
-                    gadget.collected = True
-                    self.bamboo_available = True
-                    print("✨ Bamboo Copter collected! Press B to toggle")
-
-        door_dest = self.check_door_teleport(new_row, new_col)
-        if door_dest:
-            self.grid.set_cell(new_row, new_col, CELL_EMPTY)
-            self.nobita.row, self.nobita.col = door_dest
-            self.grid.set_cell(*door_dest, CELL_NOBITA)
-            self.moves += move_cost
-
-        if (self.nobita.row, self.nobita.col) == (self.school.row, self.school.col):
-            self.calculate_score()
-            self.state = STATE_WON
-            return True
-
-        if self.gian and (self.nobita.row, self.nobita.col) == (self.gian.row, self.gian.col):
-            self.state = STATE_LOST
-            print("❌ CAUGHT BY GIAN!")
-            return False
+    def create_layers(self):
+        """Cached UI layers; each rebuilds only when its key changes"""
+        self.compositor = Compositor()
+        self.compositor.add_layer('background', self._build_background)
+        self.compositor.add_layer('status', self._build_status)
+        self.compositor.add_layer('win', self._build_win_overlay)
+        self.compositor.add_layer('lose', self._build_lose_overlay)
 
-        return True
+    def draw(self):
+        self.compositor.blit(self.screen, 'background', None)
 
-    def calculate_score(self):
-        if self.moves <= self.optimal_moves:
-            self.stars = 3
-        elif self.moves <= self.optimal_moves + 5:
-            self.stars = 2
+        if self.sim.state == STATE_MENU:
+            self.draw_menu()
         else:
-            self.stars = 1
-
-        self.score = int((self.max_moves - self.moves) * 10 + self.stars * 100)
-
-    def update(self, dt):
-        if self.state in [STATE_PLAYING, STATE_PATHFINDING]:
-            # FIX: Pass grid to Gian for wall checking
-            if self.gian:
-                old_pos = (self.gian.row, self.gian.col)
-                nobita_pos = (self.nobita.row, self.nobita.col)
-
-                # FIX: Pass grid parameter!
-                self.gian.update(dt, nobita_pos, self.grid)
-
-                new_pos = (self.gian.row, self.gian.col)
-
-                if old_pos != new_pos:
-                    self.grid.set_cell(*old_pos, CELL_EMPTY)
-                    self.grid.set_cell(*new_pos, CELL_GIAN)
-                    self.grid.gian_pos = new_pos
-
-                    if new_pos == nobita_pos:
-                        self.state = STATE_LOST
-
-            if self.is_moving and self.path:
-                self.move_timer += dt
-
-                if self.move_timer >= MOVEMENT_SPEED:
-                    self.move_timer = 0
-
-                    if self.path_index < len(self.path):
-                        next_pos = self.path[self.path_index]
-                        success = self.move_nobita(*next_pos)
+            self.draw_game()
 
-                        if not success:
-                            self.is_moving = False
-                            self.grid.clear_path()
-                        else:
-                            self.grid.current_path_index = self.path_index
-                            self.path_index += 1
-                    else:
-                        self.is_moving = False
-                        self.grid.clear_path()
+        if self.profiler.active:
+            self.profiler.draw(self.screen)
 
-            if self.start_time:
-                self.elapsed_time = time.time() - self.start_time
+        pygame.display.flip()
 
-    def draw(self):
+    def _build_background(self, key):
+        surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
         for y in range(SCREEN_HEIGHT):
             color_ratio = y / SCREEN_HEIGHT
             r = int(230 + (240 - 230) * color_ratio)
             g = int(230 + (245 - 230) * color_ratio)
             b = int(250 + (255 - 250) * color_ratio)
-            pygame.draw.line(self.screen, (r, g, b), (0, y), (SCREEN_WIDTH, y))
-
-        if self.state == STATE_MENU:
-            self.draw_menu()
-        else:
-            self.draw_game()
-
-        pygame.display.flip()
+            pygame.draw.line(surface, (r, g, b), (0, y), (SCREEN_WIDTH, y))
+        return surface
 
     def draw_menu(self):
-        title_shadow = self.font_title.render("NOBITA'S LATE DASH", True, (100, 100, 100))
-        title = self.font_title.render("NOBITA'S LATE DASH", True, COLOR_NOBITA)
+        title_shadow = text_cache.render("NOBITA'S LATE DASH", FONT_SIZE_TITLE, (100, 100, 100))
+        title = text_cache.render("NOBITA'S LATE DASH", FONT_SIZE_TITLE, COLOR_NOBITA)
 
         self.screen.blit(title_shadow, title_shadow.get_rect(center=(SCREEN_WIDTH//2 + 2, 152)))
         self.screen.blit(title, title.get_rect(center=(SCREEN_WIDTH//2, 150)))
 
-        subtitle = self.font_large.render("A* Pathfinding with Heuristics", True, (80, 80, 100))
+        subtitle = text_cache.render("A* Pathfinding with Heuristics", FONT_SIZE_LARGE, (80, 80, 100))
         self.screen.blit(subtitle, subtitle.get_rect(center=(SCREEN_WIDTH//2, 200)))
 
         instructions = [
@@ -584,167 +348,298 @@ class FixedGame:
         y = 260
         for line in instructions:
             if line == "PRESS ENTER TO START":
-                size = self.font_medium
+                size = FONT_SIZE_MEDIUM
                 color = COLOR_NOBITA
             elif line == "FIX: Gian cannot move through walls!":
-                size = self.font_small
+                size = FONT_SIZE_SMALL
                 color = COLOR_SUCCESS
             else:
-                size = self.font_small
+                size = FONT_SIZE_SMALL
                 color = (60, 60, 80)
 
-            text = size.render(line, True, color)
+            text = text_cache.render(line, size, color)
             self.screen.blit(text, text.get_rect(center=(SCREEN_WIDTH//2, y)))
             y += 30
 
     def draw_game(self):
         self.grid.draw(self.screen)
 
-        for gadget in self.gadgets:
+        for gadget in self.sim.gadgets:
             if not gadget.collected:
                 gadget.draw(self.screen, self.grid)
 
-        self.nobita.draw(self.screen, self.grid)
-        self.school.draw(self.screen, self.grid)
-        if self.gian:
-            self.gian.draw(self.screen, self.grid)
+        self.sim.nobita.draw(self.screen, self.grid)
+        self.sim.school.draw(self.screen, self.grid)
+        for gian in self.sim.gians:
+            gian.draw(self.screen, self.grid)
 
         self.draw_status()
         self.draw_buttons()
 
-        if self.state == STATE_WON:
+        if self.sim.state == STATE_WON:
             self.draw_win_screen()
-        elif self.state == STATE_LOST:
+        elif self.sim.state == STATE_LOST:
             self.draw_lose_screen()
 
     def draw_status(self):
-        gradient_surface = pygame.Surface((SCREEN_WIDTH, 75), pygame.SRCALPHA)
+        key = (self.sim.current_level, self.sim.max_level, self.sim.moves, self.sim.max_moves,
+               self.sim.bamboo_available, self.sim.bamboo_active, len(self.sim.door_positions),
+               self.sim.gian.mode if self.sim.gian else None, self.speculation.summary())
+        self.compositor.blit(self.screen, 'status', key)
+
+    def _build_status(self, key):
+        (current_level, max_level, moves, max_moves,
+         bamboo_available, bamboo_active, door_pairs, gian_mode, what_if) = key
+        moves_on, moves_off, door_saving = what_if
+
+        surface = pygame.Surface((SCREEN_WIDTH, 77), pygame.SRCALPHA)
         for y in range(75):
             alpha = 200 + int(55 * (1 - y / 75))
-            pygame.draw.line(gradient_surface, (35, 35, 55, alpha), (0, y), (SCREEN_WIDTH, y))
-        self.screen.blit(gradient_surface, (0, 0))
-        pygame.draw.line(self.screen, (80, 80, 100), (0, 75), (SCREEN_WIDTH, 75), 2)
+            pygame.draw.line(surface, (35, 35, 55, alpha), (0, y), (SCREEN_WIDTH, y))
+        pygame.draw.line(surface, (80, 80, 100), (0, 75), (SCREEN_WIDTH, 75), 2)
 
-        level_text = self.font_medium.render(f"Level {self.current_level}/{self.max_level}", True, WHITE)
-        self.screen.blit(level_text, (15, 12))
+        level_text = text_cache.render(f"Level {current_level}/{max_level}", FONT_SIZE_MEDIUM, WHITE)
+        surface.blit(level_text, (15, 12))
 
-        ratio = self.moves / self.max_moves
+        ratio = moves / max_moves
         moves_color = COLOR_SUCCESS if ratio < 0.6 else (COLOR_BAMBOO if ratio < 0.85 else COLOR_DANGER)
 
-        moves_text = self.font_large.render(f"{self.moves:.1f}/{self.max_moves}", True, moves_color)
-        self.screen.blit(moves_text, (15, 42))
+        moves_text = text_cache.render(f"{moves:.1f}/{max_moves}", FONT_SIZE_LARGE, moves_color)
+        surface.blit(moves_text, (15, 42))
 
-        if self.bamboo_available:
-            status = "🚁 ON" if self.bamboo_active else "🚁 OFF"
-            color = COLOR_BAMBOO if self.bamboo_active else (150, 150, 150)
-            detail = "(0.5x cost)" if self.bamboo_active else "(Press B)"
+        if bamboo_available:
+            status = "🚁 ON" if bamboo_active else "🚁 OFF"
+            color = COLOR_BAMBOO if bamboo_active else (150, 150, 150)
+            detail = "(0.5x cost)" if bamboo_active else "(Press B)"
+            if moves_on is not None and moves_off is not None:
+                # Precomputed both ways: the player sees the difference before pressing B
+                detail = f"ON {moves_on:.1f} / OFF {moves_off:.1f} moves"
         else:
             status = "🚁 Not found"
             color = (120, 120, 120)
             detail = "(Find yellow)"
 
-        bamboo_text = self.font_medium.render(status, True, color)
-        self.screen.blit(bamboo_text, (280, 20))
-        detail_text = self.font_small.render(detail, True, (200, 200, 200))
-        self.screen.blit(detail_text, (280, 48))
+        bamboo_text = text_cache.render(status, FONT_SIZE_MEDIUM, color)
+        surface.blit(bamboo_text, (280, 20))
+        detail_text = text_cache.render(detail, FONT_SIZE_SMALL, (200, 200, 200))
+        surface.blit(detail_text, (280, 48))
+
+        if door_pairs:
+            door_text = text_cache.render(f"🚪 {door_pairs} Door pair(s)", FONT_SIZE_SMALL, COLOR_DOOR)
+            surface.blit(door_text, (520, 20))
+            if door_saving is not None:
+                saving = "required" if door_saving == float("inf") else f"saves {door_saving:.1f} moves"
+                saving_text = text_cache.render(saving, FONT_SIZE_SMALL, (200, 200, 200))
+                surface.blit(saving_text, (520, 48))
 
-        if self.door_positions:
-            door_text = self.font_small.render(f"🚪 {len(self.door_positions)} Door pair(s)", True, COLOR_DOOR)
-            self.screen.blit(door_text, (520, 20))
+        if gian_mode:
+            mode_color = COLOR_DANGER if gian_mode == "chase" else COLOR_SUCCESS
+            mode_text = text_cache.render(f"Gian: {gian_mode.upper()}", FONT_SIZE_MEDIUM, mode_color)
+            surface.blit(mode_text, (750, 28))
 
-        if self.gian:
-            mode_color = COLOR_DANGER if self.gian.mode == "chase" else COLOR_SUCCESS
-            mode_text = self.font_medium.render(f"Gian: {self.gian.mode.upper()}", True, mode_color)
-            self.screen.blit(mode_text, (750, 28))
+        return surface
 
     def draw_buttons(self):
-        if self.bamboo_available:
-            self.btn_toggle_bamboo.text = "Bamboo ON" if self.bamboo_active else "Bamboo OFF"
+        if self.sim.bamboo_available:
+            self.btn_toggle_bamboo.text = "Bamboo ON" if self.sim.bamboo_active else "Bamboo OFF"
             self.btn_toggle_bamboo.enabled = True
         else:
             self.btn_toggle_bamboo.text = "Find Bamboo"
             self.btn_toggle_bamboo.enabled = False
 
-        self.btn_auto_move.enabled = len(self.path) > 0 and not self.is_moving
+        self.btn_auto_move.enabled = len(self.sim.path) > 0 and not self.sim.is_moving
 
         for button in self.buttons:
-            button.draw(self.screen, self.font_small)
+            button.draw(self.screen, FONT_SIZE_SMALL)
 
     def draw_win_screen(self):
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(230)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        key = (self.sim.stars, self.sim.moves, self.sim.max_moves, self.sim.score,
+               self.sim.current_level < self.sim.max_level)
+        self.compositor.blit(self.screen, 'win', key)
+
+    def _build_win_overlay(self, key):
+        stars, moves, max_moves, score, has_next_level = key
 
-        win = self.font_title.render("LEVEL COMPLETE!", True, COLOR_SUCCESS)
+        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 230))
+
+        win = text_cache.render("LEVEL COMPLETE!", FONT_SIZE_TITLE, COLOR_SUCCESS)
         win_rect = win.get_rect(center=(SCREEN_WIDTH//2, 240))
 
         for i in range(3):
             glow = pygame.Surface((win.get_width() + i*10, win.get_height() + i*10), pygame.SRCALPHA)
             glow_rect = glow.get_rect(center=win_rect.center)
             pygame.draw.rect(glow, (*COLOR_SUCCESS, 30 - i*10), glow.get_rect(), border_radius=15)
-            self.screen.blit(glow, glow_rect)
+            overlay.blit(glow, glow_rect)
 
-        self.screen.blit(win, win_rect)
+        overlay.blit(win, win_rect)
 
         for i in range(3):
-            color = COLOR_BAMBOO if i < self.stars else (80, 80, 80)
-            pygame.draw.circle(self.screen, color, (SCREEN_WIDTH//2 - 60 + i*60, 320), 20)
-            pygame.draw.circle(self.screen, BLACK, (SCREEN_WIDTH//2 - 60 + i*60, 320), 20, 2)
+            color = COLOR_BAMBOO if i < stars else (80, 80, 80)
+            pygame.draw.circle(overlay, color, (SCREEN_WIDTH//2 - 60 + i*60, 320), 20)
+            pygame.draw.circle(overlay, BLACK, (SCREEN_WIDTH//2 - 60 + i*60, 320), 20, 2)
+
+        stats = text_cache.render(f"Moves: {moves:.1f} / {max_moves}", FONT_SIZE_LARGE, WHITE)
+        overlay.blit(stats, stats.get_rect(center=(SCREEN_WIDTH//2, 390)))
 
-        stats = self.font_large.render(f"Moves: {self.moves:.1f} / {self.max_moves}", True, WHITE)
-        self.screen.blit(stats, stats.get_rect(center=(SCREEN_WIDTH//2, 390)))
+        score_text = text_cache.render(f"Score: {score}", FONT_SIZE_LARGE, COLOR_BAMBOO)
+        overlay.blit(score_text, score_text.get_rect(center=(SCREEN_WIDTH//2, 430)))
 
-        score_text = self.font_large.render(f"Score: {self.score}", True, COLOR_BAMBOO)
-        self.screen.blit(score_text, score_text.get_rect(center=(SCREEN_WIDTH//2, 430)))
+        controls = "N - Next | R - Replay | ESC - Menu" if has_next_level else "Complete! | R - Replay | ESC - Menu"
+        ctrl_text = text_cache.render(controls, FONT_SIZE_MEDIUM, WHITE)
+        overlay.blit(ctrl_text, ctrl_text.get_rect(center=(SCREEN_WIDTH//2, 490)))
 
-        controls = "N - Next | R - Replay | ESC - Menu" if self.current_level < self.max_level else "Complete! | R - Replay | ESC - Menu"
-        ctrl_text = self.font_medium.render(controls, True, WHITE)
-        self.screen.blit(ctrl_text, ctrl_text.get_rect(center=(SCREEN_WIDTH//2, 490)))
+        return overlay
 
     def draw_lose_screen(self):
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(230)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        self.compositor.blit(self.screen, 'lose', None)
 
-        lose = self.font_title.render("GAME OVER", True, COLOR_DANGER)
-        self.screen.blit(lose, lose.get_rect(center=(SCREEN_WIDTH//2, 280)))
+    def _build_lose_overlay(self, key):
+        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 230))
+
+        lose = text_cache.render("GAME OVER", FONT_SIZE_TITLE, COLOR_DANGER)
+        overlay.blit(lose, lose.get_rect(center=(SCREEN_WIDTH//2, 280)))
 
         hint1 = "🚁 Collect Bamboo to reduce move cost!"
         hint2 = "🚪 Use Doors to teleport and save moves!"
 
-        hint1_text = self.font_medium.render(hint1, True, COLOR_BAMBOO)
-        hint2_text = self.font_medium.render(hint2, True, COLOR_DOOR)
+        hint1_text = text_cache.render(hint1, FONT_SIZE_MEDIUM, COLOR_BAMBOO)
+        hint2_text = text_cache.render(hint2, FONT_SIZE_MEDIUM, COLOR_DOOR)
 
-        self.screen.blit(hint1_text, hint1_text.get_rect(center=(SCREEN_WIDTH//2, 360)))
-        self.screen.blit(hint2_text, hint2_text.get_rect(center=(SCREEN_WIDTH//2, 400)))
+        overlay.blit(hint1_text, hint1_text.get_rect(center=(SCREEN_WIDTH//2, 360)))
+        overlay.blit(hint2_text, hint2_text.get_rect(center=(SCREEN_WIDTH//2, 400)))
 
         controls = "R - Retry | ESC - Menu"
-        ctrl_text = self.font_medium.render(controls, True, WHITE)
-        self.screen.blit(ctrl_text, ctrl_text.get_rect(center=(SCREEN_WIDTH//2, 470)))
+        ctrl_text = text_cache.render(controls, FONT_SIZE_MEDIUM, WHITE)
+        overlay.blit(ctrl_text, ctrl_text.get_rect(center=(SCREEN_WIDTH//2, 470)))
+
+        return overlay
 
     def reset_level(self):
-        self.load_level(self.current_level)
+        self.sim.reset_level()
 
     def next_level(self):
-        if self.current_level < self.max_level:
-            self.current_level += 1
-            self.load_level(self.current_level)
+        self.sim.next_level()
+
+    def frame_signature(self):
+        """Everything that changes the picture, as a cheap comparable value"""
+        sim = self.sim
+        return (
+            sim.state, sim.current_level,
+            sim.nobita.row if sim.nobita else None,
+            sim.nobita.col if sim.nobita else None,
+            sim.moves, sim.bamboo_available, sim.bamboo_active,
+            len(sim.path) if sim.path else 0, self.grid.current_path_index,
+            sim.enemies.rows.tobytes(), sim.enemies.cols.tobytes(),
+            bytes(sim.enemies.modes)
+        )
+
+    def is_animating(self):
+        """Continuous animations that need every frame"""
+        if self.profiler.active:
+            return True
+        if any(button.is_animating() for button in self.buttons):
+            return True
+        if self.sim.is_moving:
+            return True
+        if self.sim.state != STATE_MENU and self.grid.is_revealing():
+            return True
+        if self.sim.state in [STATE_PLAYING, STATE_PATHFINDING]:
+            # Spinning Bamboo Copter
+            for gadget in self.sim.gadgets:
+                if not gadget.collected and isinstance(gadget, BambooCopter):
+                    return True
+        return False
+
+    def needs_redraw(self):
+        signature = self.frame_signature()
+        changed = self.dirty or signature != self.last_signature or self.is_animating()
+        self.last_signature = signature
+        self.dirty = False
+        return changed
+
+    def render(self):
+        # Idle: skip draw + flip and drop to a low tick rate
+        if self.needs_redraw():
+            self.draw()
+            self.target_fps = FPS
         else:
-            self.state = STATE_MENU
+            self.target_fps = IDLE_FPS
+
+    def frame(self, dt):
+        started = time.perf_counter()
+        running = self.handle_events()
+        self.update(dt)
+        self.render()
+        self.speculate(started)
+        return running
+
+    def profiled_frame(self, dt):
+        """Same as frame() with each phase timed into the profiler"""
+        profiler = self.profiler
+        profiler.begin_frame(dt)
+
+        started = time.perf_counter()
+        running = self.handle_events()
+        events_done = time.perf_counter()
+        self.update(dt)
+        update_done = time.perf_counter()
+        self.render()
+        draw_done = time.perf_counter()
+        self.speculate(started)
+
+        profiler.add(PHASE_EVENTS, events_done - started)
+        profiler.add(PHASE_UPDATE, update_done - events_done)
+        profiler.add(PHASE_DRAW, draw_done - update_done)
+        profiler.add(PHASE_SPECULATION, time.perf_counter() - draw_done)
+        return running
+
+    def tick_frame(self):
+        dt = self.clock.tick(self.target_fps) / 1000.0
+        if self.profiler.active:
+            return self.profiled_frame(dt)
+        return self.frame(dt)
 
     def run(self):
         running = True
         while running:
-            dt = self.clock.tick(FPS) / 1000.0
-            running = self.handle_events()
-            self.update(dt)
-            self.draw()
-        pygame.quit()
+            running = self.tick_frame()
+
+        self.shutdown()
         sys.exit()
 
+    async def run_async(self):
+        """Main loop for the pygbag web build: yields to the browser every frame"""
+        self.async_mode = True
+        running = True
+        while running:
+            running = self.tick_frame()
+            await asyncio.sleep(0)
+
+        if self.pending_search:
+            self.pending_search.cancel()
+        self.shutdown()
+
+    def shutdown(self):
+        if self.save_replay_on_exit and self.recorder.events:
+            print(f"🎬 Replay saved to {self.save_replay()} ({self.recorder.events} actions)")
+
+        stats = text_cache.stats()
+        print(f"📝 Text cache: {stats['hits']} hits / {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%}), {stats['entries']} cached")
+        pygame.quit()
+
+
+async def main():
+    game = FixedGame(save_replay="--save-replay" in sys.argv)
+    await game.run_async()
+
 
 if __name__ == "__main__":
-    game = FixedGame()
-    game.run()
+    # The browser build (pygbag, sys.platform "emscripten") must use the asyncio loop
+    if sys.platform == "emscripten" or "--async" in sys.argv:
+        asyncio.run(main())
+    else:
+        game = FixedGame(save_replay="--save-replay" in sys.argv)
+        game.run()
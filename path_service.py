@@ -0,0 +1,306 @@
+"""
+Local Pathfinding Service
+Keeps levels and reverse-search results warm for headless tools and editors
+Batches of queries sharing a goal are answered by one reverse Dijkstra
+
+Protocol: one JSON object per line in, one per line out
+  {"op": "query", "queries": [{"id": 1, "level": 1, "start": [r, c],
+                               "goal": [r, c], "options": {"bamboo": false}}]}
+  {"op": "load_level", "level": "custom", "data": {...levels.py format...}}
+  {"op": "stats"}
+
+  python path_service.py serve [--port 8765 | --unix /tmp/nobita.sock]
+"""
+
+import argparse
+import heapq
+import json
+import os
+import socket
+import socketserver
+import threading
+from array import array
+from collections import OrderedDict
+from constants import *
+from grid import Grid
+from levels import LEVELS
+from ultimate_astar_heuristic import UltimateAStar
+
+
+class LoadedLevel:
+    """A level kept warm: grid, component index and a quiet searcher"""
+
+    def __init__(self, level_data):
+        level_map = level_data["map"]
+        rows = max(len(level_map), 1)
+        cols = max(len(line) for line in level_map)
+
+        self.grid = Grid(rows, cols)
+        self.grid.load_level(level_map)
+        self.astar = UltimateAStar(self.grid)
+        self.astar.verbose = False
+        for door1, door2 in level_data.get("door_pairs", []):
+            self.astar.add_door_pair(tuple(door1), tuple(door2))
+
+
+class PathService:
+    """
+    Query engine behind the socket server (usable in-process too)
+    - Levels are loaded once; LEVELS are preloaded
+    - answer(queries) groups by (level, goal, bamboo) and runs one reverse
+      Dijkstra per group; results are cached LRU until the level is replaced
+    """
+
+    def __init__(self, levels=None, cache_size=SERVICE_CACHE_SIZE):
+        self.levels = {}
+        self.cache_size = cache_size
+        self.searches = OrderedDict()
+        self.queries = 0
+        self.reverse_searches = 0
+        self.cache_hits = 0
+
+        for level_id, level_data in (levels if levels is not None else LEVELS).items():
+            self.load_level(level_id, level_data)
+
+    def load_level(self, level_id, level_data):
+        key = str(level_id)
+        self.levels[key] = LoadedLevel(level_data)
+        for search_key in [k for k in self.searches if k[0] == key]:
+            del self.searches[search_key]
+
+    def reverse_search(self, level_id, goal, bamboo):
+        """
+        Dijkstra outwards from goal over reversed edges (same costs as find_path)
+        Returns (distances, next cell index) arrays, cached per (level, goal, bamboo)
+        """
+        key = (str(level_id), goal, bamboo)
+        cached = self.searches.get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            self.searches.move_to_end(key)
+            return cached
+
+        level = self.levels[str(level_id)]
+        grid, astar = level.grid, level.astar
+        astar.bamboo_collected = bamboo
+        self.reverse_searches += 1
+
+        cols = grid.cols
+        distances = array('d', [float("inf")]) * (grid.rows * cols)
+        next_cell = array('i', [-1]) * (grid.rows * cols)
+        teleport_cost = 0.5 if bamboo else 1.0
+
+        partners = {}
+        for door1, door2 in astar.door_positions:
+            partners[door1] = door2
+            partners[door2] = door1
+
+        distances[goal[0] * cols + goal[1]] = 0.0
+        frontier = [(0.0, goal)]
+
+        while frontier:
+            dist, cell = heapq.heappop(frontier)
+            index = cell[0] * cols + cell[1]
+            if dist > distances[index]:
+                continue
+
+            # Predecessors: cells whose forward step lands on `cell`
+            predecessors = []
+            for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                prev = (cell[0] + dr, cell[1] + dc)
+                if grid.is_walkable(*prev):
+                    predecessors.append((prev, astar.get_movement_cost(prev, cell)))
+            if cell in partners and grid.is_walkable(*partners[cell]):
+                predecessors.append((partners[cell], teleport_cost))
+
+            for prev, cost in predecessors:
+                prev_index = prev[0] * cols + prev[1]
+                new_dist = dist + cost
+                if new_dist < distances[prev_index]:
+                    distances[prev_index] = new_dist
+                    next_cell[prev_index] = index
+                    heapq.heappush(frontier, (new_dist, prev))
+
+        result = (distances, next_cell)
+        self.searches[key] = result
+        if len(self.searches) > self.cache_size:
+            self.searches.popitem(last=False)
+        return result
+
+    def answer(self, queries):
+        """Results in query order: {"id", "path", "cost", "steps"} or {"id", "error"}"""
+        results = [None] * len(queries)
+        groups = {}
+
+        for position, query in enumerate(queries):
+            self.queries += 1
+            if not isinstance(query, dict):
+                results[position] = {"id": None, "error": "query must be an object"}
+                continue
+            level_id = str(query.get("level"))
+            if level_id not in self.levels:
+                results[position] = {"id": query.get("id"), "error": f"unknown level {level_id}"}
+                continue
+            options = query.get("options", {})
+            if not isinstance(options, dict):
+                results[position] = {"id": query.get("id"), "error": "options must be an object"}
+                continue
+            bamboo = bool(options.get("bamboo", False))
+            goal = tuple(query["goal"])
+            groups.setdefault((level_id, goal, bamboo), []).append(position)
+
+        for (level_id, goal, bamboo), positions in groups.items():
+            grid = self.levels[level_id].grid
+            if not grid.in_bounds(*goal) or not grid.is_walkable(*goal):
+                for position in positions:
+                    results[position] = {"id": queries[position].get("id"), "path": None,
+                                         "cost": None, "steps": None}
+                continue
+
+            distances, next_cell = self.reverse_search(level_id, goal, bamboo)
+            for position in positions:
+                query = queries[position]
+                results[position] = self._walk(grid, tuple(query["start"]), goal,
+                                               distances, next_cell)
+                results[position]["id"] = query.get("id")
+
+        return results
+
+    def _walk(self, grid, start, goal, distances, next_cell):
+        cols = grid.cols
+        none = {"path": None, "cost": None, "steps": None}
+        if not grid.in_bounds(*start):
+            return none
+
+        index = start[0] * cols + start[1]
+        if distances[index] == float("inf"):
+            return none
+
+        path = [start]
+        while index != goal[0] * cols + goal[1]:
+            index = next_cell[index]
+            path.append(divmod(index, cols))
+        return {"path": [list(cell) for cell in path], "cost": distances[start[0] * cols + start[1]],
+                "steps": len(path) - 1}
+
+    def handle(self, request):
+        """One protocol message in, one response dict out"""
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "bad request: expected a JSON object"}
+
+        op = request.get("op", "query")
+        try:
+            if op == "query":
+                queries = request.get("queries", [])
+                if not isinstance(queries, list):
+                    return {"ok": False, "error": "bad request: queries must be a list"}
+                return {"ok": True, "results": self.answer(queries)}
+            if op == "load_level":
+                self.load_level(request["level"], request["data"])
+                return {"ok": True}
+            if op == "stats":
+                return {"ok": True, "stats": self.stats()}
+            return {"ok": False, "error": f"unknown op {op}"}
+        except (KeyError, TypeError, ValueError) as e:
+            return {"ok": False, "error": f"bad request: {e}"}
+
+    def stats(self):
+        return {
+            "levels": sorted(self.levels),
+            "queries": self.queries,
+            "reverse_searches": self.reverse_searches,
+            "cache_hits": self.cache_hits,
+            "cached_searches": len(self.searches)
+        }
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                response = {"ok": False, "error": f"invalid JSON: {e}"}
+            else:
+                # One batch at a time: the warm caches are shared by all clients
+                with self.server.lock:
+                    response = self.server.service.handle(request)
+            self.wfile.write((json.dumps(response) + "\n").encode())
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service, port=SERVICE_PORT, unix_path=None):
+    """
+    One thread per connected client (tools keep their connection open);
+    batches are answered one at a time under a lock
+    """
+    if unix_path:
+        if os.path.exists(unix_path):
+            os.unlink(unix_path)
+        server = _UnixServer(unix_path, _RequestHandler)
+    else:
+        server = _TCPServer((SERVICE_HOST, port), _RequestHandler)
+    server.service = service
+    server.lock = threading.Lock()
+    return server
+
+
+class PathClient:
+    """Minimal client: one persistent connection, one JSON line per request"""
+
+    def __init__(self, port=SERVICE_PORT, unix_path=None):
+        if unix_path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(unix_path)
+        else:
+            self.sock = socket.create_connection((SERVICE_HOST, port))
+        self.reader = self.sock.makefile("rb")
+
+    def request(self, message):
+        self.sock.sendall((json.dumps(message) + "\n").encode())
+        response = json.loads(self.reader.readline())
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error"))
+        return response
+
+    def query(self, queries):
+        return self.request({"op": "query", "queries": queries})["results"]
+
+    def load_level(self, level_id, level_data):
+        self.request({"op": "load_level", "level": level_id, "data": level_data})
+
+    def stats(self):
+        return self.request({"op": "stats"})["stats"]
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local pathfinding service")
+    parser.add_argument("command", choices=["serve"])
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--unix", help="serve on a Unix socket instead of localhost TCP")
+    args = parser.parse_args()
+
+    server = make_server(PathService(), args.port, args.unix)
+    print(f"🛰 Path service on {args.unix or f'{SERVICE_HOST}:{args.port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.unix and os.path.exists(args.unix):
+            os.unlink(args.unix)
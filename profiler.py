@@ -0,0 +1,147 @@
+"""
+Frame-Time Profiler
+Per-phase timings in a fixed-size ring buffer, an overlay graph and CSV/JSON export
+Nothing is timed while the overlay is hidden
+"""
+
+import csv
+import json
+import time
+from array import array
+try:
+    import pygame
+except ImportError:
+    # Headless simulation: drawing is unavailable, game rules still work
+    pygame = None
+from constants import *
+from text_cache import text_cache
+
+
+# Phases recorded per frame (milliseconds)
+PHASES = [PHASE_FRAME, PHASE_EVENTS, PHASE_UPDATE, PHASE_GIAN_AI, PHASE_PATHFINDING, PHASE_DRAW,
+          PHASE_SPECULATION]
+
+PHASE_COLORS = {
+    PHASE_FRAME: WHITE,
+    PHASE_EVENTS: (100, 200, 255),
+    PHASE_UPDATE: COLOR_SUCCESS,
+    PHASE_GIAN_AI: COLOR_GIAN,
+    PHASE_PATHFINDING: COLOR_DOOR,
+    PHASE_DRAW: COLOR_BAMBOO,
+    PHASE_SPECULATION: (190, 140, 255)
+}
+
+
+class FrameProfiler:
+    """
+    Ring buffer of per-phase frame timings
+    - One array('d') per phase, capacity frames long, overwritten oldest-first
+    - begin_frame() opens a slot; add(phase, seconds) accumulates into it
+    - active is False while the overlay is hidden (callers skip timing entirely)
+    """
+
+    def __init__(self, capacity=PROFILER_FRAMES):
+        self.capacity = capacity
+        self.samples = {phase: array('d', [0.0]) * capacity for phase in PHASES}
+        self.head = -1
+        self.count = 0
+        self.active = False
+
+        # Overlay text is refreshed every PROFILER_REFRESH frames, not every frame
+        self.frames_since_refresh = PROFILER_REFRESH
+        self.stat_lines = []
+
+    def begin_frame(self, frame_seconds):
+        """Open the next slot; frame_seconds is the time since the previous frame"""
+        self.head = (self.head + 1) % self.capacity
+        for values in self.samples.values():
+            values[self.head] = 0.0
+        self.samples[PHASE_FRAME][self.head] = frame_seconds * 1000
+        self.count = min(self.count + 1, self.capacity)
+        self.frames_since_refresh += 1
+
+    def add(self, phase, seconds):
+        if self.head >= 0:
+            self.samples[phase][self.head] += seconds * 1000
+
+    def series(self, phase):
+        """Recorded values for a phase, oldest first"""
+        values = self.samples[phase]
+        if self.count < self.capacity:
+            return list(values[:self.count])
+        start = self.head + 1
+        return list(values[start:]) + list(values[:start])
+
+    def percentiles(self, phase, fractions=(0.5, 0.99)):
+        ordered = sorted(self.series(phase))
+        if not ordered:
+            return [0.0 for _ in fractions]
+        return [ordered[min(len(ordered) - 1, int(round(f * (len(ordered) - 1))))]
+                for f in fractions]
+
+    def clear(self):
+        self.head = -1
+        self.count = 0
+
+    def dump(self, path):
+        """Write the buffer to path; format chosen by extension (.csv or .json)"""
+        columns = {phase: self.series(phase) for phase in PHASES}
+
+        if path.endswith(".json"):
+            summary = {}
+            for phase in PHASES:
+                p50, p99 = self.percentiles(phase)
+                summary[phase] = {"p50_ms": p50, "p99_ms": p99}
+            with open(path, "w") as f:
+                json.dump({"frames": self.count, "summary": summary, "samples_ms": columns},
+                          f, indent=2)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["frame_index"] + [f"{phase}_ms" for phase in PHASES])
+                for index in range(self.count):
+                    writer.writerow([index] + [f"{columns[phase][index]:.4f}" for phase in PHASES])
+
+        return path
+
+    def dump_timestamped(self, extension="csv"):
+        return self.dump(time.strftime(f"profile_%Y%m%d_%H%M%S.{extension}"))
+
+    def draw(self, screen, x=SCREEN_WIDTH - 330, y=85, width=320, height=70):
+        """Frame-time graph plus per-phase p50/p99 lines"""
+        if self.frames_since_refresh >= PROFILER_REFRESH:
+            self._refresh_stats()
+
+        panel_height = height + 28 + len(self.stat_lines) * 18
+        panel = pygame.Surface((width, panel_height), pygame.SRCALPHA)
+        panel.fill((20, 20, 30, 200))
+
+        # Frame-time graph, scaled so the 60 FPS budget sits at half height
+        budget_ms = 1000 / FPS
+        scale = (height / 2) / budget_ms
+        frames = self.series(PHASE_FRAME)
+        if len(frames) > 1:
+            step = width / (self.capacity - 1)
+            points = [(i * step, height + 4 - min(height, value * scale))
+                      for i, value in enumerate(frames)]
+            pygame.draw.lines(panel, WHITE, False, points, 1)
+        budget_y = height + 4 - budget_ms * scale
+        pygame.draw.line(panel, COLOR_SUCCESS, (0, budget_y), (width, budget_y), 1)
+
+        title = text_cache.render("Frame time (F3 hide, F4 dump)", 16, (200, 200, 200))
+        panel.blit(title, (6, height + 8))
+
+        for i, surface in enumerate(self.stat_lines):
+            panel.blit(surface, (6, height + 28 + i * 18))
+
+        screen.blit(panel, (x, y))
+
+    def _refresh_stats(self):
+        # Rendered straight from the font: changing numbers would churn the text cache
+        font = text_cache.font(16)
+        self.stat_lines = []
+        for phase in PHASES:
+            p50, p99 = self.percentiles(phase)
+            text = f"{phase:12} p50 {p50:6.2f} ms   p99 {p99:6.2f} ms"
+            self.stat_lines.append(font.render(text, True, PHASE_COLORS[phase]))
+        self.frames_since_refresh = 0
@@ -0,0 +1,197 @@
+"""
+Compact Binary Replays
+Records (tick delta, action) pairs instead of state snapshots
+Replays re-simulate headless on a TickClock and verify the final result
+
+File layout (all integers are unsigned LEB128 varints):
+  magic "NLDR", version byte, tick rate (ticks per second)
+  events:  tick delta, action code        (repeated)
+           asyncio run mode: searches are logged as action | REPLAY_SEARCH_STARTED
+           when they begin and action | REPLAY_SEARCH_LANDED when their path is
+           applied, so playback searches against the same Gian positions
+  end:     tick delta, ACTION_END
+  footer:  state index, lost reason index, level, moves * 2, score
+"""
+
+import sys
+import time
+from constants import *
+from sim_clock import TickClock
+from simulation import Simulation
+
+
+REPLAY_MAGIC = b"NLDR"
+REPLAY_VERSION = 2
+REPLAY_VERSIONS = [1, 2]       # Version 1: no search events
+ACTION_END = 0
+
+# Flags on the action code (ACTION_* values stay below 0x40)
+REPLAY_SEARCH_STARTED = 0x40
+REPLAY_SEARCH_LANDED = 0x80
+REPLAY_ACTION_MASK = 0x3F
+
+# Enum-like strings stored as small indices
+REPLAY_STATES = [STATE_MENU, STATE_PLAYING, STATE_PATHFINDING, STATE_WON, STATE_LOST]
+REPLAY_LOST_REASONS = [None, LOST_CAUGHT, LOST_OUT_OF_MOVES]
+
+
+def write_varint(buffer, value):
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data, offset):
+    """Returns (value, new offset)"""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def summarize(sim):
+    """Final result compared on playback"""
+    return {
+        "state": sim.state,
+        "lost_reason": sim.lost_reason,
+        "level": sim.current_level,
+        "moves": sim.moves,
+        "score": sim.score
+    }
+
+
+class ReplayRecorder:
+    """
+    Action log for one session
+    - record(tick, action) for every accepted player action
+    - finish(tick, sim) appends the end marker and the expected result
+    """
+
+    def __init__(self, tick_rate=FPS):
+        self.tick_rate = tick_rate
+        self.buffer = bytearray(REPLAY_MAGIC)
+        self.buffer.append(REPLAY_VERSION)
+        write_varint(self.buffer, tick_rate)
+        self.last_tick = 0
+        self.events = 0
+
+    def record(self, tick, action):
+        write_varint(self.buffer, tick - self.last_tick)
+        self.buffer.append(action)
+        self.last_tick = tick
+        self.events += 1
+
+    def finish(self, tick, sim):
+        """Complete replay bytes (the recorder can keep recording afterwards)"""
+        data = bytearray(self.buffer)
+        write_varint(data, tick - self.last_tick)
+        data.append(ACTION_END)
+
+        result = summarize(sim)
+        write_varint(data, REPLAY_STATES.index(result["state"]))
+        write_varint(data, REPLAY_LOST_REASONS.index(result["lost_reason"]))
+        write_varint(data, result["level"])
+        write_varint(data, int(round(result["moves"] * 2)))
+        write_varint(data, result["score"])
+        return bytes(data)
+
+    def save(self, path, tick, sim):
+        with open(path, "wb") as f:
+            f.write(self.finish(tick, sim))
+        return path
+
+
+def decode(data):
+    """Returns (tick_rate, [(tick, action), ...], end tick, expected result)"""
+    if data[:4] != REPLAY_MAGIC:
+        raise ValueError("Not a replay file")
+    if data[4] not in REPLAY_VERSIONS:
+        raise ValueError(f"Unsupported replay version {data[4]}")
+
+    tick_rate, offset = read_varint(data, 5)
+    events = []
+    tick = 0
+    while True:
+        delta, offset = read_varint(data, offset)
+        action = data[offset]
+        offset += 1
+        tick += delta
+        if action == ACTION_END:
+            break
+        events.append((tick, action))
+
+    footer = []
+    for _ in range(5):
+        value, offset = read_varint(data, offset)
+        footer.append(value)
+
+    expected = {
+        "state": REPLAY_STATES[footer[0]],
+        "lost_reason": REPLAY_LOST_REASONS[footer[1]],
+        "level": footer[2],
+        "moves": footer[3] / 2,
+        "score": footer[4]
+    }
+    return tick_rate, events, tick, expected
+
+
+def play(data, levels=None):
+    """Re-simulate a replay as fast as possible; returns the finished Simulation"""
+    tick_rate, events, end_tick, _ = decode(data)
+    tick = 1.0 / tick_rate
+    sim = Simulation(clock=TickClock(tick=tick), levels=levels, verbose=False)
+    search = None
+
+    for event_tick, action in events:
+        while sim.clock.ticks < event_tick:
+            sim.step(tick)
+
+        if action & REPLAY_SEARCH_STARTED:
+            # Run it to completion now; the live search finished later against this snapshot
+            toggle = action & REPLAY_ACTION_MASK == ACTION_TOGGLE_BAMBOO
+            search = sim.begin_search(not sim.bamboo_active if toggle else sim.bamboo_active)
+            if search:
+                search.run()
+        elif action & REPLAY_SEARCH_LANDED:
+            if search:
+                sim.finish_search(search)
+            search = None
+        else:
+            sim.apply_action(action)
+
+    while sim.clock.ticks < end_tick:
+        sim.step(tick)
+
+    return sim
+
+
+def verify(data, levels=None):
+    """Returns (ok, expected, actual)"""
+    expected = decode(data)[3]
+    actual = summarize(play(data, levels))
+    return actual == expected, expected, actual
+
+
+if __name__ == "__main__":
+    # python replay.py replay1.nldr [replay2.nldr ...]
+    paths = sys.argv[1:] or [REPLAY_PATH]
+    failures = 0
+    start = time.perf_counter()
+
+    for path in paths:
+        with open(path, "rb") as f:
+            ok, expected, actual = verify(f.read())
+        if not ok:
+            failures += 1
+            print(f"❌ {path}: expected {expected}, got {actual}")
+
+    elapsed = time.perf_counter() - start
+    print(f"{'✓' if not failures else '❌'} {len(paths) - failures}/{len(paths)} replays "
+          f"verified in {elapsed:.2f}s")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,109 @@
+"""
+Run-Length Encoded Paths
+A path is stored as runs of identical steps instead of one tuple per cell
+Long straight corridors cost one run, not hundreds of tuples
+"""
+
+from array import array
+from bisect import bisect_right
+
+
+class RunLengthPath:
+    """
+    Path of (row, col) cells as runs: (start cell, step, length)
+    - Each run repeats one step (dr, dc) length times; door teleports are
+      runs of length 1 with a long step, so any cell list round-trips exactly
+    - path[i] is O(log runs), iteration and to_list() are O(cells)
+    - segments() yields one straight line per run for drawing
+    """
+
+    def __init__(self, points=()):
+        self.run_offsets = array('i')   # Index of each run's first cell
+        self.run_rows = array('i')
+        self.run_cols = array('i')
+        self.run_dr = array('i')
+        self.run_dc = array('i')
+        self.run_lengths = array('i')
+        self.length = 0
+
+        points = list(points)
+        if not points:
+            return
+
+        self.length = len(points)
+        if len(points) == 1:
+            # Single cell: a zero-length run keeps the start cell
+            self._add_run(0, points[0], (0, 0), 0)
+            return
+
+        run_start = 0
+        step = None
+        for i in range(1, len(points)):
+            delta = (points[i][0] - points[i - 1][0], points[i][1] - points[i - 1][1])
+            if delta != step:
+                if step is not None:
+                    self._add_run(run_start, points[run_start], step, i - 1 - run_start)
+                run_start = i - 1
+                step = delta
+        self._add_run(run_start, points[run_start], step, len(points) - 1 - run_start)
+
+    def _add_run(self, offset, start, step, length):
+        self.run_offsets.append(offset)
+        self.run_rows.append(start[0])
+        self.run_cols.append(start[1])
+        self.run_dr.append(step[0])
+        self.run_dc.append(step[1])
+        self.run_lengths.append(length)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("path index out of range")
+
+        # Last run starting at or before index (runs share their boundary cell)
+        run = max(0, bisect_right(self.run_offsets, index) - 1)
+        steps = index - self.run_offsets[run]
+        return (self.run_rows[run] + self.run_dr[run] * steps,
+                self.run_cols[run] + self.run_dc[run] * steps)
+
+    def __iter__(self):
+        if not self.length:
+            return
+        yield (self.run_rows[0], self.run_cols[0])
+        for run in range(len(self.run_offsets)):
+            row, col = self.run_rows[run], self.run_cols[run]
+            dr, dc = self.run_dr[run], self.run_dc[run]
+            for _ in range(self.run_lengths[run]):
+                row += dr
+                col += dc
+                yield (row, col)
+
+    def __eq__(self, other):
+        if isinstance(other, (RunLengthPath, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def segments(self):
+        """(first index, start cell, end cell) for every run"""
+        for run in range(len(self.run_offsets)):
+            length = self.run_lengths[run]
+            if not length:
+                continue
+            row, col = self.run_rows[run], self.run_cols[run]
+            yield (self.run_offsets[run], (row, col),
+                   (row + self.run_dr[run] * length, col + self.run_dc[run] * length))
+
+    def runs(self):
+        return len(self.run_offsets)
+
+    def to_list(self):
+        return list(self)
+
+    def __repr__(self):
+        return f"RunLengthPath({self.length} cells, {self.runs()} runs)"
@@ -0,0 +1,42 @@
+"""
+Simulation Clocks
+WallClock follows real time, TickClock only moves when the game steps it
+"""
+
+import time
+from constants import *
+
+
+class WallClock:
+    """Real time (default for interactive play)"""
+
+    def now(self):
+        return time.time()
+
+    def advance(self, dt):
+        # Real time advances on its own
+        pass
+
+
+class TickClock:
+    """
+    Deterministic clock driven by fixed ticks
+    - now() only changes when advance() is called
+    - Lets headless runs go thousands of times faster than real time
+    """
+
+    def __init__(self, tick=SIM_TICK, start=0.0):
+        self.tick = tick
+        self.time = start
+        self.ticks = 0
+
+    def now(self):
+        return self.time
+
+    def advance(self, dt=None):
+        self.time += self.tick if dt is None else dt
+        self.ticks += 1
+
+
+# Shared default for entities created without an explicit clock
+wall_clock = WallClock()
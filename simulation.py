@@ -0,0 +1,542 @@
+"""
+Headless Simulation Core
+Game rules (levels, moves, gadgets, Gian, scoring) without pygame
+FixedGame in main.py is a thin renderer over this
+"""
+
+import asyncio
+import time
+from constants import *
+from grid import Grid
+from ultimate_astar_heuristic import UltimateAStar
+from sim_clock import WallClock
+from flow_field import FlowField
+from enemies import EnemyManager
+from entities import Nobita, School, BambooCopter, AnywhereDoor
+from levels import LEVELS, MAX_LEVEL
+from solver import GameSolver
+from run_path import RunLengthPath
+
+
+# Direction of each movement action
+ACTION_DIRECTIONS = {
+    ACTION_UP: (-1, 0),
+    ACTION_DOWN: (1, 0),
+    ACTION_LEFT: (0, -1),
+    ACTION_RIGHT: (0, 1)
+}
+
+
+class PlannedSearch:
+    """
+    One search begun by Simulation.begin_search
+    advance() steps the search generator; path is set once it returns False
+    """
+
+    def __init__(self, key, endpoints, bamboo, snapshot, searcher, generator):
+        self.key = key
+        self.endpoints = endpoints
+        self.bamboo = bamboo
+        self.snapshot = snapshot
+        self.searcher = searcher
+        self.generator = generator
+        self.path = None
+        self.done = False
+        self.applied = False
+
+    def advance(self):
+        """One slice of the search; True while there is more to do"""
+        try:
+            next(self.generator)
+            return True
+        except StopIteration as finished:
+            self.path = finished.value
+            self.done = True
+            return False
+
+    def run(self):
+        while self.advance():
+            pass
+
+
+class Simulation:
+    """
+    Pure-Python game state with a step/apply-action API
+    - step(dt): advance Gians, auto-move and the clock
+    - apply_action(action): player input (ACTION_* codes)
+    """
+
+    def __init__(self, clock=None, levels=None, verbose=True):
+        # Simulation time source: real time by default, TickClock for headless runs
+        self.clock = clock if clock else WallClock()
+        self.levels = levels if levels else LEVELS
+        self.verbose = verbose
+
+        self.create_world(GRID_ROWS, GRID_COLS)
+
+        self.state = STATE_MENU
+        self.current_level = 1
+        self.max_level = len(self.levels) if levels else MAX_LEVEL
+
+        self.nobita = None
+        self.school = None
+        self.gian = None
+        self.gians = []
+        self.enemies = EnemyManager(self.clock)
+        self.gadgets = []
+
+        self.moves = 0
+        self.max_moves = 40
+        self.optimal_moves = 20
+        self.solver = GameSolver()    # Exact optimal_moves per level (memoized)
+        self.start_time = None
+        self.elapsed_time = 0
+
+        self.path = []
+        self.path_index = 0
+        self.is_moving = False
+        self.move_timer = 0
+
+        self.bamboo_available = False
+        self.bamboo_active = False
+        self.door_positions = []
+
+        self.score = 0
+        self.stars = 0
+        self.lost_reason = None
+        self.level_serial = 0         # Bumped on every (re)load, detects stale async results
+
+        # Optional FrameProfiler (profiler.py); None means nothing is timed
+        self.profiler = None
+
+        # Optional WhatIfPlanner (speculative.py); find_path takes its finished paths
+        self.speculation = None
+
+    def log(self, message):
+        if self.verbose:
+            print(message)
+
+    def create_world(self, rows, cols):
+        """Grid plus the searchers bound to it"""
+        self.grid = Grid(rows, cols)
+        self.astar = UltimateAStar(self.grid)
+        self.astar.verbose = self.verbose
+        self.flow_field = FlowField(self.grid)
+
+    def load_level(self, level_num, level_data=None):
+        """Load a level by number, or an explicit level dict (same format as LEVELS)"""
+        if level_data is None:
+            level_data = self.levels.get(level_num, self.levels[1])
+        self.current_level = level_num
+
+        # Maps larger than the default screen grid get a grid of their own
+        level_map = level_data["map"]
+        rows = max(GRID_ROWS, len(level_map))
+        cols = max(GRID_COLS, max(len(line) for line in level_map))
+        if (rows, cols) != (self.grid.rows, self.grid.cols):
+            self.create_world(rows, cols)
+
+        self.grid.load_level(level_map)
+
+        # Star thresholds from the exact solver; the hand-tuned value is only a fallback
+        self.max_moves = level_data["max_moves"]
+        solution = self.solver.solve_level(level_data)
+        self.optimal_moves = solution["optimal_moves"] if solution else level_data["optimal_moves"]
+
+        self.nobita = Nobita(*self.grid.nobita_pos)
+        self.school = School(*self.grid.school_pos)
+
+        # All Gians live in one struct-of-arrays manager (wall-checked movement)
+        self.enemies = EnemyManager(self.clock)
+        if self.grid.gian_pos:
+            self.enemies.add(*self.grid.gian_pos, level_data["gian_patrol"],
+                             speed=level_data["gian_speed"])
+
+        # Optional extra patrollers for stress levels: {"pos", "patrol", "speed"}
+        for extra in level_data.get("extra_gians", []):
+            self.grid.set_occupant(*extra["pos"], CELL_GIAN)
+            self.enemies.add(*extra["pos"], extra["patrol"],
+                             speed=extra.get("speed", level_data["gian_speed"]))
+
+        self.gians = self.enemies.views
+        self.gian = self.gians[0] if self.gians else None
+
+        self.gadgets = []
+        for pos in self.grid.gadget_positions:
+            self.gadgets.append(BambooCopter(*pos))
+        for pos in self.grid.door_positions:
+            self.gadgets.append(AnywhereDoor(*pos))
+
+        self.astar.door_positions = []
+        self.astar.set_bamboo_collected(False)
+        self.door_positions = level_data.get("door_pairs", [])
+        for door1, door2 in self.door_positions:
+            self.astar.add_door_pair(door1, door2)
+
+        self.moves = 0
+        self.path = []
+        self.is_moving = False
+        self.start_time = self.clock.now()
+        self.bamboo_available = False
+        self.bamboo_active = False
+        self.score = 0
+        self.stars = 0
+        self.lost_reason = None
+        self.level_serial += 1
+        self.state = STATE_PLAYING
+
+    def reset_level(self):
+        self.load_level(self.current_level)
+
+    def next_level(self):
+        if self.current_level < self.max_level:
+            self.load_level(self.current_level + 1)
+        else:
+            self.state = STATE_MENU
+
+    def apply_action(self, action):
+        """
+        Apply one player action (same gating as the keyboard/buttons)
+        Returns False if the action was ignored
+        """
+        if action == ACTION_START:
+            if self.state != STATE_MENU:
+                return False
+            self.load_level(1)
+        elif action == ACTION_MENU:
+            self.state = STATE_MENU
+        elif action == ACTION_RESET:
+            self.reset_level()
+        elif action == ACTION_NEXT_LEVEL:
+            if self.state != STATE_WON:
+                return False
+            self.next_level()
+        elif action == ACTION_FIND_PATH:
+            self.find_path()
+        elif action == ACTION_AUTO_MOVE:
+            self.auto_move()
+        elif action == ACTION_TOGGLE_BAMBOO:
+            self.toggle_bamboo()
+        elif action in ACTION_DIRECTIONS:
+            if self.state not in [STATE_PLAYING, STATE_PATHFINDING] or self.is_moving:
+                return False
+            dr, dc = ACTION_DIRECTIONS[action]
+            self.move_nobita(self.nobita.row + dr, self.nobita.col + dc)
+        else:
+            return False
+        return True
+
+    def toggle_bamboo(self):
+        if not self.bamboo_available:
+            self.log("❌ Collect Bamboo Copter first!")
+            return
+
+        self._set_bamboo(not self.bamboo_active)
+
+        if self.path:
+            self.find_path()
+
+    async def toggle_bamboo_async(self, started=None):
+        """
+        toggle_bamboo for the asyncio loop
+        The re-plan runs as a cooperative search and the toggle takes effect
+        when its path lands (see find_path_async)
+        Returns True when the toggle was applied
+        """
+        if not self.bamboo_available or not self.path or self.is_moving:
+            # Nothing to re-plan
+            self.toggle_bamboo()
+            return True
+
+        serial = self.level_serial
+        if await self.find_path_async(bamboo=not self.bamboo_active, started=started):
+            return True
+        if serial != self.level_serial or (self.path and not self.is_moving):
+            return False
+
+        # Nobita started moving meanwhile: the toggle no longer re-plans
+        self.toggle_bamboo()
+        return True
+
+    def _set_bamboo(self, active):
+        self.bamboo_active = active
+        self.astar.set_bamboo_collected(active)
+
+        if active:
+            self.log("🚁 Bamboo ACTIVATED - Moves cost 0.5x!")
+        else:
+            self.log("Bamboo DEACTIVATED - Normal cost")
+
+    def find_path(self):
+        endpoints = self._path_endpoints()
+        if endpoints is None:
+            return
+
+        if self._take_speculative(endpoints, self.bamboo_active):
+            return
+
+        try:
+            if self.profiler:
+                started = time.perf_counter()
+                path = self.astar.find_path(*endpoints, record_exploration=True)
+                self.profiler.add(PHASE_PATHFINDING, time.perf_counter() - started)
+            else:
+                path = self.astar.find_path(*endpoints, record_exploration=True)
+            self._apply_path(path)
+        except Exception as e:
+            self.log(f"❌ A* Error: {e}")
+            self.path = []
+
+    def _take_speculative(self, endpoints, bamboo):
+        """Apply a path precomputed on an idle frame for this exact state; True if there was one"""
+        speculative = self.speculation.take(*endpoints, bamboo) if self.speculation else None
+        if speculative is None:
+            return False
+
+        self.log("⚡ Speculative path swapped in")
+        if bamboo != self.bamboo_active:
+            self._set_bamboo(bamboo)
+        self.grid.set_explored(speculative.explored)
+        self.astar.last_stats = {"nodes_explored": speculative.nodes_explored,
+                                 "path_length": len(speculative.path) - 1 if speculative.path else None}
+        self._apply_path(speculative.path)
+        return True
+
+    async def find_path_async(self, bamboo=None, started=None, yield_every=SEARCH_YIELD_EVERY):
+        """
+        Cooperative find_path for the asyncio loop
+        - Each attempt is a begin_search / finish_search pair; started(search)
+          is called when one begins (the replay recorder logs it)
+        - Gian moving meanwhile does not restart the search, only a change
+          to what the path is for (terrain, Nobita, bamboo, level) does
+        - bamboo: plan with this setting and switch to it when the path lands
+        Returns True when the path was applied, False if the level changed or
+        a search no longer makes sense
+        """
+        serial = self.level_serial
+        if bamboo is None:
+            bamboo = self.bamboo_active
+
+        while serial == self.level_serial:
+            search = self.begin_search(bamboo, yield_every)
+            if search is None:
+                return False
+            if self._take_speculative(search.endpoints, bamboo):
+                return True
+
+            if started:
+                started(search)
+            try:
+                while search.advance():
+                    await asyncio.sleep(0)
+            except Exception as e:
+                self.log(f"❌ A* Error: {e}")
+                self.path = []
+                return False
+
+            if self.finish_search(search):
+                return True
+            self.log("⏭ Stale path discarded")
+        return False
+
+    def begin_search(self, bamboo, yield_every=None):
+        """
+        Nobita -> school search against a snapshot of the grid as it is now,
+        or None if a search makes no sense now
+        The snapshot keeps Gian where he stood, so the result only depends on
+        the state at this point (replays begin the same search at the same tick)
+        """
+        if self.state not in [STATE_PLAYING, STATE_PATHFINDING]:
+            return None
+        endpoints = self._path_endpoints()
+        if endpoints is None:
+            return None
+
+        snapshot = self.grid.snapshot()
+        searcher = self.astar.fork(snapshot)
+        searcher.bamboo_collected = bamboo
+        return PlannedSearch(self._search_key(), endpoints, bamboo, snapshot, searcher,
+                             searcher.search(*endpoints, True, yield_every))
+
+    def finish_search(self, search):
+        """Apply a finished search unless what its path is for changed; True if applied"""
+        if search.key != self._search_key():
+            return False
+
+        if search.bamboo != self.bamboo_active:
+            self._set_bamboo(search.bamboo)
+        if search.snapshot.explored is not None:
+            self.grid.set_explored(search.snapshot.explored)
+        self.astar.last_stats = search.searcher.last_stats
+        self._apply_path(search.path)
+        search.applied = True
+        return True
+
+    def _search_key(self):
+        """
+        What a search result is for: terrain, Nobita and bamboo
+        Gian is left out on purpose: he moves every few frames, and a path
+        planned around where he stood is still valid to walk
+        """
+        return (self.level_serial, self.grid.terrain_version, self.is_moving,
+                (self.nobita.row, self.nobita.col), self.bamboo_available,
+                self.bamboo_active, bool(self.path), self.state)
+
+    def _path_endpoints(self):
+        """(start, goal) for a new search, or None if a search makes no sense now"""
+        if self.is_moving:
+            return None
+
+        start = (self.nobita.row, self.nobita.col)
+        goal = (self.school.row, self.school.col)
+
+        if not self.grid.in_bounds(*start) or not self.grid.in_bounds(*goal):
+            self.log("❌ Invalid start or goal position!")
+            return None
+
+        self.log(f"\n🔍 Finding path with A*...")
+        return start, goal
+
+    def _apply_path(self, path):
+        # Stored run-length encoded: long corridors become single runs
+        self.path = RunLengthPath(path) if path else []
+
+        if self.path:
+            self.grid.set_path(self.path)
+            self.state = STATE_PATHFINDING
+
+            path_steps = len(self.path) - 1
+            effective_moves = path_steps * (0.5 if self.bamboo_active else 1.0)
+
+            self.log(f"✓ Path: {path_steps} steps = {effective_moves:.1f} moves")
+        else:
+            self.log("❌ No path found!")
+
+    def auto_move(self):
+        if self.path and not self.is_moving:
+            self.is_moving = True
+            self.path_index = 1
+            self.move_timer = 0
+
+    def check_door_teleport(self, row, col):
+        for door1, door2 in self.door_positions:
+            if (row, col) == door1:
+                self.log(f"🚪 TELEPORTED! {door1} → {door2}")
+                return door2
+            elif (row, col) == door2:
+                self.log(f"🚪 TELEPORTED! {door2} → {door1}")
+                return door1
+        return None
+
+    def move_nobita(self, new_row, new_col):
+        if not self.grid.is_walkable(new_row, new_col):
+            return False
+
+        move_cost = 0.5 if self.bamboo_active else 1.0
+
+        if self.moves + move_cost > self.max_moves:
+            self.state = STATE_LOST
+            self.lost_reason = LOST_OUT_OF_MOVES
+            self.log(f"❌ OUT OF MOVES!")
+            return False
+
+        # Occupancy only: walking never invalidates terrain caches
+        self.grid.move_occupant((self.nobita.row, self.nobita.col), (new_row, new_col), CELL_NOBITA)
+        self.nobita.row = new_row
+        self.nobita.col = new_col
+
+        self.moves += move_cost
+
+        for gadget in self.gadgets:
+            if not gadget.collected and isinstance(gadget, BambooCopter):
+                if (new_row, new_col) == (gadget.row, gadget.col):
+                    gadget.collected = True
+                    # The gadget leaves the terrain; Nobita stays in the occupancy layer
+                    self.grid.set_terrain(new_row, new_col, CELL_EMPTY)
+                    self.bamboo_available = True
+                    self.log("✨ Bamboo Copter collected! Press B to toggle")
+
+        door_dest = self.check_door_teleport(new_row, new_col)
+        if door_dest:
+            self.grid.move_occupant((new_row, new_col), door_dest, CELL_NOBITA)
+            self.nobita.row, self.nobita.col = door_dest
+            self.moves += move_cost
+
+        if (self.nobita.row, self.nobita.col) == (self.school.row, self.school.col):
+            self.calculate_score()
+            self.state = STATE_WON
+            return True
+
+        if self.enemies.enemy_at(self.nobita.row, self.nobita.col) is not None:
+            self.state = STATE_LOST
+            self.lost_reason = LOST_CAUGHT
+            self.log("❌ CAUGHT BY GIAN!")
+            return False
+
+        return True
+
+    def calculate_score(self):
+        if self.moves <= self.optimal_moves:
+            self.stars = 3
+        elif self.moves <= self.optimal_moves + 5:
+            self.stars = 2
+        else:
+            self.stars = 1
+
+        self.score = int((self.max_moves - self.moves) * 10 + self.stars * 100)
+
+    def step(self, dt=SIM_TICK):
+        """Advance the simulation by dt seconds"""
+        self.clock.advance(dt)
+
+        if self.state in [STATE_PLAYING, STATE_PATHFINDING]:
+            # FIX: Pass grid to Gian for wall checking
+            if len(self.enemies):
+                nobita_pos = (self.nobita.row, self.nobita.col)
+                if self.profiler:
+                    started = time.perf_counter()
+
+                # One BFS per Nobita cell change, shared by every chaser
+                self.flow_field.update(nobita_pos)
+
+                # Single batched tick for every Gian (writes the grid itself)
+                for old_pos, new_pos in self.enemies.tick(nobita_pos, self.grid, self.flow_field):
+                    if new_pos == nobita_pos:
+                        self.state = STATE_LOST
+                        self.lost_reason = LOST_CAUGHT
+
+                if self.profiler:
+                    self.profiler.add(PHASE_GIAN_AI, time.perf_counter() - started)
+
+            if self.is_moving and self.path:
+                self.move_timer += dt
+
+                if self.move_timer >= MOVEMENT_SPEED:
+                    self.move_timer = 0
+
+                    if self.path_index < len(self.path):
+                        next_pos = self.path[self.path_index]
+                        success = self.move_nobita(*next_pos)
+
+                        if not success:
+                            self.is_moving = False
+                            self.grid.clear_path()
+                        else:
+                            self.grid.current_path_index = self.path_index
+                            self.path_index += 1
+                    else:
+                        self.is_moving = False
+                        self.grid.clear_path()
+
+            if self.start_time is not None:
+                self.elapsed_time = self.clock.now() - self.start_time
+
+    def fast_forward(self, seconds, tick=SIM_TICK):
+        """
+        Step the simulation in fixed ticks
+        With a TickClock this runs as fast as the CPU allows
+        """
+        for _ in range(int(round(seconds / tick))):
+            self.step(tick)
+            if self.state in [STATE_WON, STATE_LOST]:
+                break
@@ -0,0 +1,174 @@
+"""
+Exact Game-Rule Solver
+Fewest moves to school under the real move_nobita rules:
+  - a step costs 1 move, 0.5 with the Bamboo Copter active
+  - stepping on a door teleports to its partner for one extra step cost
+  - bamboo can be toggled for free at any time after pickup
+Gian is not modelled (his position depends on timing), so this is the
+target for the star thresholds, not a guarantee the level can be won
+"""
+
+import heapq
+import time
+from constants import *
+
+
+class GameSolver:
+    """
+    Dijkstra over game states (cell, bamboo available, bamboo active)
+    - Costs are counted in half moves, so every edge is an integer
+    - Dominance: a cell reached with bamboo in hand is at least as good as the
+      same cell without it at the same or higher cost, so the latter is pruned
+    - Results are memoized per (map, door pairs, blocked cells)
+    """
+
+    def __init__(self):
+        self.cache = {}
+        self.solves = 0
+        self.cache_hits = 0
+        self.states_expanded = 0
+
+    def solve_level(self, level_data, blocked=()):
+        """Solve a level dict (levels.py format); see solve()"""
+        level_map = level_data["map"]
+        door_pairs = [(tuple(door1), tuple(door2))
+                      for door1, door2 in level_data.get("door_pairs", [])]
+        return self.solve(level_map, door_pairs, blocked)
+
+    def solve(self, level_map, door_pairs, blocked=()):
+        """
+        Returns {"optimal_moves", "path", "bamboo_from"} or None if school is unreachable
+        path: cells Nobita stands on (teleport landings included)
+        bamboo_from: path index from which bamboo is active (None = never used)
+        """
+        key = (tuple(level_map), tuple(door_pairs), frozenset(blocked))
+        if key in self.cache:
+            self.cache_hits += 1
+            return self.cache[key]
+
+        self.solves += 1
+        result = self._search(level_map, door_pairs, set(blocked))
+        self.cache[key] = result
+        return result
+
+    def _search(self, level_map, door_pairs, blocked):
+        rows = len(level_map)
+        start = goal = None
+        open_cells = set()
+        bamboo_cells = set()
+
+        for row, line in enumerate(level_map):
+            for col, char in enumerate(line):
+                cell = MAP_CHARS.get(char, CELL_EMPTY)
+                if cell == CELL_WALL or (row, col) in blocked:
+                    continue
+                open_cells.add((row, col))
+                if cell == CELL_NOBITA:
+                    start = (row, col)
+                elif cell == CELL_SCHOOL:
+                    goal = (row, col)
+                elif cell == CELL_BAMBOO:
+                    bamboo_cells.add((row, col))
+
+        if start is None or goal is None or rows == 0:
+            return None
+
+        teleports = {}
+        for door1, door2 in door_pairs:
+            teleports[door1] = door2
+            teleports[door2] = door1
+
+        # State: (cell, available, active); cost in half moves
+        start_state = (start, False, False)
+        best = {start_state: 0}
+        came_from = {start_state: None}
+        frontier = [(0, 0, start_state)]
+        counter = 0
+
+        while frontier:
+            cost, _, state = heapq.heappop(frontier)
+            if cost > best[state]:
+                continue
+            pos, available, active = state
+
+            # Dominated: the same cell was already settled with bamboo in hand
+            if not available and any(best.get((pos, True, on), cost + 1) <= cost
+                                     for on in (False, True)):
+                continue
+
+            self.states_expanded += 1
+            if pos == goal:
+                return self._result(state, cost, came_from)
+
+            step_cost = 1 if active else 2
+            successors = []
+
+            if available:
+                successors.append(((pos, True, not active), cost))
+
+            for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                cell = (pos[0] + dr, pos[1] + dc)
+                if cell not in open_cells:
+                    continue
+                picked = available or cell in bamboo_cells
+                if cell in teleports:
+                    # Door: the landing costs another step at the current rate
+                    successors.append(((teleports[cell], picked, active), cost + 2 * step_cost))
+                else:
+                    successors.append(((cell, picked, active), cost + step_cost))
+
+            for next_state, next_cost in successors:
+                if next_cost < best.get(next_state, next_cost + 1):
+                    best[next_state] = next_cost
+                    came_from[next_state] = state
+                    counter += 1
+                    heapq.heappush(frontier, (next_cost, counter, next_state))
+
+        return None
+
+    def _result(self, state, cost, came_from):
+        states = []
+        while state is not None:
+            states.append(state)
+            state = came_from[state]
+        states.reverse()
+
+        path = []
+        bamboo_from = None
+        for pos, _, active in states:
+            if not path or path[-1] != pos:
+                path.append(pos)
+            if active and bamboo_from is None:
+                bamboo_from = len(path) - 1
+
+        return {"optimal_moves": cost / 2, "path": path, "bamboo_from": bamboo_from}
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        return {
+            "solves": self.solves,
+            "cache_hits": self.cache_hits,
+            "states_expanded": self.states_expanded
+        }
+
+
+if __name__ == "__main__":
+    # python solver.py: solve every built-in level and compare with the hand-tuned values
+    from levels import LEVELS
+
+    solver = GameSolver()
+    for level_num, level_data in sorted(LEVELS.items()):
+        started = time.perf_counter()
+        result = solver.solve_level(level_data)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        if result is None:
+            print(f"❌ Level {level_num}: school unreachable")
+            continue
+        print(f"✓ Level {level_num}: {result['optimal_moves']} moves "
+              f"(hand-tuned {level_data['optimal_moves']}), bamboo from step "
+              f"{result['bamboo_from']}, {elapsed:.2f} ms")
+
+    print(f"  {solver.stats()}")
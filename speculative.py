@@ -0,0 +1,164 @@
+"""
+Speculative What-If Planning
+Alternative plans (bamboo on/off, without each door pair) are searched on
+idle frames, so toggling swaps in a finished path instead of starting a search
+"""
+
+import time
+from constants import *
+
+
+class WhatIf:
+    """One finished what-if search: path (or None), its exploration trace and cost"""
+
+    def __init__(self, path, explored, nodes_explored, bamboo):
+        self.path = path
+        self.explored = explored
+        self.nodes_explored = nodes_explored
+        self.moves = (len(path) - 1) * (0.5 if bamboo else 1.0) if path else None
+
+
+class WhatIfPlanner:
+    """
+    What-if paths for the current position, computed in small slices
+    - Scenarios are keyed (bamboo, skipped door pair index or None)
+    - Each search runs on its own view of a grid snapshot with a forked
+      searcher, as a search generator stepped within SPECULATE_BUDGET
+    - Results belong to one context: what the search reads (level, terrain
+      version, Gian's cells and cost overlay, Nobita, bamboo pickup); any
+      change discards them, so a swapped-in path is exactly what find_path
+      would have returned. Nobita's own occupancy is not part of it
+    """
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.context = None
+        self.results = {}
+        self.pending = []          # Scenarios not searched yet, in priority order
+        self.search = None         # (scenario, view, searcher, generator) in progress
+
+        self.completed = 0
+        self.swapped_in = 0
+        self.discarded = 0
+
+    def _context(self):
+        sim = self.sim
+        grid = sim.grid
+        gian_cells = frozenset(pos for pos, occupant in grid.occupancy.items()
+                               if occupant == CELL_GIAN)
+        return (sim.level_serial, grid.terrain_version, gian_cells, grid.gian_pos,
+                (sim.nobita.row, sim.nobita.col), (sim.school.row, sim.school.col),
+                sim.bamboo_available)
+
+    def _scenarios(self):
+        """Most likely toggle first, then the current plan, then each door left out"""
+        sim = self.sim
+        settings = [not sim.bamboo_active, sim.bamboo_active] if sim.bamboo_available else [False]
+        scenarios = [(bamboo, None) for bamboo in settings]
+        for bamboo in reversed(settings):
+            for index in range(len(sim.astar.door_positions)):
+                scenarios.append((bamboo, index))
+        return scenarios
+
+    def _refresh(self):
+        """Drop everything computed for an older context"""
+        context = self._context()
+        if context == self.context:
+            return
+        if self.results or self.search:
+            self.discarded += 1
+        self.context = context
+        self.results = {}
+        self.search = None
+        self.pending = self._scenarios()
+
+    def _start(self, scenario):
+        bamboo, skipped = scenario
+        sim = self.sim
+        snapshot = sim.grid.snapshot()
+
+        door_pairs = [pair for index, pair in enumerate(sim.astar.door_positions) if index != skipped]
+        view = snapshot.with_door_pairs(door_pairs if skipped is not None else snapshot.door_pairs)
+
+        searcher = sim.astar.fork(view)
+        searcher.bamboo_collected = bamboo
+        searcher.door_positions = door_pairs
+
+        start = (sim.nobita.row, sim.nobita.col)
+        goal = (sim.school.row, sim.school.col)
+        generator = searcher.search(start, goal, True, SPECULATE_YIELD_EVERY)
+        self.search = (scenario, view, searcher, generator)
+
+    def step(self, budget=SPECULATE_BUDGET):
+        """Advance what-if searches for up to budget seconds; True if a result landed"""
+        if self.sim.state not in [STATE_PLAYING, STATE_PATHFINDING] or self.sim.is_moving:
+            return False
+        self._refresh()
+
+        landed = False
+        deadline = time.perf_counter() + budget
+        while time.perf_counter() < deadline:
+            if self.search is None:
+                if not self.pending:
+                    break
+                self._start(self.pending.pop(0))
+
+            scenario, view, searcher, generator = self.search
+            try:
+                next(generator)
+            except StopIteration as done:
+                self.results[scenario] = WhatIf(done.value, view.explored,
+                                                searcher.last_stats.get("nodes_explored", 0),
+                                                scenario[0])
+                self.search = None
+                self.completed += 1
+                landed = True
+        return landed
+
+    def lookup(self, bamboo, skipped=None):
+        """Finished result for the current context, or None"""
+        if self.context != self._context():
+            return None
+        return self.results.get((bamboo, skipped))
+
+    def take(self, start, goal, bamboo):
+        """Result find_path can use as-is (all doors, Nobita -> school), or None"""
+        sim = self.sim
+        if start != (sim.nobita.row, sim.nobita.col) or goal != (sim.school.row, sim.school.col):
+            return None
+        result = self.lookup(bamboo)
+        if result is not None:
+            self.swapped_in += 1
+        return result
+
+    def summary(self):
+        """
+        HUD values: (moves with bamboo on, off, best door saving); None when unknown
+        The door saving is how many moves the most useful door pair saves
+        (inf when school cannot be reached without it)
+        """
+        on = self.lookup(True)
+        off = self.lookup(False)
+        current = self.lookup(self.sim.bamboo_active)
+
+        saving = None
+        if current is not None and current.moves is not None:
+            for index in range(len(self.sim.astar.door_positions)):
+                without = self.lookup(self.sim.bamboo_active, index)
+                if without is None:
+                    continue
+                delta = (without.moves - current.moves) if without.moves is not None else float("inf")
+                saving = delta if saving is None else max(saving, delta)
+
+        return (on.moves if on else None, off.moves if off else None, saving)
+
+    def done(self):
+        """Every scenario for the current context has a result"""
+        return self.context == self._context() and self.search is None and not self.pending
+
+    def stats(self):
+        return {
+            "completed": self.completed,
+            "swapped_in": self.swapped_in,
+            "discarded": self.discarded
+        }
@@ -0,0 +1,253 @@
+"""
+Pre-baked Sprite Atlas for Characters and Gadgets
+Each entity is drawn once per cell size, then blitted every frame
+"""
+
+import math
+try:
+    import pygame
+except ImportError:
+    # Headless simulation: drawing is unavailable, game rules still work
+    pygame = None
+from constants import *
+from text_cache import text_cache
+
+
+class SpriteAtlas:
+    """
+    Baked entity sprites for one cell size
+    - Every sprite is a (2 * cell) square centred on the cell centre,
+      so labels, roofs and danger zones fit without clipping
+    - Bamboo Copter blades come as COPTER_FRAMES pre-rotated frames
+    """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.sprites = {}
+
+        self.sprites['nobita'] = self._bake_nobita(glow=False)
+        self.sprites['nobita_bamboo'] = self._bake_nobita(glow=True)
+        self.sprites['school'] = self._bake_school()
+        self.sprites['gian'] = self._bake_gian()
+        self.sprites['door'] = self._bake_door()
+
+        # Four blades repeat every 90 degrees
+        self.copter_step = 90 / COPTER_FRAMES
+        self.copter_frames = [self._bake_copter(i * self.copter_step)
+                              for i in range(COPTER_FRAMES)]
+
+    def get(self, name):
+        return self.sprites[name]
+
+    def copter_frame(self, rotation):
+        """Frame closest to an arbitrary rotation in degrees"""
+        index = int(round((rotation % 90) / self.copter_step)) % COPTER_FRAMES
+        return self.copter_frames[index]
+
+    def blit(self, screen, sprite, px, py):
+        """Blit a sprite centred on pixel position (px, py)"""
+        screen.blit(sprite, (px - self.cell_size, py - self.cell_size))
+
+    def _new_surface(self):
+        size = self.cell_size * 2
+        surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        return surface, self.cell_size, self.cell_size
+
+    def _finish(self, surface):
+        # Match the display format when a window exists (faster blits)
+        if pygame.display.get_surface() is not None:
+            return surface.convert_alpha()
+        return surface
+
+    def _bake_nobita(self, glow):
+        s, px, py = self._new_surface()
+        cell = self.cell_size
+
+        # Glow effect if bamboo active
+        if glow:
+            for i in range(3):
+                g = pygame.Surface((cell, cell), pygame.SRCALPHA)
+                pygame.draw.circle(g, (*COLOR_BAMBOO, 40 - i * 10),
+                                   (cell // 2, cell // 2), cell // 3 + i * 4)
+                s.blit(g, (px - cell // 2, py - cell // 2))
+
+        # Main body - larger circle
+        radius = cell // 2 - 5
+        pygame.draw.circle(s, COLOR_NOBITA, (px, py), radius)
+        pygame.draw.circle(s, BLACK, (px, py), radius, 3)
+
+        # Eyes
+        eye_y = py - 5
+        pygame.draw.circle(s, WHITE, (px - 8, eye_y), 6)
+        pygame.draw.circle(s, WHITE, (px + 8, eye_y), 6)
+        pygame.draw.circle(s, BLACK, (px - 8, eye_y), 4)
+        pygame.draw.circle(s, BLACK, (px + 8, eye_y), 4)
+
+        # Smile
+        pygame.draw.arc(s, BLACK, (px - 10, py, 20, 15), 3.14, 0, 3)
+
+        # Glasses frame
+        pygame.draw.circle(s, BLACK, (px - 8, eye_y), 7, 2)
+        pygame.draw.circle(s, BLACK, (px + 8, eye_y), 7, 2)
+
+        # Label
+        label = text_cache.render("N", 16, WHITE)
+        s.blit(label, label.get_rect(center=(px, py + radius + 10)))
+
+        return self._finish(s)
+
+    def _bake_school(self):
+        s, px, py = self._new_surface()
+        cell = self.cell_size
+
+        # Building
+        building_width = cell - 10
+        building_height = int(cell * 0.8)
+        building_rect = pygame.Rect(px - building_width // 2, py - building_height // 2,
+                                    building_width, building_height)
+        pygame.draw.rect(s, COLOR_SCHOOL, building_rect)
+        pygame.draw.rect(s, BLACK, building_rect, 3)
+
+        # Roof
+        roof_points = [
+            (px, py - building_height // 2 - 8),
+            (px - building_width // 2 - 5, py - building_height // 2),
+            (px + building_width // 2 + 5, py - building_height // 2)
+        ]
+        pygame.draw.polygon(s, COLOR_DANGER, roof_points)
+        pygame.draw.polygon(s, BLACK, roof_points, 2)
+
+        # Windows
+        window_size = 6
+        for wx in [px - 10, px + 2]:
+            for wy in [py - 8, py + 6]:
+                window_rect = pygame.Rect(wx, wy, window_size, window_size)
+                pygame.draw.rect(s, (100, 150, 255), window_rect)
+                pygame.draw.rect(s, BLACK, window_rect, 1)
+
+        # Door
+        door_rect = pygame.Rect(px - 4, py + building_height // 2 - 12, 8, 12)
+        pygame.draw.rect(s, (139, 69, 19), door_rect)
+        pygame.draw.rect(s, BLACK, door_rect, 1)
+
+        # Flag pole and flag
+        pole_x = px + building_width // 2
+        pole_top = py - building_height // 2 - 15
+        pygame.draw.line(s, BLACK, (pole_x, py - building_height // 2), (pole_x, pole_top), 3)
+        flag_points = [(pole_x, pole_top), (pole_x + 12, pole_top + 3), (pole_x, pole_top + 6)]
+        pygame.draw.polygon(s, COLOR_DANGER, flag_points)
+
+        # Label
+        label = text_cache.render("SCHOOL", 16, BLACK)
+        s.blit(label, label.get_rect(center=(px, py + building_height // 2 + 12)))
+
+        return self._finish(s)
+
+    def _bake_gian(self):
+        s, px, py = self._new_surface()
+        cell = self.cell_size
+
+        # Danger zone indicator
+        pygame.draw.circle(s, (*COLOR_GIAN, 30), (px, py), cell)
+
+        # Main body - larger
+        radius = cell // 2 - 3
+        pygame.draw.circle(s, COLOR_GIAN, (px, py), radius)
+        pygame.draw.circle(s, BLACK, (px, py), radius, 3)
+
+        # Angry eyes
+        eye_y = py - 6
+        pygame.draw.line(s, BLACK, (px - 12, eye_y - 2), (px - 6, eye_y + 2), 3)
+        pygame.draw.line(s, BLACK, (px + 6, eye_y + 2), (px + 12, eye_y - 2), 3)
+
+        # Pupils
+        pygame.draw.circle(s, BLACK, (px - 9, eye_y), 2)
+        pygame.draw.circle(s, BLACK, (px + 9, eye_y), 2)
+
+        # Angry mouth (frown)
+        pygame.draw.arc(s, BLACK, (px - 12, py + 5, 24, 12), 0, 3.14, 3)
+
+        # Eyebrows (angry)
+        pygame.draw.line(s, BLACK, (px - 14, eye_y - 6), (px - 4, eye_y - 4), 2)
+        pygame.draw.line(s, BLACK, (px + 4, eye_y - 4), (px + 14, eye_y - 6), 2)
+
+        # Label with background
+        label = text_cache.render("GIAN", 16, WHITE)
+        label_rect = label.get_rect(center=(px, py + radius + 10))
+        pygame.draw.rect(s, COLOR_GIAN, label_rect.inflate(4, 2), border_radius=3)
+        s.blit(label, label_rect)
+
+        return self._finish(s)
+
+    def _draw_gadget_glow(self, s, px, py, color):
+        cell = self.cell_size
+        glow = pygame.Surface((cell, cell), pygame.SRCALPHA)
+        pygame.draw.circle(glow, (*color, 60), (cell // 2, cell // 2), cell // 3)
+        s.blit(glow, (px - cell // 2, py - cell // 2))
+
+    def _draw_gadget_label(self, s, px, py, text, text_color, color):
+        label = text_cache.render(text, 14, text_color)
+        label_rect = label.get_rect(center=(px, py + 20))
+        pygame.draw.rect(s, color, label_rect.inflate(4, 2), border_radius=3)
+        s.blit(label, label_rect)
+
+    def _bake_copter(self, rotation):
+        s, px, py = self._new_surface()
+        self._draw_gadget_glow(s, px, py, COLOR_BAMBOO)
+
+        # Propeller base
+        pygame.draw.circle(s, COLOR_BAMBOO, (px, py), 8)
+        pygame.draw.circle(s, BLACK, (px, py), 8, 2)
+
+        # Blades at this rotation
+        blade_length = 18
+        for angle in [rotation, rotation + 90, rotation + 180, rotation + 270]:
+            rad = math.radians(angle)
+            dx = blade_length * math.cos(rad)
+            dy = blade_length * math.sin(rad)
+            pygame.draw.line(s, COLOR_BAMBOO, (px + dx, py + dy), (px - dx, py - dy), 4)
+
+        # Center dot
+        pygame.draw.circle(s, BLACK, (px, py), 4)
+
+        self._draw_gadget_label(s, px, py, "SPEED+", BLACK, COLOR_BAMBOO)
+        return self._finish(s)
+
+    def _bake_door(self):
+        s, px, py = self._new_surface()
+        self._draw_gadget_glow(s, px, py, COLOR_DOOR)
+
+        # Door frame
+        door_width = 16
+        door_height = 24
+        door_rect = pygame.Rect(px - door_width // 2, py - door_height // 2,
+                                door_width, door_height)
+        pygame.draw.rect(s, COLOR_DOOR, door_rect, border_radius=4)
+        pygame.draw.rect(s, BLACK, door_rect, 2, border_radius=4)
+
+        # Door panels
+        panel_rect = pygame.Rect(px - door_width // 2 + 2, py - door_height // 2 + 2,
+                                 door_width - 4, door_height // 2 - 2)
+        for panel_y in [panel_rect.y, py + 1]:
+            panel_rect.y = panel_y
+            pygame.draw.rect(s, COLOR_DOOR, panel_rect, border_radius=2)
+            pygame.draw.rect(s, BLACK, panel_rect, 1, border_radius=2)
+
+        # Door knob
+        pygame.draw.circle(s, COLOR_BAMBOO, (px + 4, py), 3)
+        pygame.draw.circle(s, BLACK, (px + 4, py), 3, 1)
+
+        self._draw_gadget_label(s, px, py, "TELEPORT", WHITE, COLOR_DOOR)
+        return self._finish(s)
+
+
+_atlases = {}
+
+
+def get_atlas(cell_size=CELL_SIZE):
+    """Shared atlas per cell size, baked on first use"""
+    atlas = _atlases.get(cell_size)
+    if atlas is None:
+        atlas = SpriteAtlas(cell_size)
+        _atlases[cell_size] = atlas
+    return atlas
@@ -0,0 +1,78 @@
+"""
+Compiled adjacency graph: in-place patches agree with a full rebuild
+"""
+
+import random
+from adjacency import EDGE_DOOR, EDGE_STEP, GridGraph
+from constants import *
+from grid import Grid
+
+
+def random_grid(seed, rows=10, cols=12, density=0.3):
+    rng = random.Random(seed)
+    grid = Grid(rows, cols)
+    grid.load_level(["".join('#' if rng.random() < density else '.' for _ in range(cols))
+                     for _ in range(rows)])
+    return grid, rng
+
+
+def edges(graph, grid):
+    """{cell index: set of (target, cost, kind)} (slot order is not part of the contract)"""
+    result = {}
+    for index in range(grid.rows * grid.cols):
+        slot = graph.offsets[index]
+        result[index] = {(graph.neighbours[i], graph.costs[i], graph.kinds[i])
+                         for i in range(slot, slot + graph.degree[index])}
+    return result
+
+
+def test_random_wall_toggles_and_door_pairs_match_a_full_rebuild():
+    for seed in range(20):
+        grid, rng = random_grid(seed)
+        cells = [(row, col) for row in range(grid.rows) for col in range(grid.cols)]
+        for step in range(60):
+            if step % 20 == 0:
+                # Doors may share a cell with another pair (more than one spare slot)
+                grid.add_door_pair(rng.choice(cells), rng.choice(cells))
+            row, col = rng.choice(cells)
+            wall = grid.get_terrain(row, col) == CELL_WALL
+            grid.set_cell(row, col, CELL_EMPTY if wall else CELL_WALL)
+
+            fresh = GridGraph(grid, grid.graph.door_pairs)
+            assert edges(grid.graph, grid) == edges(fresh, grid), seed
+
+
+def test_door_pair_adds_teleport_edges_both_ways():
+    grid = Grid(3, 5)
+    grid.load_level([".....", ".....", "....."])
+    grid.add_door_pair((0, 0), (2, 4))
+
+    cols = grid.cols
+    graph_edges = edges(grid.graph, grid)
+    assert (2 * cols + 4, 1.0, EDGE_DOOR) in graph_edges[0]
+    assert (0, 1.0, EDGE_DOOR) in graph_edges[2 * cols + 4]
+    assert (1, 1.0, EDGE_STEP) in graph_edges[0]
+
+
+def test_walls_have_no_edges_and_are_not_targets():
+    grid, _ = random_grid(3)
+    cols = grid.cols
+    walls = {row * cols + col for row in range(grid.rows) for col in range(cols)
+             if grid.get_terrain(row, col) == CELL_WALL}
+
+    for index, targets in edges(grid.graph, grid).items():
+        if index in walls:
+            assert not targets
+        assert not {target for target, _, _ in targets} & walls
+
+
+def test_snapshot_graph_is_not_patched_by_live_edits():
+    grid = Grid(2, 4)
+    grid.load_level(["....", "...."])
+    snapshot = grid.snapshot()
+    degree = snapshot.graph.degree[1]
+
+    grid.set_cell(0, 2, CELL_WALL)
+
+    assert snapshot.graph.degree[1] == degree
+    assert grid.graph.degree[1] == degree - 1
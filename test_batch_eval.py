@@ -0,0 +1,35 @@
+"""
+Batch evaluator: shared-memory encoding and pool results against a serial run
+"""
+
+from batch_eval import decode_level, encode_levels, evaluate_level, evaluate_levels
+from levels import LEVELS
+
+WALLED_IN = {"map": ["#####", "#N#S#", "#####"], "max_moves": 10, "optimal_moves": 2,
+             "gian_speed": 1.0, "gian_patrol": [], "door_pairs": []}
+
+
+def test_levels_survive_the_shared_buffer():
+    levels = [LEVELS[num] for num in sorted(LEVELS)] + [WALLED_IN]
+    data, metadata = encode_levels(levels)
+
+    assert len(data) == sum(meta["rows"] * meta["cols"] for meta in metadata)
+    for level, meta in zip(levels, metadata):
+        assert decode_level(data, meta) == level
+
+
+def test_pool_records_match_a_serial_evaluation():
+    levels = [LEVELS[1], WALLED_IN, LEVELS[2]]
+    records = {}
+    for record in evaluate_levels(levels, workers=2, trials=2, chunk_size=1):
+        records[record.pop("index")] = record
+        assert record.pop("seconds") >= 0
+        record.pop("worker")
+
+    assert sorted(records) == [0, 1, 2]
+    for index, level in enumerate(levels):
+        assert records[index] == evaluate_level(level, trials=2)
+
+    assert records[0]["solvable"] and records[0]["path_steps"] > 0
+    assert records[1] == {"solvable": False, "path_steps": None, "moves": None,
+                          "catch_rate": None, "outcomes": []}
@@ -0,0 +1,31 @@
+"""
+compare(): which metric growth fails the benchmark gate
+"""
+
+from bench_pathfinding import compare
+
+
+def scenario(p50, nodes, peak):
+    return {"p50_ms": p50, "p99_ms": p50 * 3, "nodes_explored": nodes, "peak_memory_kb": peak}
+
+
+BASELINE = {"scenarios": {"s": scenario(1.0, 100, 50.0)}}
+
+
+def test_latency_noise_is_not_gated_by_default():
+    assert compare({"s": scenario(5.0, 100, 50.0)}, BASELINE, 0.0) == []
+
+
+def test_any_growth_in_nodes_explored_fails():
+    regressions = compare({"s": scenario(1.0, 101, 50.0)}, BASELINE, 0.0)
+    assert len(regressions) == 1 and "nodes_explored" in regressions[0]
+
+
+def test_latency_gate_is_opt_in():
+    assert compare({"s": scenario(1.8, 100, 50.0)}, BASELINE, 0.0, latency_threshold=1.0) == []
+    assert len(compare({"s": scenario(2.5, 100, 50.0)}, BASELINE, 0.0, latency_threshold=1.0)) == 1
+
+
+def test_messages_name_the_threshold_that_fired():
+    regressions = compare({"s": scenario(2.5, 100, 50.0)}, BASELINE, 0.0, latency_threshold=1.0)
+    assert "p50_ms" in regressions[0] and "allowed 100%" in regressions[0]
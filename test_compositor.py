@@ -0,0 +1,57 @@
+"""
+Layer caching: the builder runs only when its key changes
+"""
+
+from compositor import Compositor, Layer
+
+
+class FakeScreen:
+    def __init__(self):
+        self.blits = []
+
+    def blit(self, surface, pos):
+        self.blits.append((surface, pos))
+        return pos
+
+
+def test_layer_rebuilds_only_on_a_new_key():
+    built = []
+    layer = Layer(lambda key: built.append(key) or f"surface {key}")
+
+    assert layer.get(1) == "surface 1"
+    layer.get(1)
+    layer.get(2)
+    layer.get(2)
+
+    assert built == [1, 2]
+    assert layer.rebuilds == 2
+
+
+def test_invalidate_forces_one_rebuild_with_the_same_key():
+    layer = Layer(lambda key: object())
+    first = layer.get("hud")
+    layer.invalidate()
+    second = layer.get("hud")
+
+    assert second is not first
+    assert layer.get("hud") is second
+    assert layer.rebuilds == 2
+
+
+def test_compositor_blits_cached_layers_in_call_order():
+    compositor = Compositor()
+    compositor.add_layer("background", lambda key: ("bg", key))
+    compositor.add_layer("title", lambda key: ("title", key))
+    screen = FakeScreen()
+
+    for _ in range(3):
+        compositor.blit(screen, "background", 0)
+        compositor.blit(screen, "title", "Level 1", (10, 20))
+    compositor.blit(screen, "title", "Level 2", (10, 20))
+
+    assert compositor.stats() == {"background": 1, "title": 2}
+    assert screen.blits[-1] == (("title", "Level 2"), (10, 20))
+
+    compositor.invalidate()
+    compositor.blit(screen, "background", 0)
+    assert compositor.stats()["background"] == 2
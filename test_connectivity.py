@@ -0,0 +1,84 @@
+"""
+ComponentIndex: incremental splits and joins against a from-scratch labelling
+"""
+
+import random
+from connectivity import ComponentIndex
+from constants import *
+from grid import Grid
+
+
+def random_grid(seed, rows=10, cols=12, density=0.3, doors=2):
+    rng = random.Random(seed)
+    grid = Grid(rows, cols)
+    grid.load_level(["".join('#' if rng.random() < density else '.' for _ in range(cols))
+                     for _ in range(rows)])
+    cells = [(row, col) for row in range(rows) for col in range(cols)]
+    rng.shuffle(cells)
+    for _ in range(doors):
+        grid.add_door_pair(cells.pop(), cells.pop())
+    return grid, rng
+
+
+def partition(index, grid):
+    """Components as a set of frozensets of cells (label values are arbitrary)"""
+    components = {}
+    for row in range(grid.rows):
+        for col in range(grid.cols):
+            label = index.component(row, col)
+            if label is not None:
+                components.setdefault(label, set()).add((row, col))
+    return {frozenset(cells) for cells in components.values()}
+
+
+def rebuilt(grid):
+    index = ComponentIndex(grid)
+    for door1, door2 in grid.components.door_pairs:
+        index.add_door_pair(door1, door2)
+    return index
+
+
+def test_random_wall_toggles_match_a_full_rebuild():
+    for seed in range(20):
+        grid, rng = random_grid(seed)
+        for _ in range(60):
+            row, col = rng.randrange(grid.rows), rng.randrange(grid.cols)
+            wall = grid.get_cell(row, col) == CELL_WALL
+            grid.set_cell(row, col, CELL_EMPTY if wall else CELL_WALL)
+            assert partition(grid.components, grid) == partition(rebuilt(grid), grid), seed
+
+
+def test_door_pair_joins_separate_rooms():
+    grid = Grid(3, 7)
+    grid.load_level([".......",
+                     "...#...",
+                     "...#..."])
+    grid.set_cell(0, 3, CELL_WALL)
+    assert not grid.components.connected((0, 0), (0, 6))
+
+    grid.add_door_pair((2, 0), (2, 6))
+    assert grid.components.connected((0, 0), (0, 6))
+
+    # Walling a door in cuts the teleport edge again
+    grid.set_cell(2, 6, CELL_WALL)
+    assert not grid.components.connected((0, 0), (0, 6))
+
+
+def test_walls_and_out_of_bounds_are_never_connected():
+    grid, _ = random_grid(0)
+    wall = next((row, col) for row in range(grid.rows) for col in range(grid.cols)
+                if grid.get_cell(row, col) == CELL_WALL)
+    assert not grid.components.connected(wall, wall)
+    assert not grid.components.connected((-1, 0), (0, 0))
+
+
+def test_labels_stay_bounded_over_a_long_session():
+    grid, rng = random_grid(5)
+    cells = grid.rows * grid.cols
+    for _ in range(5000):
+        row, col = rng.randrange(grid.rows), rng.randrange(grid.cols)
+        wall = grid.get_cell(row, col) == CELL_WALL
+        grid.set_cell(row, col, CELL_EMPTY if wall else CELL_WALL)
+        assert len(grid.components.parent) <= 2 * cells
+
+    assert partition(grid.components, grid) == partition(rebuilt(grid), grid)
@@ -0,0 +1,73 @@
+"""
+WHCA* planner: reservation conflicts, window eviction, collision-free runs
+"""
+
+from cooperative import CooperativePlanner, ReservationTable, find_conflicts
+from grid import Grid
+
+
+def make_grid(level_map):
+    grid = Grid(len(level_map), len(level_map[0]))
+    grid.load_level(level_map)
+    return grid
+
+
+def test_vertex_reservation_blocks_other_agents_only():
+    table = ReservationTable(5, 5)
+    table.reserve((1, 1), 3, agent=0)
+
+    assert not table.is_free((1, 1), 3, agent=1)
+    assert table.is_free((1, 1), 3, agent=0)
+    assert table.is_free((1, 1), 4, agent=1)
+    assert not table.can_move((1, 0), (1, 1), 2, agent=1)
+
+
+def test_swap_through_each_other_is_rejected():
+    table = ReservationTable(5, 5)
+    table.reserve_move((2, 1), (2, 2), 0, agent=0)
+
+    assert not table.can_move((2, 2), (2, 1), 0, agent=1)
+    # The same edge one tick later is free again
+    assert table.can_move((2, 2), (2, 1), 1, agent=1)
+
+
+def test_agents_crossing_a_corridor_never_collide():
+    grid = make_grid(["#######",
+                      "#.....#",
+                      "####.##",
+                      "#######"])
+    planner = CooperativePlanner(grid, window=8)
+    starts, goals = [(1, 1), (1, 5)], [(1, 5), (1, 1)]
+
+    trajectories, ticks = planner.run(starts, goals, max_ticks=60)
+
+    assert [path[-1] for path in trajectories] == goals
+    assert find_conflicts(trajectories) == []
+    assert ticks < 60
+
+
+def test_replanning_evicts_the_previous_window():
+    grid = make_grid(["........", "........", "........"])
+    planner = CooperativePlanner(grid, window=4)
+    positions, goals = [(0, 0), (2, 7)], [(2, 7), (0, 0)]
+
+    planner.plan(positions, goals, tick=0)
+    planner.plan(positions, goals, tick=10)
+
+    ticks = {key // planner.reservations.cells for key in planner.reservations.cell_owner}
+    assert min(ticks) >= 10 and max(ticks) <= 10 + planner.window
+    assert len(planner.reservations) <= len(positions) * (planner.window + 2)
+
+
+def test_boxed_in_agent_holds_position():
+    grid = make_grid(["#####", "#...#", "#####"])
+    planner = CooperativePlanner(grid, window=4)
+    # Agent 0 owns the middle cell for the whole window
+    for tick in range(6):
+        planner.reservations.reserve((1, 2), tick, agent=0)
+    planner.reservations.reserve((1, 1), 0, agent=1)
+
+    path = planner.plan_agent(1, (1, 1), (1, 3), 0)
+
+    assert (1, 2) not in path
+    assert len(path) == planner.window + 1
@@ -0,0 +1,73 @@
+"""
+EnemyManager: numpy and pure-Python ticks agree, GianView reads the arrays
+"""
+
+import random
+import pytest
+import enemies
+from constants import *
+from enemies import EnemyManager
+from flow_field import FlowField
+from grid import Grid
+from sim_clock import TickClock
+
+
+def crowd_run(seed, use_flow_field, ticks=400):
+    """Sixty Gians on a random map; returns every move and the final arrays"""
+    rng = random.Random(seed)
+    rows, cols = 20, 30
+    level = [''.join('#' if rng.random() < 0.2 else '.' for _ in range(cols)) for _ in range(rows)]
+    grid = Grid(rows, cols)
+    grid.load_level(level)
+    open_cells = [(row, col) for row in range(rows) for col in range(cols)
+                  if grid.is_walkable(row, col)]
+    rng.shuffle(open_cells)
+
+    clock = TickClock()
+    manager = EnemyManager(clock)
+    for _ in range(60):
+        row, col = open_cells.pop()
+        grid.set_occupant(row, col, CELL_GIAN)
+        patrol = [rng.choice(open_cells) for _ in range(3)]
+        manager.add(row, col, patrol, speed=rng.choice([0.5, 2.0, 8.0]), chase_range=6)
+
+    nobita = open_cells.pop()
+    flow_field = FlowField(grid) if use_flow_field else None
+    history = []
+    for _ in range(ticks):
+        clock.advance(SIM_TICK)
+        if flow_field:
+            flow_field.update(nobita)
+        history.append(manager.tick(nobita, grid, flow_field))
+
+    state = (list(manager.rows), list(manager.cols), bytes(manager.modes), bytes(manager.paused),
+             list(manager.patrol_index), list(manager.last_move_time))
+    return history, state
+
+
+@pytest.mark.parametrize("use_flow_field", [False, True])
+def test_numpy_tick_matches_the_python_loop(monkeypatch, use_flow_field):
+    pytest.importorskip("numpy")
+    vectorized = crowd_run(3, use_flow_field)
+    monkeypatch.setattr(enemies, "numpy", None)
+    looped = crowd_run(3, use_flow_field)
+
+    assert any(vectorized[0])
+    assert vectorized == looped
+
+
+def test_gian_view_reads_the_manager_arrays():
+    clock = TickClock()
+    manager = EnemyManager(clock)
+    manager.add(1, 1, [(1, 3), (4, 1)])
+    view = manager.add(2, 2, [(2, 5)], speed=2.0)
+
+    assert view.patrol_points == [(2, 5)]
+    assert view.clock is clock
+    assert not view.paused and view.pause_start is None
+    assert view.speed == 2.0 and view.current_target == 0
+
+    manager.paused[1] = 1
+    manager.pause_start[1] = 7.5
+    assert view.paused and view.pause_start == 7.5
+    assert manager.views[0].patrol_points == [(1, 3), (4, 1)]
@@ -0,0 +1,72 @@
+"""
+FlowField: distances and steps agree with a plain BFS, recompute only on change
+"""
+
+from collections import deque
+from constants import *
+from flow_field import FlowField
+from grid import Grid
+
+LEVEL = [
+    "..........",
+    ".####.###.",
+    ".#......#.",
+    ".#.####.#.",
+    "...#..#...",
+    "####..####",
+]
+
+
+def make_grid():
+    grid = Grid(len(LEVEL), len(LEVEL[0]))
+    grid.load_level(LEVEL)
+    return grid
+
+
+def bfs(grid, target):
+    dist = {target: 0}
+    queue = deque([target])
+    while queue:
+        row, col = queue.popleft()
+        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            cell = (row + dr, col + dc)
+            if grid.in_bounds(*cell) and grid.get_cell(*cell) != CELL_WALL and cell not in dist:
+                dist[cell] = dist[(row, col)] + 1
+                queue.append(cell)
+    return dist
+
+
+def test_distances_match_bfs_and_steps_go_downhill():
+    grid = make_grid()
+    field = FlowField(grid)
+    field.update((2, 4))
+    expected = bfs(grid, (2, 4))
+
+    for row in range(grid.rows):
+        for col in range(grid.cols):
+            assert field.distance(row, col) == expected.get((row, col))
+            step = field.next_step(row, col)
+            if (row, col) in expected and (row, col) != (2, 4):
+                assert field.distance(*step) == expected[(row, col)] - 1
+            else:
+                assert step is None
+
+    # The closed room in the bottom middle is out of reach
+    assert field.distance(4, 4) is None
+    assert field.distance(-1, 0) is None
+
+
+def test_recomputes_only_for_a_new_target_or_terrain():
+    grid = make_grid()
+    field = FlowField(grid)
+    assert field.update((0, 0))
+    assert not field.update((0, 0))
+    assert field.update((0, 9))
+    assert field.recomputes == 2
+
+    # Occupants do not change the terrain, walls do
+    grid.set_cell(0, 5, CELL_GIAN)
+    assert not field.update((0, 9))
+    grid.set_cell(0, 4, CELL_WALL)
+    assert field.update((0, 9))
+    assert field.distance(0, 0) == bfs(grid, (0, 9))[(0, 0)]
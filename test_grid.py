@@ -0,0 +1,59 @@
+"""
+Grid snapshots are copy-on-write and never see live edits
+"""
+
+from constants import *
+from grid import Grid
+
+
+def make_grid():
+    grid = Grid(4, 6)
+    grid.load_level(["N.....",
+                     "..#...",
+                     "....G.",
+                     ".....S"])
+    return grid
+
+
+def test_snapshot_keeps_its_cells_when_the_live_grid_changes():
+    grid = make_grid()
+    snapshot = grid.snapshot()
+
+    grid.set_cell(0, 3, CELL_WALL)
+    grid.set_cell(1, 2, CELL_EMPTY)
+    grid.set_cell(2, 4, CELL_EMPTY)
+    grid.set_cell(2, 3, CELL_GIAN)
+
+    assert snapshot.get_cell(0, 3) == CELL_EMPTY
+    assert snapshot.get_cell(1, 2) == CELL_WALL
+    assert snapshot.get_cell(2, 4) == CELL_GIAN
+    assert snapshot.get_cell(2, 3) == CELL_EMPTY
+    assert grid.get_cell(0, 3) == CELL_WALL
+    assert grid.get_cell(2, 3) == CELL_GIAN
+
+
+def test_rows_are_shared_until_written():
+    grid = make_grid()
+    snapshot = grid.snapshot()
+
+    grid.set_cell(0, 3, CELL_WALL)
+
+    assert snapshot.grid[0] is not grid.grid[0]
+    assert snapshot.grid[3] is grid.grid[3]
+
+    # Only the first write after a snapshot copies the row
+    row = grid.grid[0]
+    grid.set_cell(0, 4, CELL_WALL)
+    assert grid.grid[0] is row
+
+
+def test_snapshot_is_reused_until_the_version_changes():
+    grid = make_grid()
+    snapshot = grid.snapshot()
+    assert grid.snapshot() is snapshot
+
+    grid.set_cell(1, 1, CELL_WALL)
+    newer = grid.snapshot()
+    assert newer is not snapshot
+    assert newer.get_cell(1, 1) == CELL_WALL
+    assert newer.version == grid.version
@@ -0,0 +1,42 @@
+"""
+Idle detection: the menu draws once, input or hover easing wakes it up
+"""
+
+import os
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+from constants import *
+from main import FixedGame
+
+
+@pytest.fixture
+def game():
+    game = FixedGame()
+    yield game
+    pygame.quit()
+
+
+def test_still_menu_needs_a_single_draw(game):
+    assert game.needs_redraw()
+    assert not game.needs_redraw()
+    assert not game.needs_redraw()
+
+    game.dirty = True
+    assert game.needs_redraw()
+    assert not game.needs_redraw()
+
+
+def test_hover_easing_animates_until_it_snaps(game):
+    game.needs_redraw()
+    button = game.buttons[0]
+    button.is_hovered = True
+    assert game.is_animating()
+
+    for _ in range(60):
+        button.update()
+    assert button.hover_scale == button.target_scale()
+    assert not game.is_animating()
+    assert game.needs_redraw() is False
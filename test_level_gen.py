@@ -0,0 +1,34 @@
+"""
+Generated levels: same seed, same maps; every map loads and has a path
+"""
+
+from level_gen import LevelGenerator
+from sim_clock import TickClock
+from simulation import Simulation
+from solver import GameSolver
+
+
+def test_same_seed_same_levels():
+    first = list(LevelGenerator(seed=7).generate_many(3))
+    second = list(LevelGenerator(seed=7).generate_many(3))
+    assert first == second
+
+
+def test_generated_levels_are_solvable_and_playable():
+    for level in LevelGenerator(seed=1).generate_many(5):
+        assert level["max_moves"] >= level["optimal_moves"]
+
+        sim = Simulation(clock=TickClock(), levels={1: level}, verbose=False)
+        sim.load_level(1)
+        assert sim.nobita is not None and sim.school is not None
+        path = sim.astar.find_path(sim.nobita.get_position(), sim.school.get_position(),
+                                   record_exploration=False)
+        assert path
+
+
+def test_optimal_moves_come_from_the_solver():
+    solver = GameSolver()
+    for level in LevelGenerator(seed=1).generate_many(5):
+        solution = solver.solve_level(level)
+        assert solution is not None
+        assert solution["optimal_moves"] <= level["optimal_moves"]
@@ -0,0 +1,80 @@
+"""
+PathService: shared reverse searches, the goal cache and error responses
+"""
+
+import threading
+import pytest
+from levels import LEVELS
+from path_service import PathClient, PathService, make_server
+from sim_clock import TickClock
+from simulation import Simulation
+
+
+def cells_on_the_way(level_num):
+    """School and a few open cells from Nobita to it, as [row, col] lists"""
+    sim = Simulation(clock=TickClock(), verbose=False)
+    sim.load_level(level_num)
+    path = list(sim.astar.find_path(sim.nobita.get_position(), sim.school.get_position(),
+                                    record_exploration=False))
+    return list(path[-1]), [list(cell) for cell in path[:-1:5]]
+
+
+def test_queries_sharing_a_goal_share_one_reverse_search():
+    service = PathService(LEVELS)
+    goal, starts = cells_on_the_way(1)
+    queries = [{"id": i, "level": 1, "start": start, "goal": goal}
+               for i, start in enumerate(starts)]
+
+    results = service.answer(queries)
+
+    assert service.reverse_searches == 1
+    assert [result["id"] for result in results] == list(range(len(starts)))
+    for query, result in zip(queries, results):
+        assert result["path"][0] == query["start"]
+        assert result["path"][-1] == goal
+        assert result["steps"] == len(result["path"]) - 1
+
+
+def test_repeated_goal_hits_the_cache():
+    service = PathService(LEVELS)
+    goal, starts = cells_on_the_way(1)
+    query = {"id": 1, "level": 1, "start": starts[0], "goal": goal}
+    service.answer([query])
+    service.answer([query])
+    assert service.stats()["cache_hits"] == 1
+
+
+def test_errors_are_reported_per_request():
+    service = PathService(LEVELS)
+    assert "error" in service.answer([{"id": 1, "level": 99, "start": [0, 0], "goal": [0, 0]}])[0]
+    assert not service.handle({"op": "nope"})["ok"]
+    assert not service.handle({"op": "load_level"})["ok"]
+
+
+def test_json_that_is_not_an_object_gets_an_error_response():
+    service = PathService(LEVELS)
+    assert service.handle([1, 2]) == {"ok": False, "error": "bad request: expected a JSON object"}
+    assert not service.handle({"queries": 5})["ok"]
+    assert not service.handle({"queries": {"level": 1}})["ok"]
+
+    response = service.handle({"queries": [5, {"id": 2, "level": 1, "start": [1, 1],
+                                               "goal": [1, 1], "options": []}]})
+    assert response["ok"]
+    assert [result["error"] for result in response["results"]] == [
+        "query must be an object", "options must be an object"]
+
+
+def test_handler_survives_a_bad_request_over_a_socket(tmp_path):
+    unix_path = str(tmp_path / "paths.sock")
+    server = make_server(PathService(LEVELS), unix_path=unix_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = PathClient(unix_path=unix_path)
+    try:
+        with pytest.raises(RuntimeError, match="expected a JSON object"):
+            client.request([1, 2])
+        # Same connection, same handler thread
+        assert client.stats()["queries"] == 0
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,59 @@
+"""
+FrameProfiler ring buffer, percentiles and CSV / JSON dumps
+"""
+
+import csv
+import json
+from constants import *
+from profiler import PHASES, FrameProfiler
+
+
+def filled(frames, capacity=8):
+    profiler = FrameProfiler(capacity)
+    for frame in range(frames):
+        profiler.begin_frame(frame / 1000)
+        profiler.add(PHASE_DRAW, 0.001)
+        profiler.add(PHASE_DRAW, 0.002)
+    return profiler
+
+
+def test_ring_buffer_keeps_the_newest_frames_oldest_first():
+    profiler = filled(11)
+    assert profiler.count == 8
+    assert profiler.series(PHASE_FRAME) == [float(ms) for ms in range(3, 11)]
+    assert profiler.series(PHASE_DRAW) == [3.0] * 8
+
+
+def test_add_before_the_first_frame_is_ignored():
+    profiler = FrameProfiler(4)
+    profiler.add(PHASE_UPDATE, 1.0)
+    assert profiler.series(PHASE_UPDATE) == []
+    assert profiler.percentiles(PHASE_UPDATE) == [0.0, 0.0]
+
+
+def test_percentiles_pick_from_the_sorted_series():
+    profiler = filled(5, capacity=100)
+    assert profiler.percentiles(PHASE_FRAME) == [2.0, 4.0]
+    assert profiler.percentiles(PHASE_FRAME, (0.0, 0.25, 1.0)) == [0.0, 1.0, 4.0]
+
+
+def test_dumps_hold_every_phase(tmp_path):
+    profiler = filled(3)
+
+    with open(profiler.dump(str(tmp_path / "frames.csv"))) as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["frame_index"] + [f"{phase}_ms" for phase in PHASES]
+    assert [row[0] for row in rows[1:]] == ["0", "1", "2"]
+
+    with open(profiler.dump(str(tmp_path / "frames.json"))) as f:
+        data = json.load(f)
+    assert data["frames"] == 3
+    assert data["samples_ms"][PHASE_DRAW] == [3.0, 3.0, 3.0]
+    assert data["summary"][PHASE_FRAME] == {"p50_ms": 1.0, "p99_ms": 2.0}
+    assert set(data["summary"]) == set(PHASES)
+
+
+def test_clear_empties_the_buffer():
+    profiler = filled(5)
+    profiler.clear()
+    assert profiler.count == 0 and profiler.series(PHASE_FRAME) == []
@@ -0,0 +1,97 @@
+"""
+Replays: varint encoding, decoding and headless verification
+"""
+
+import asyncio
+import pytest
+from constants import *
+from replay import (REPLAY_SEARCH_LANDED, REPLAY_SEARCH_STARTED, ReplayRecorder, decode,
+                    read_varint, verify, write_varint)
+from sim_clock import TickClock
+from simulation import Simulation
+
+
+def record_session(actions):
+    """Play (ticks to wait, action) pairs like FixedGame does; returns (replay bytes, sim)"""
+    sim = Simulation(clock=TickClock(), verbose=False)
+    recorder = ReplayRecorder()
+    for wait, action in actions:
+        for _ in range(wait):
+            sim.step(SIM_TICK)
+        if sim.apply_action(action):
+            recorder.record(sim.clock.ticks, action)
+    for _ in range(FPS * 20):
+        sim.step(SIM_TICK)
+    return recorder.finish(sim.clock.ticks, sim), sim
+
+
+def test_varints_round_trip():
+    for value in [0, 1, 127, 128, 300, 16383, 16384, 2 ** 40]:
+        buffer = bytearray()
+        write_varint(buffer, value)
+        assert read_varint(buffer, 0) == (value, len(buffer))
+
+
+def test_decode_returns_the_recorded_events():
+    data, sim = record_session([(0, ACTION_START), (5, ACTION_FIND_PATH), (30, ACTION_AUTO_MOVE)])
+    tick_rate, events, end_tick, expected = decode(data)
+
+    assert tick_rate == FPS
+    assert [action for _, action in events] == [ACTION_START, ACTION_FIND_PATH, ACTION_AUTO_MOVE]
+    assert [tick for tick, _ in events] == [0, 5, 35]
+    assert end_tick == sim.clock.ticks
+    assert expected["state"] == sim.state
+
+
+def test_auto_move_session_verifies():
+    data, sim = record_session([(0, ACTION_START), (5, ACTION_FIND_PATH), (30, ACTION_AUTO_MOVE)])
+    ok, expected, actual = verify(data)
+
+    assert sim.state == STATE_WON
+    assert ok, (expected, actual)
+
+
+def test_manual_moves_verify():
+    moves = [ACTION_RIGHT, ACTION_DOWN, ACTION_DOWN, ACTION_RIGHT, ACTION_UP, ACTION_LEFT]
+    data, _ = record_session([(0, ACTION_START)] + [(20, action) for action in moves])
+    assert verify(data)[0]
+
+
+def test_tampered_result_fails_verification():
+    data, _ = record_session([(0, ACTION_START), (5, ACTION_FIND_PATH), (30, ACTION_AUTO_MOVE)])
+    tampered = bytearray(data)
+    tampered[-1] ^= 1    # Score
+    assert not verify(bytes(tampered))[0]
+
+
+def test_rejects_other_files():
+    with pytest.raises(ValueError):
+        decode(b"PNG\x00\x01")
+
+
+def test_async_search_with_gian_moving_verifies():
+    """The path was planned against where Gian stood when the search began"""
+    sim = Simulation(clock=TickClock(), verbose=False)
+    recorder = ReplayRecorder()
+    sim.apply_action(ACTION_START)
+    recorder.record(sim.clock.ticks, ACTION_START)
+
+    def started(search):
+        recorder.record(sim.clock.ticks, ACTION_FIND_PATH | REPLAY_SEARCH_STARTED)
+
+    async def session():
+        task = asyncio.ensure_future(sim.find_path_async(started=started, yield_every=1))
+        while not task.done():
+            sim.step(SIM_TICK)
+            await asyncio.sleep(0)
+        return task.result()
+
+    assert asyncio.run(session())
+    recorder.record(sim.clock.ticks, ACTION_FIND_PATH | REPLAY_SEARCH_LANDED)
+    sim.apply_action(ACTION_AUTO_MOVE)
+    recorder.record(sim.clock.ticks, ACTION_AUTO_MOVE)
+    for _ in range(FPS * 20):
+        sim.step(SIM_TICK)
+
+    ok, expected, actual = verify(recorder.finish(sim.clock.ticks, sim))
+    assert ok, (expected, actual)
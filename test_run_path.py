@@ -0,0 +1,48 @@
+"""
+RunPath: run-length encoding round trips
+"""
+
+import random
+from run_path import RunLengthPath
+
+
+def random_path(rng, cells=60):
+    """Cardinal steps with the occasional door teleport"""
+    path = [(rng.randrange(20), rng.randrange(20))]
+    for _ in range(cells - 1):
+        row, col = path[-1]
+        if rng.random() < 0.05:
+            path.append((rng.randrange(20), rng.randrange(20)))
+        else:
+            dr, dc = rng.choice([(-1, 0), (1, 0), (0, -1), (0, 1)])
+            path.append((row + dr, col + dc))
+    return path
+
+
+def test_random_paths_round_trip():
+    rng = random.Random(0)
+    for _ in range(200):
+        points = random_path(rng, rng.randrange(1, 80))
+        path = RunLengthPath(points)
+
+        assert len(path) == len(points)
+        assert path.to_list() == points
+        assert [path[i] for i in range(len(points))] == points
+        assert path[-1] == points[-1]
+        assert path[1:4] == points[1:4]
+        assert path == points
+
+
+def test_straight_corridor_is_one_run():
+    points = [(3, col) for col in range(50)]
+    path = RunLengthPath(points)
+
+    assert path.runs() == 1
+    assert list(path.segments()) == [(0, (3, 0), (3, 49))]
+
+
+def test_empty_and_single_cell_paths():
+    assert len(RunLengthPath()) == 0
+    assert not RunLengthPath()
+    assert RunLengthPath([(2, 5)]).to_list() == [(2, 5)]
+    assert list(RunLengthPath([(2, 5)]).segments()) == []
@@ -0,0 +1,55 @@
+"""
+TickClock-driven Gian patrols are reproducible and independent of real time
+"""
+
+import time
+from constants import *
+from entities import Gian
+from sim_clock import TickClock, WallClock
+
+
+def patrol(seconds, tick=SIM_TICK):
+    clock = TickClock(tick)
+    gian = Gian(1, 1, [(1, 5), (4, 5)], clock=clock)
+    trail = []
+    while clock.now() < seconds:
+        clock.advance()
+        gian.update(tick)
+        trail.append(gian.get_position())
+    return trail, clock
+
+
+def test_tick_clock_only_moves_when_advanced():
+    clock = TickClock(0.5, start=2.0)
+    assert clock.now() == clock.now() == 2.0
+
+    clock.advance()
+    clock.advance(1.25)
+    assert clock.now() == 3.75
+    assert clock.ticks == 2
+
+
+def test_wall_clock_ignores_advance():
+    clock = WallClock()
+    before = clock.now()
+    clock.advance(1000)
+    assert clock.now() - before < 60
+
+
+def test_gian_patrol_is_identical_across_runs():
+    first, _ = patrol(30)
+    second, _ = patrol(30)
+    assert first == second
+
+
+def test_gian_walks_at_gian_speed_in_simulated_time():
+    started = time.perf_counter()
+    trail, clock = patrol(20)
+    assert time.perf_counter() - started < 5
+
+    # One cell per 1 / GIAN_SPEED seconds, never two cells in one tick
+    steps = sum(1 for a, b in zip(trail, trail[1:]) if a != b)
+    assert steps <= clock.now() * GIAN_SPEED + 1
+    assert trail[-1] != (1, 1)
+    for (r1, c1), (r2, c2) in zip(trail, trail[1:]):
+        assert abs(r1 - r2) + abs(c1 - c2) <= 1
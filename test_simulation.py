@@ -0,0 +1,133 @@
+"""
+Simulation rules, run headless
+"""
+
+import asyncio
+from constants import *
+from enemies import EnemyManager
+from sim_clock import TickClock
+from simulation import Simulation
+
+
+def make_sim(level_num):
+    sim = Simulation(clock=TickClock(), verbose=False)
+    sim.load_level(level_num)
+    return sim
+
+
+def place_nobita(sim, pos):
+    sim.grid.move_occupant((sim.nobita.row, sim.nobita.col), pos, CELL_NOBITA)
+    sim.nobita.row, sim.nobita.col = pos
+
+
+def test_bamboo_pickup_keeps_nobita_in_occupancy():
+    sim = make_sim(2)
+    sim.enemies = EnemyManager(sim.clock)
+    bamboo = sim.grid.gadget_positions[0]
+    place_nobita(sim, (bamboo[0], bamboo[1] - 1))
+
+    assert sim.move_nobita(*bamboo)
+
+    assert sim.bamboo_available
+    assert sim.grid.occupancy[bamboo] == CELL_NOBITA
+    assert sim.grid.get_cell(*bamboo) == CELL_NOBITA
+    assert sim.grid.get_terrain(*bamboo) == CELL_EMPTY
+    assert sim.grid.nobita_pos == bamboo
+
+
+def test_walking_keeps_terrain_version():
+    sim = make_sim(1)
+    terrain_version = sim.grid.terrain_version
+
+    assert sim.move_nobita(1, 2)
+    for _ in range(120):
+        sim.step(SIM_TICK)
+
+    assert sim.grid.terrain_version == terrain_version
+    assert sim.grid.occupancy[(1, 2)] == CELL_NOBITA
+    assert list(sim.grid.occupancy.values()).count(CELL_NOBITA) == 1
+
+
+def test_door_teleport_moves_occupant_and_keeps_door():
+    sim = make_sim(1)
+    door1, door2 = sim.door_positions[0]
+    place_nobita(sim, (door1[0], door1[1] - 1))
+
+    assert sim.move_nobita(*door1)
+
+    assert (sim.nobita.row, sim.nobita.col) == door2
+    assert sim.grid.occupancy.get(door2) == CELL_NOBITA
+    assert door1 not in sim.grid.occupancy
+    assert sim.grid.get_terrain(*door1) == CELL_DOOR
+
+
+def test_clearing_the_path_keeps_shared_exploration_traces():
+    sim = make_sim(1)
+    sim.find_path()
+    trace = sim.grid.explored
+    expanded = len(trace)
+
+    sim.grid.clear_path()
+    sim.grid.reset()
+
+    assert expanded > 0
+    assert len(trace) == expanded
+    assert sim.grid.explored is not trace
+
+
+def run_with_ticks(sim, coroutine):
+    """Run a sim coroutine on asyncio while the simulation keeps ticking (Gian moves)"""
+    async def driver():
+        task = asyncio.ensure_future(coroutine)
+        while not task.done():
+            sim.step(SIM_TICK)
+            await asyncio.sleep(0)
+        return task.result()
+    return asyncio.run(driver())
+
+
+def test_async_bamboo_toggle_matches_a_synchronous_replan():
+    sim = make_sim(2)
+    sim.bamboo_available = True
+    sim.find_path()
+
+    assert run_with_ticks(sim, sim.toggle_bamboo_async())
+
+    # What a replay toggling at this tick would search
+    assert sim.bamboo_active
+    landed = list(sim.path)
+    sim.find_path()
+    assert list(sim.path) == landed
+
+
+def gian_cells(sim):
+    return {pos for pos, occupant in sim.grid.occupancy.items() if occupant == CELL_GIAN}
+
+
+def test_async_search_survives_gian_moving():
+    sim = make_sim(1)
+    searches = []
+    before = gian_cells(sim)
+
+    # One expansion per slice: the search spans many ticks
+    assert run_with_ticks(sim, sim.find_path_async(started=searches.append, yield_every=1))
+
+    assert gian_cells(sim) != before
+    assert len(searches) == 1 and searches[0].applied
+    assert sim.path and sim.path[0] == (sim.nobita.row, sim.nobita.col)
+
+
+def test_async_search_restarts_when_nobita_moves():
+    sim = make_sim(1)
+    searches = []
+
+    def started(search):
+        searches.append(search)
+        if len(searches) == 1:
+            sim.move_nobita(sim.nobita.row, sim.nobita.col + 1)
+
+    assert asyncio.run(sim.find_path_async(started=started))
+
+    assert len(searches) == 2
+    assert not searches[0].applied and searches[1].applied
+    assert sim.path[0] == (sim.nobita.row, sim.nobita.col)
@@ -0,0 +1,43 @@
+"""
+GameSolver optimal_moves on the built-in levels and rule corner cases
+"""
+
+from levels import LEVELS
+from solver import GameSolver
+
+
+def test_optimal_moves_on_the_built_in_levels():
+    solver = GameSolver()
+    moves = {level_num: solver.solve_level(LEVELS[level_num])["optimal_moves"]
+             for level_num in [1, 2, 3]}
+    assert moves == {1: 20.5, 2: 17.5, 3: 21.0}
+
+
+def test_path_starts_at_nobita_and_ends_at_school():
+    result = GameSolver().solve_level(LEVELS[1])
+    level_map = LEVELS[1]["map"]
+    start_row, start_col = result["path"][0]
+    end_row, end_col = result["path"][-1]
+
+    assert level_map[start_row][start_col] == 'N'
+    assert level_map[end_row][end_col] == 'S'
+
+
+def test_bamboo_halves_the_cost_after_pickup():
+    result = GameSolver().solve(["NB......S"], [])
+    # One full move to the bamboo, then seven half moves
+    assert result["optimal_moves"] == 1 + 7 * 0.5
+    assert result["bamboo_from"] == 1
+
+
+def test_door_teleport_costs_one_extra_step():
+    result = GameSolver().solve(["ND#DS"], [((0, 1), (0, 3))])
+    assert result["optimal_moves"] == 3
+    assert result["path"] == [(0, 0), (0, 3), (0, 4)]
+
+
+def test_unreachable_school_and_cache():
+    solver = GameSolver()
+    assert solver.solve(["N#S"], []) is None
+    assert solver.solve(["N#S"], []) is None
+    assert solver.stats()["cache_hits"] == 1
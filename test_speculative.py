@@ -0,0 +1,49 @@
+"""
+WhatIfPlanner: swapped-in paths and when they are thrown away
+"""
+
+from constants import *
+from sim_clock import TickClock
+from simulation import Simulation
+from speculative import WhatIfPlanner
+
+
+def make_planned_sim(level_num):
+    sim = Simulation(clock=TickClock(), verbose=False)
+    sim.load_level(level_num)
+    sim.speculation = WhatIfPlanner(sim)
+    while not sim.speculation.done():
+        sim.speculation.step(budget=1.0)
+    return sim
+
+
+def test_swapped_in_path_matches_a_fresh_search():
+    sim = make_planned_sim(1)
+    sim.find_path()
+
+    fresh = Simulation(clock=TickClock(), verbose=False)
+    fresh.load_level(1)
+    fresh.find_path()
+
+    assert sim.speculation.swapped_in == 1
+    assert list(sim.path) == list(fresh.path)
+
+
+def test_occupancy_writes_without_gian_keep_the_results():
+    sim = make_planned_sim(1)
+    nobita = (sim.nobita.row, sim.nobita.col)
+    sim.grid.move_occupant(nobita, nobita, CELL_NOBITA)
+
+    assert sim.speculation.done()
+    assert sim.speculation.discarded == 0
+
+
+def test_gian_moving_discards_the_results():
+    sim = make_planned_sim(1)
+    gian = (sim.gian.row, sim.gian.col)
+    step = next((gian[0] + dr, gian[1] + dc) for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]
+                if sim.grid.is_walkable(gian[0] + dr, gian[1] + dc))
+    sim.grid.move_occupant(gian, step, CELL_GIAN)
+
+    assert not sim.speculation.done()
+    assert sim.speculation.lookup(False) is None
@@ -0,0 +1,36 @@
+"""
+Sprite atlas baking (no window needed)
+"""
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+from constants import *
+from sprites import SpriteAtlas, get_atlas
+
+
+@pytest.fixture(scope="module")
+def atlas():
+    pygame.font.init()
+    return SpriteAtlas(40)
+
+
+def test_every_sprite_is_a_double_cell_square(atlas):
+    names = ['nobita', 'nobita_bamboo', 'school', 'gian', 'door']
+    for name in names:
+        assert atlas.get(name).get_size() == (80, 80)
+    assert len(atlas.copter_frames) == COPTER_FRAMES
+
+
+def test_copter_rotation_wraps_every_quarter_turn(atlas):
+    for rotation in [0, 10, 33, 89]:
+        assert atlas.copter_frame(rotation) is atlas.copter_frame(rotation + 90)
+        assert atlas.copter_frame(rotation) is atlas.copter_frame(rotation - 360)
+    assert atlas.copter_frame(atlas.copter_step) is atlas.copter_frames[1 % COPTER_FRAMES]
+
+
+def test_one_shared_atlas_per_cell_size():
+    pygame.font.init()
+    assert get_atlas(36) is get_atlas(36)
+    assert get_atlas(36) is not get_atlas(44)
+    assert get_atlas(44).get('gian').get_size() == (88, 88)
@@ -0,0 +1,69 @@
+"""
+Palettized terrain layer
+- One pixel per cell, coloured by the palette, with or without numpy
+- Rebuilt for terrain edits only, never for characters moving
+"""
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+import grid as grid_module
+from constants import *
+from grid import Grid
+
+LEVEL = [
+    "#######",
+    "#N..B.#",
+    "#.#D#S#",
+    "#######",
+]
+
+
+def make_grid():
+    grid = Grid(len(LEVEL), len(LEVEL[0]))
+    grid.load_level(LEVEL)
+    return grid
+
+
+def cell_colors(grid):
+    cells = grid._cell_surface()
+    return [[tuple(cells.get_at((col, row)))[:3] for col in range(grid.cols)]
+            for row in range(grid.rows)]
+
+
+def test_each_pixel_is_its_cell_color(monkeypatch):
+    grid = make_grid()
+    expected = [[grid._get_cell_color(row, col, grid.get_terrain(row, col))
+                 for col in range(grid.cols)] for row in range(grid.rows)]
+
+    assert cell_colors(grid) == expected
+    monkeypatch.setattr(grid_module, "numpy", None)
+    assert cell_colors(grid) == expected
+
+
+def test_scaled_terrain_fills_every_cell():
+    grid = make_grid()
+    terrain = grid._build_terrain(None)
+    size = grid.cell_size
+
+    assert terrain.get_size() == (grid.cols * size, grid.rows * size)
+    # Cell centres keep the flat palette colour under the grid lines
+    for row in range(grid.rows):
+        for col in range(grid.cols):
+            centre = (col * size + size // 2, row * size + size // 2)
+            color = grid._get_cell_color(row, col, grid.get_terrain(row, col))
+            assert tuple(terrain.get_at(centre))[:3] == color
+
+
+def test_layer_is_rebuilt_for_terrain_edits_only():
+    grid = make_grid()
+    screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    grid.draw(screen)
+
+    grid.move_occupant((1, 1), (1, 2), CELL_NOBITA)
+    grid.draw(screen)
+    assert grid.terrain_layer.rebuilds == 1
+
+    grid.set_cell(1, 4, CELL_EMPTY)
+    grid.draw(screen)
+    assert grid.terrain_layer.rebuilds == 2
@@ -0,0 +1,56 @@
+"""
+TextCache: hit/miss counting, LRU eviction and one font per size
+"""
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+from text_cache import TextCache
+
+
+@pytest.fixture(autouse=True)
+def fonts():
+    pygame.font.init()
+    yield
+
+
+def test_repeated_label_is_rendered_once():
+    cache = TextCache()
+    first = cache.render("SCHOOL", 16, (0, 0, 0))
+    again = cache.render("SCHOOL", 16, [0, 0, 0])
+
+    assert again is first
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_size_and_colour_are_part_of_the_key():
+    cache = TextCache()
+    cache.render("GIAN", 16, (255, 255, 255))
+    cache.render("GIAN", 14, (255, 255, 255))
+    cache.render("GIAN", 16, (0, 0, 0))
+
+    assert cache.misses == 3
+    assert cache.stats()["fonts"] == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TextCache(max_entries=2)
+    a = cache.render("a", 16, (0, 0, 0))
+    cache.render("b", 16, (0, 0, 0))
+    cache.render("a", 16, (0, 0, 0))
+    cache.render("c", 16, (0, 0, 0))
+
+    assert cache.evictions == 1
+    assert cache.render("a", 16, (0, 0, 0)) is a
+    assert ("b", 16, (0, 0, 0)) not in cache.surfaces
+
+
+def test_clear_keeps_the_fonts():
+    cache = TextCache()
+    cache.render("x", 20, (1, 2, 3))
+    font = cache.font(20)
+    cache.clear()
+
+    assert cache.stats()["entries"] == 0 and cache.hits == cache.misses == 0
+    assert cache.font(20) is font
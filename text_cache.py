@@ -0,0 +1,78 @@
+"""
+Shared Font Registry and Rendered-Text Cache
+Labels and HUD strings are rendered once and reused every frame
+"""
+
+from collections import OrderedDict
+try:
+    import pygame
+except ImportError:
+    # Headless simulation: drawing is unavailable, game rules still work
+    pygame = None
+from constants import *
+
+
+class TextCache:
+    """
+    Font registry + LRU cache of rendered text surfaces
+    - Fonts are created once per size
+    - Surfaces are keyed by (text, size, colour) and evicted least-recently-used
+    """
+
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def font(self, size):
+        """Shared pygame font for a given point size"""
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(None, size)
+            self.fonts[size] = font
+        return font
+
+    def render(self, text, size, color):
+        """Rendered (antialiased) text surface, reused while it stays cached"""
+        key = (text, size, tuple(color))
+        surface = self.surfaces.get(key)
+
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.font(size).render(text, True, color)
+        self.surfaces[key] = surface
+
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+
+        return surface
+
+    def stats(self):
+        """Hit/miss counters for profiling"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self.surfaces),
+            'fonts': len(self.fonts),
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+# Shared instance used by entities and the HUD
+text_cache = TextCache()
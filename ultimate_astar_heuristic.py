@@ -4,9 +4,12 @@ Bamboo Copter = reduces path length
 Anywhere Door = teleportation nodes in graph
 """
 
+import asyncio
 import heapq
 import math
 from constants import *
+from exploration import ExplorationTrace
+from adjacency import EDGE_STEP
 
 
 class UltimateAStar:
@@ -21,6 +24,20 @@ class UltimateAStar:
         self.grid = grid
         self.bamboo_collected = False
         self.door_positions = []  # List of door pairs
+        self.verbose = True       # Print search stats (off for batch jobs)
+        self.last_stats = {}      # Counters from the most recent find_path call
+
+    def log(self, message):
+        if self.verbose:
+            print(message)
+
+    def fork(self, grid):
+        """Quiet searcher with the same gadget state, bound to another grid (e.g. a snapshot)"""
+        searcher = UltimateAStar(grid)
+        searcher.verbose = False
+        searcher.bamboo_collected = self.bamboo_collected
+        searcher.door_positions = list(self.door_positions)
+        return searcher
 
     def heuristic(self, pos1, pos2):
         """
@@ -77,53 +94,90 @@ class UltimateAStar:
 
         return base_cost
 
-    def get_neighbors_with_doors(self, row, col):
-        """
-        Get neighbors INCLUDING teleportation via doors
-        This makes doors part of the graph structure!
-        """
-        neighbors = []
-
-        # Regular neighbors (4 cardinal directions)
-        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            new_row, new_col = row + dr, col + dc
-            if self.grid.is_walkable(new_row, new_col):
-                cost = self.get_movement_cost((row, col), (new_row, new_col))
-                neighbors.append((new_row, new_col, cost))
-
-        # TELEPORTATION: If standing on a door, can teleport!
-        for door1, door2 in self.door_positions:
-            if (row, col) == door1:
-                # Can teleport to door2 for cost of 1 move
-                teleport_cost = 1.0 if not self.bamboo_collected else 0.5
-                neighbors.append((door2[0], door2[1], teleport_cost))
-                print(f"🚪 Teleport available: {door1} → {door2}")
-            elif (row, col) == door2:
-                # Can teleport to door1
-                teleport_cost = 1.0 if not self.bamboo_collected else 0.5
-                neighbors.append((door1[0], door1[1], teleport_cost))
-                print(f"🚪 Teleport available: {door2} → {door1}")
-
-        return neighbors
+    def _gian_penalties(self):
+        """{cell index: extra step cost} for cells near Gian (get_movement_cost's penalty)"""
+        penalties = {}
+        if not self.grid.gian_pos:
+            return penalties
+
+        gian_row, gian_col = self.grid.gian_pos
+        for dr in range(-GIAN_DANGER_RADIUS, GIAN_DANGER_RADIUS + 1):
+            reach = GIAN_DANGER_RADIUS - abs(dr)
+            for dc in range(-reach, reach + 1):
+                row, col = gian_row + dr, gian_col + dc
+                if self.grid.in_bounds(row, col):
+                    distance = abs(dr) + abs(dc)
+                    penalties[row * self.grid.cols + col] = (
+                        GIAN_PROXIMITY_COST * (GIAN_DANGER_RADIUS - distance + 1))
+        return penalties
 
     def find_path(self, start, goal, record_exploration=True):
         """
         Enhanced A* with door teleportation and gadget heuristics
         """
+        search = self.search(start, goal, record_exploration)
+        try:
+            while True:
+                next(search)
+        except StopIteration as done:
+            return done.value
+
+    async def find_path_async(self, start, goal, record_exploration=True,
+                              yield_every=SEARCH_YIELD_EVERY):
+        """
+        Same search as find_path, handing control back to the event loop
+        every yield_every expansions (web build: the tab never hangs)
+        """
+        search = self.search(start, goal, record_exploration, yield_every)
+        try:
+            while True:
+                next(search)
+                await asyncio.sleep(0)
+        except StopIteration as done:
+            return done.value
+
+    def search(self, start, goal, record_exploration=True, yield_every=None):
+        """
+        A* as a generator: yields every yield_every expansions (never if None),
+        the path (or None) is the generator's return value
+        """
         if not self.grid.in_bounds(*start) or not self.grid.in_bounds(*goal):
             return None
 
         if not self.grid.is_walkable(*goal):
             return None
 
-        # Priority queue: (f_cost, counter, position)
+        # Different components: no search can succeed, skip it entirely
+        if not self.grid.components.connected(start, goal):
+            if record_exploration:
+                self.grid.set_explored(ExplorationTrace(self.grid.rows, self.grid.cols))
+            self.last_stats = {"nodes_explored": 0, "path_length": None}
+            self.log(f"✗ No path found! {start} and {goal} are not connected.")
+            return None
+
+        # Compiled CSR graph: one contiguous edge slice per expansion
+        graph = self.grid.graph
+        offsets, degree = graph.offsets, graph.degree
+        neighbours, costs, kinds = graph.neighbours, graph.costs, graph.kinds
+
+        # Dynamic overlay on top of the static graph: Gian cells and proximity costs
+        cols = self.grid.cols
+        blocked = {row * cols + col for (row, col), occupant in self.grid.occupancy.items()
+                   if occupant == CELL_GIAN}
+        penalties = self._gian_penalties()
+        scale = 0.5 if self.bamboo_collected else 1.0
+
+        start_index = start[0] * cols + start[1]
+        goal_index = goal[0] * cols + goal[1]
+
+        # Priority queue: (f_cost, counter, cell index)
         counter = 0
         frontier = []
-        heapq.heappush(frontier, (0, counter, start))
+        heapq.heappush(frontier, (0, counter, start_index))
 
-        came_from = {start: None}
-        cost_so_far = {start: 0}
-        explored_set = set()
+        came_from = {start_index: None}
+        cost_so_far = {start_index: 0}
+        explored = ExplorationTrace(self.grid.rows, cols) if record_exploration else None
 
         nodes_explored = 0
 
@@ -131,54 +185,67 @@ class UltimateAStar:
             current_f, _, current = heapq.heappop(frontier)
             nodes_explored += 1
 
+            if yield_every and nodes_explored % yield_every == 0:
+                yield nodes_explored
+
             if record_exploration:
-                explored_set.add(current)
+                explored.add(*divmod(current, cols))
 
             # Goal reached
-            if current == goal:
+            if current == goal_index:
                 if record_exploration:
-                    self.grid.explored = explored_set
+                    self.grid.set_explored(explored)
 
-                path = self._reconstruct_path(came_from, start, goal)
+                path = self._reconstruct_path(came_from, goal_index)
 
                 # Calculate actual move count
                 actual_moves = self._calculate_actual_moves(path)
+                self.last_stats = {"nodes_explored": nodes_explored, "path_length": len(path) - 1}
 
-                print(f"✓ A* Stats:")
-                print(f"  Nodes explored: {nodes_explored}")
-                print(f"  Path length: {len(path)-1} steps")
-                print(f"  Actual moves: {actual_moves}")
-                print(f"  Bamboo active: {self.bamboo_collected}")
+                self.log(f"✓ A* Stats:")
+                self.log(f"  Nodes explored: {nodes_explored}")
+                self.log(f"  Path length: {len(path)-1} steps")
+                self.log(f"  Actual moves: {actual_moves}")
+                self.log(f"  Bamboo active: {self.bamboo_collected}")
 
                 return path
 
-            # Explore neighbors WITH door teleportation
-            for neighbor_row, neighbor_col, move_cost in self.get_neighbors_with_doors(*current):
-                neighbor = (neighbor_row, neighbor_col)
+            # Explore neighbours (steps and door teleports) from the edge slice
+            current_cost = cost_so_far[current]
+            first = offsets[current]
+            for slot in range(first, first + degree[current]):
+                neighbor = neighbours[slot]
+                if neighbor in blocked:
+                    continue
 
-                new_cost = cost_so_far[current] + move_cost
+                move_cost = costs[slot] * scale
+                if kinds[slot] == EDGE_STEP:
+                    move_cost += penalties.get(neighbor, 0)
+                new_cost = current_cost + move_cost
 
                 if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
                     cost_so_far[neighbor] = new_cost
-                    priority = new_cost + self.heuristic(neighbor, goal)
+                    priority = new_cost + self.heuristic(divmod(neighbor, cols), goal)
                     counter += 1
                     heapq.heappush(frontier, (priority, counter, neighbor))
                     came_from[neighbor] = current
 
         # No path found
         if record_exploration:
-            self.grid.explored = explored_set
+            self.grid.set_explored(explored)
 
-        print(f"✗ No path found! Explored {nodes_explored} nodes.")
+        self.last_stats = {"nodes_explored": nodes_explored, "path_length": None}
+        self.log(f"✗ No path found! Explored {nodes_explored} nodes.")
         return None
 
-    def _reconstruct_path(self, came_from, start, goal):
-        """Reconstruct path from came_from dictionary"""
+    def _reconstruct_path(self, came_from, goal_index):
+        """Reconstruct the (row, col) path from the came_from index map"""
+        cols = self.grid.cols
         path = []
-        current = goal
+        current = goal_index
 
         while current is not None:
-            path.append(current)
+            path.append(divmod(current, cols))
             current = came_from[current]
 
         path.reverse()
@@ -205,15 +272,17 @@ class UltimateAStar:
         """
         self.bamboo_collected = collected
         if collected:
-            print("🚁 A* now uses Bamboo heuristic: 0.5x move cost!")
+            self.log("🚁 A* now uses Bamboo heuristic: 0.5x move cost!")
 
     def add_door_pair(self, pos1, pos2):
         """Add teleportation door pair"""
         if (pos1, pos2) not in self.door_positions and (pos2, pos1) not in self.door_positions:
             self.door_positions.append((pos1, pos2))
-            print(f"🚪 Door pair added: {pos1} ↔ {pos2}")
+            self.grid.add_door_pair(pos1, pos2)
+            self.log(f"🚪 Door pair added: {pos1} ↔ {pos2}")
 
     def reset_gadgets(self):
         """Reset gadget states"""
         self.bamboo_collected = False
         self.door_positions = []
+        self.grid.clear_door_pairs()